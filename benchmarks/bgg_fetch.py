@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.bgg_server import FakeBGGServer
+from benchmarks.generate import openDatabase
+from src.async_database import AsyncDBManager
+from src.bgg import BGGClient, fetchBGGameData, fetchBGGIDsFromName
+from src.bgg_cache import BGGCache
+
+# Server settings for each scenario, the client always uses the same settings so the runs stay comparable
+SCENARIOS: dict[str, dict] = {
+    "clean": {},
+    "latency": {"latency": 0.2, "jitter": 0.1},
+    "queued": {"queuedRate": 0.2, "latency": 0.05},
+    "throttled": {"throttleRate": 0.1, "retryAfter": 1, "latency": 0.05},
+}
+
+
+async def runScenario(name: str, serverSettings: dict, ids: [int], queries: [str], clientSettings: dict, workDir: str, seed: int) -> dict:
+    server = FakeBGGServer(seed=seed, **serverSettings)
+    baseURL = await server.start()
+    # Every scenario starts from an empty cache, otherwise only the first one would reach the server
+    BGGCache.initInstance(os.path.join(workDir, f"cache_{name}.sqlite"))
+    try:
+        async with BGGClient(baseURL, **clientSettings) as client:
+            start = time.perf_counter()
+            searches = await asyncio.gather(*[fetchBGGIDsFromName(query, client) for query in queries], return_exceptions=True)
+            searched = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()) as failures:
+                games = await fetchBGGameData(ids, client=client)
+            fetched = time.perf_counter()
+    finally:
+        await server.stop()
+
+    returned = {game.bggId for game in games}
+    result = {
+        "games": len(games),
+        "missing": sum(1 for bggID in ids if bggID not in returned),
+        "failedBatches": failures.getvalue().count("Failed to fetch BGG games"),
+        "failedSearches": sum(1 for search in searches if isinstance(search, Exception)),
+        "searchTime": searched - start,
+        "fetchTime": fetched - searched,
+        "gamesPerSecond": len(games) / (fetched - searched) if fetched > searched else 0.0,
+        "server": dict(server.stats),
+    }
+    print(f"{name:<10} {result['games']:>6} games in {result['fetchTime']:7.2f}s ({result['gamesPerSecond']:8.1f}/s), "
+          f"{len(queries)} searches in {result['searchTime']:6.2f}s, {result['server']['requests']} requests "
+          f"({result['server']['202']} queued, {result['server']['429']} throttled), {result['missing']} missing")
+    return result
+
+
+async def runBenchmark(games: int, searches: int, scenarios: [str], clientSettings: dict, seed: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as workDir:
+        # fetchBGGameData looks up local games first, an empty database keeps that lookup out of the measurement
+        AsyncDBManager.initInstance(openDatabase(os.path.join(workDir, "database.sqlite")))
+        ids = list(range(1, games + 1))
+        queries = [f"benchmark game {i}" for i in range(searches)]
+        for name in scenarios:
+            results[name] = await runScenario(name, SCENARIOS[name], ids, queries, clientSettings, workDir, seed)
+        AsyncDBManager.getInstance().executor.shutdown()
+        BGGCache.instance = None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure BGG fetch throughput against the local BGG stand-in")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--searches", type=int, default=20)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Scenarios to run, all of them by default")
+    parser.add_argument("--requests-per-second", type=float, default=50.0)
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--max-retries", type=int, default=4)
+    parser.add_argument("--retry-delay", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    clientSettings = {
+        "requestsPerSecond": args.requests_per_second,
+        "burst": args.burst,
+        "connections": args.connections,
+        "maxRetries": args.max_retries,
+        "retryDelay": args.retry_delay,
+    }
+    results = asyncio.run(runBenchmark(args.games, args.searches, args.scenario or list(SCENARIOS), clientSettings, args.seed))
+    if args.output:
+        with open(args.output, "w") as data:
+            json.dump({"client": clientSettings, "games": args.games, "searches": args.searches, "scenarios": results}, data, indent=4, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import argparse
+import asyncio
+import os
+import random
+import re
+from xml.etree import ElementTree
+
+import aiohttp
+from aiohttp import web
+
+FIXTURES_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "bgg")
+TERMS_OF_USE: str = "https://boardgamegeek.com/xmlapi/termsofuse"
+CATEGORIES: [str] = ["Strategy", "Economic", "Card Game", "Dice", "Fantasy", "Party Game", "Negotiation", "Adventure"]
+
+
+def searchFixtureName(query: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", query.strip().lower()).strip("_") or "_"
+
+
+def syntheticThing(bggID: int) -> str:
+    # Stand-in data for IDs without a recording, derived from the ID so every run serves the same games
+    rng = random.Random(bggID)
+    categories = "".join(f'<link type="boardgamecategory" id="{1000 + CATEGORIES.index(category)}" value="{category}"/>'
+                         for category in rng.sample(CATEGORIES, rng.randint(1, 4)))
+    minPlayers = rng.randint(1, 3)
+    return (f'<item type="boardgame" id="{bggID}">'
+            f'<thumbnail>https://cf.geekdo-images.com/synthetic/{bggID}_t.png</thumbnail>'
+            f'<name type="primary" sortindex="1" value="Synthetic Game {bggID}"/>'
+            f'<description>Synthetic boardgame {bggID} served by the local BGG stand-in.</description>'
+            f'<yearpublished value="{rng.randint(1990, 2024)}"/>'
+            f'<minplayers value="{minPlayers}"/><maxplayers value="{minPlayers + rng.randint(0, 5)}"/>'
+            f'<playingtime value="{rng.choice([20, 30, 45, 60, 90, 120])}"/>{categories}'
+            f'<statistics page="1"><ratings><usersrated value="{rng.randint(10, 50000)}"/>'
+            f'<average value="{rng.uniform(5, 9):.5f}"/><bayesaverage value="{rng.uniform(5, 8):.5f}"/>'
+            f'<ranks><rank type="subtype" id="1" name="boardgame" friendlyname="Board Game Rank" value="{rng.randint(1, 25000)}" bayesaverage="0"/></ranks>'
+            f'</ratings></statistics></item>')
+
+
+def syntheticSearch(query: str) -> str:
+    rng = random.Random(query.strip().lower())
+    ids = sorted(rng.sample(range(1, 400000), 5))
+    items = "".join(f'<item type="boardgame" id="{bggID}"><name type="primary" value="{query} {index + 1}"/></item>' for index, bggID in enumerate(ids))
+    items += f'<item type="boardgameexpansion" id="{ids[0] + 1}"><name type="primary" value="{query} expansion"/></item>'
+    return f'<?xml version="1.0" encoding="utf-8"?><items total="6" termsofuse="{TERMS_OF_USE}">{items}</items>'
+
+
+class FakeBGGServer:
+    def __init__(self, fixturesDir: str = FIXTURES_DIR, latency: float = 0.0, jitter: float = 0.0, queuedRate: float = 0.0,
+                 throttleRate: float = 0.0, retryAfter: int = 1, synthetic: bool = True, upstream: str | None = None, seed: int = 0):
+        self.fixturesDir: str = fixturesDir
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.queuedRate: float = queuedRate
+        self.throttleRate: float = throttleRate
+        self.retryAfter: int = retryAfter
+        self.synthetic: bool = synthetic
+        # Requests that have no recording are forwarded here and recorded, BGG's own API when recording new fixtures
+        self.upstream: str | None = upstream
+        self.random: random.Random = random.Random(seed)
+        self.stats: dict[str, int] = {"requests": 0, "200": 0, "202": 0, "429": 0, "things": 0, "searches": 0}
+        self.runner: web.AppRunner | None = None
+        self.session: aiohttp.ClientSession | None = None
+
+    def makeApp(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/xmlapi2/thing", self._thing)
+        app.router.add_get("/xmlapi2/search", self._search)
+        app.router.add_get("/stats", self._stats)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self.runner = web.AppRunner(self.makeApp())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        # With port 0 the OS picks a free port, the base URL tells clients which one
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}/xmlapi2"
+
+    async def stop(self):
+        if self.session is not None:
+            await self.session.close()
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+    async def _inject(self) -> web.Response | None:
+        self.stats["requests"] += 1
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        roll = self.random.random()
+        if roll < self.throttleRate:
+            self.stats["429"] += 1
+            return web.Response(status=429, headers={"Retry-After": str(self.retryAfter)}, text="Rate limit exceeded")
+        if roll < self.throttleRate + self.queuedRate:
+            # BGG answers 202 while it prepares the data, the same request succeeds later
+            self.stats["202"] += 1
+            return web.Response(status=202, text="Your request has been accepted and will be processed")
+        return None
+
+    def _xmlResponse(self, body: str) -> web.Response:
+        self.stats["200"] += 1
+        return web.Response(body=body.encode("utf-8"), content_type="text/xml", charset="utf-8")
+
+    async def _fetchUpstream(self, endpoint: str, params: dict) -> bytes:
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        # Upstream keeps answering 202 until the data is ready, just like the clients of this server expect
+        for attempt in range(10):
+            async with self.session.get(f"{self.upstream}/{endpoint}", params=params) as response:
+                if response.status == 200:
+                    return await response.read()
+                if response.status not in (202, 429, 503):
+                    raise web.HTTPBadGateway(text=f"Upstream returned status {response.status}")
+            await asyncio.sleep(2 ** attempt)
+        raise web.HTTPGatewayTimeout(text="Upstream did not answer in time")
+
+    async def _recordThings(self, ids: [int]) -> dict[int, str]:
+        recorded = {}
+        content = await self._fetchUpstream("thing", {"id": ",".join(map(str, ids)), "stats": 1})
+        os.makedirs(os.path.join(self.fixturesDir, "thing"), exist_ok=True)
+        for item in ElementTree.fromstring(content).iter("item"):
+            xml = ElementTree.tostring(item, encoding="unicode")
+            recorded[int(item.get("id"))] = xml
+            with open(os.path.join(self.fixturesDir, "thing", f"{item.get('id')}.xml"), "w", encoding="utf-8") as fixture:
+                fixture.write(xml)
+        return recorded
+
+    async def _thing(self, request: web.Request) -> web.Response:
+        injected = await self._inject()
+        if injected is not None:
+            return injected
+        ids = [int(value) for value in request.query.get("id", "").split(",") if value.strip().isdigit()]
+        items: dict[int, str] = {}
+        for bggID in ids:
+            path = os.path.join(self.fixturesDir, "thing", f"{bggID}.xml")
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as fixture:
+                    items[bggID] = fixture.read()
+        missing = [bggID for bggID in ids if bggID not in items]
+        if len(missing) > 0 and self.upstream is not None:
+            items.update(await self._recordThings(missing))
+        elif self.synthetic:
+            items.update({bggID: syntheticThing(bggID) for bggID in missing})
+        self.stats["things"] += len(items)
+        # Unknown IDs are left out of the response, the same way BGG does it
+        body = "".join(items[bggID] for bggID in ids if bggID in items)
+        return self._xmlResponse(f'<?xml version="1.0" encoding="utf-8"?><items termsofuse="{TERMS_OF_USE}">{body}</items>')
+
+    async def _search(self, request: web.Request) -> web.Response:
+        injected = await self._inject()
+        if injected is not None:
+            return injected
+        query = request.query.get("query", "")
+        self.stats["searches"] += 1
+        path = os.path.join(self.fixturesDir, "search", f"{searchFixtureName(query)}.xml")
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as fixture:
+                return self._xmlResponse(fixture.read())
+        if self.upstream is not None:
+            content = (await self._fetchUpstream("search", {"query": query})).decode("utf-8")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as fixture:
+                fixture.write(content)
+            return self._xmlResponse(content)
+        if self.synthetic:
+            return self._xmlResponse(syntheticSearch(query))
+        return self._xmlResponse(f'<?xml version="1.0" encoding="utf-8"?><items total="0" termsofuse="{TERMS_OF_USE}"></items>')
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+
+async def serve(server: FakeBGGServer, host: str, port: int):
+    baseURL = await server.start(host, port)
+    print(f"Serving BGG fixtures from '{server.fixturesDir}' at {baseURL}, set it as bgg.baseURL in the config")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the BoardGameGeek XML API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds on top of the latency")
+    parser.add_argument("--queued-rate", type=float, default=0.0, help="Fraction of requests answered with 202")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--no-synthetic", action="store_true", help="Leave out IDs without a recording instead of generating them")
+    parser.add_argument("--record", metavar="UPSTREAM", help="Forward requests without a recording to this API and record the answers")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeBGGServer(args.fixtures, args.latency, args.jitter, args.queued_rate, args.throttle_rate, args.retry_after,
+                           not args.no_synthetic, args.record, args.seed)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from src.database import DBManager
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+# Fixed dates keep the generated data identical between runs, every open borrow ends up overdue
+BASE_DATE = datetime(2023, 1, 1)
+CATEGORIES = ["Strategy", "Party", "Cards", "Cooperative", "Deck Building", "Dice", "Fantasy", "Horror", "Puzzle", "Racing",
+              "Sci-Fi", "Trivia", "Worker Placement", "Economic", "Abstract", "Adventure", "Novel", "Literature", "Manga", "Comic"]
+SUGGESTION_TYPES = ["BOARD", "BOOK", "SWITCH", "PS4", "PS5", "XBOX", "DECK"]
+SUGGESTION_STATUSES = ["PENDING"] * 6 + ["ACCEPTED", "REJECTED", "BOUGHT"]
+
+
+def formatDate(date: datetime) -> str:
+    return date.isoformat(" ")
+
+
+def openDatabase(path: str) -> DBManager:
+    # DBManager resolves its query files relative to src, and only skips the default data when the file already exists
+    path = os.path.abspath(path)
+    os.chdir(SRC_DIR)
+    if not os.path.exists(path):
+        open(path, "w").close()
+    with contextlib.redirect_stdout(io.StringIO()):
+        return DBManager(path)
+
+
+def generateItems(rng: random.Random, count: int) -> dict[str, list]:
+    rows: dict[str, list] = {"items": [], "boardgames": [], "videogames": [], "books": [], "categories": []}
+    for itemID in range(1, count + 1):
+        roll = rng.random()
+        itemType = "boardgame" if roll < 0.4 else "videogame" if roll < 0.7 else "book"
+        rows["items"].append((itemID, f"{itemType.capitalize()} {itemID:06d}", rng.randint(10, 300), f"Synthetic {itemType} number {itemID}",
+                              "https://i.imgur.com/OJhoTqu.png", itemType, rng.randint(1, 3)))
+        if itemType == "boardgame":
+            bggID = itemID if rng.random() < 0.8 else -1
+            rows["boardgames"].append((itemID, rng.randint(1, 2), rng.randint(2, 8), bggID, round(rng.uniform(5, 8), 2), round(rng.uniform(5, 9), 2),
+                                       rng.randint(1, 20000), rng.randint(0, 5), rng.randint(0, 5), formatDate(BASE_DATE) if bggID > 0 else None))
+        elif itemType == "videogame":
+            rows["videogames"].append((itemID, 1, rng.randint(1, 4), rng.randint(5, 120), rng.randint(0, 5), rng.randint(0, 5)))
+        else:
+            rows["books"].append((itemID, f"Author {rng.randint(1, count // 10 + 1)}"))
+        for category in rng.sample(CATEGORIES, rng.randint(0, 5)):
+            rows["categories"].append((itemID, category))
+    return rows
+
+
+def generateBorrows(rng: random.Random, count: int, items: int, users: int, openRatio: float) -> list:
+    borrows = []
+    openPairs = set()
+    firstOpen = count - int(count * openRatio)
+    # Spacing retrievals apart keeps the (user, item, retrieval_date) key unique
+    step = max(1, int(timedelta(days=365).total_seconds() // max(count, 1)))
+    for i in range(count):
+        user = rng.randint(1, users)
+        item = rng.randint(1, items)
+        retrieval = BASE_DATE + timedelta(seconds=i * step)
+        planned = retrieval + timedelta(days=14)
+        if i >= firstOpen and (user, item) not in openPairs:
+            openPairs.add((user, item))
+            returned = None
+        else:
+            returned = formatDate(retrieval + timedelta(minutes=rng.randint(60, 60 * 24 * 30)))
+        borrows.append((user, item, 1, formatDate(retrieval), formatDate(retrieval), formatDate(planned), returned))
+    return borrows
+
+
+def generateSuggestions(rng: random.Random, count: int, votes: int, users: int) -> (list, list):
+    suggestions = []
+    for i in range(count):
+        suggestionType = rng.choice(SUGGESTION_TYPES)
+        suggestions.append((f"[{suggestionType}] Suggestion {i:06d}", suggestionType, rng.randint(1, users), rng.choice(SUGGESTION_STATUSES),
+                            formatDate(BASE_DATE + timedelta(minutes=i))))
+    # Every suggestion keeps its proposer's vote, the rest are spread randomly without duplicates
+    votePairs = {(name, proposer) for name, _, proposer, _, _ in suggestions}
+    while len(votePairs) < max(votes, len(suggestions)) and len(votePairs) < count * users:
+        votePairs.add((suggestions[rng.randrange(count)][0], rng.randint(1, users)))
+    return suggestions, sorted(votePairs)
+
+
+def generateDatabase(path: str, items: int = 10000, borrows: int = 1000000, users: int = 2000, suggestions: int = 5000, votes: int = 50000,
+                     interests: int = 5000, openRatio: float = 0.005, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    path = os.path.abspath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+    db = openDatabase(path)
+    start = time.perf_counter()
+
+    itemRows = generateItems(rng, items)
+    borrowRows = generateBorrows(rng, borrows, items, users, openRatio)
+    suggestionRows, voteRows = generateSuggestions(rng, suggestions, votes, users)
+    interestRows = sorted({(rng.randint(1, users), rng.randint(1, items)) for _ in range(interests)})
+
+    with db.connection:
+        db.connection.executemany("INSERT INTO items (id, name, length, description, thumbnail, type, copies) VALUES (?, ?, ?, ?, ?, ?, ?)", itemRows["items"])
+        db.connection.executemany("INSERT INTO boardgames (id, min_players, max_players, bgg_id, bgg_rating, bgg_average_rating, bgg_rank, learn_difficulty, play_difficulty, bgg_synced_at) "
+                                  "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", itemRows["boardgames"])
+        db.connection.executemany("INSERT INTO videogames (id, min_players, max_players, playing_time, difficulty, platform) VALUES (?, ?, ?, ?, ?, ?)", itemRows["videogames"])
+        db.connection.executemany("INSERT INTO books (id, author) VALUES (?, ?)", itemRows["books"])
+        db.connection.executemany("INSERT INTO categories (id, category) VALUES (?, ?)", itemRows["categories"])
+        # Going through the borrows triggers keeps the availability counters and the stats rollups consistent
+        db.connection.executemany("INSERT INTO borrows (user, item, amount, retrieval_date, register_date, planned_return, returned) VALUES (?, ?, ?, ?, ?, ?, ?)", borrowRows)
+        db.connection.executemany("INSERT INTO suggestions (name, suggestion_type, proposer, status, proposed_date) VALUES (?, ?, ?, ?, ?)", suggestionRows)
+        db.connection.executemany("INSERT INTO suggestion_votes (name, user) VALUES (?, ?)", voteRows)
+        db.connection.executemany("INSERT INTO interests (user, item) VALUES (?, ?)", interestRows)
+    db.connection.execute("ANALYZE")
+    db.connection.close()
+
+    return {
+        "seed": seed,
+        "items": items,
+        "borrows": borrows,
+        "openBorrows": sum(1 for row in borrowRows if row[6] is None),
+        "users": users,
+        "suggestions": suggestions,
+        "votes": len(voteRows),
+        "interests": len(interestRows),
+        "generationTime": time.perf_counter() - start
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a SQLite database with synthetic GDT-Bot data")
+    parser.add_argument("path")
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--borrows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--suggestions", type=int, default=5000)
+    parser.add_argument("--votes", type=int, default=50000)
+    parser.add_argument("--interests", type=int, default=5000)
+    parser.add_argument("--open-ratio", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    scale = generateDatabase(args.path, args.items, args.borrows, args.users, args.suggestions, args.votes, args.interests, args.open_ratio, args.seed)
+    print(f"Generated {scale['items']} items, {scale['borrows']} borrows ({scale['openBorrows']} open), {scale['suggestions']} suggestions "
+          f"and {scale['votes']} votes in {scale['generationTime']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import sqlite3 as SQLite
+import time
+from datetime import datetime, timedelta
+
+from src.database import ObjectType, dict_factory
+from src.embed_helpers.common import Difficulty, Platform
+
+
+# The row factory as it was before converter plans, kept to measure against
+def legacy_dict_factory(cursor, row):
+    d = {}
+    for idx, col in enumerate(cursor.description):
+        d[col[0]] = row[idx]
+        if col[0] in ["play_difficulty", "learn_difficulty", "difficulty"]:
+            d[col[0]] = Difficulty(d[col[0]])
+        if col[0] == "platform":
+            d[col[0]] = Platform(d[col[0]])
+        if col[0] == "type":
+            d[col[0]] = ObjectType(d[col[0]] + "s")
+        if col[0] in ["returned", "planned_return", "retrieval_date", "register_date", "declared_date"]:
+            if d[col[0]] is not None:
+                try:
+                    d[col[0]] = datetime.strptime(d[col[0]], "%Y-%m-%d %H:%M:%S")
+                except ValueError:
+                    try:
+                        d[col[0]] = datetime.strptime(d[col[0]], "%Y-%m-%d %H:%M:%S.%f")
+                    except ValueError:
+                        d[col[0]] = datetime.strptime(d[col[0]], "%Y-%m-%d")
+            else:
+                d[col[0]] = None
+        if col[0] == "categories":
+            d[col[0]] = d[col[0]].split(",") if d[col[0]] is not None else []
+    return d
+
+
+QUERIES = {
+    "borrows": "SELECT user, item, amount, retrieval_date, planned_return, returned FROM borrows",
+    "catalog": "SELECT id, name, type, register_date, play_difficulty, learn_difficulty, categories FROM catalog"
+}
+
+
+def createDatabase(rows: int) -> SQLite.Connection:
+    connection = SQLite.connect(":memory:")
+    connection.execute("CREATE TABLE borrows (user INTEGER, item INTEGER, amount INTEGER, retrieval_date DATETIME, planned_return DATETIME, returned DATETIME)")
+    connection.execute("CREATE TABLE catalog (id INTEGER, name TEXT, type TEXT, register_date DATETIME, play_difficulty INTEGER, learn_difficulty INTEGER, categories TEXT)")
+    start = datetime(2020, 1, 1)
+    borrows = []
+    for i in range(rows):
+        retrieval = start + timedelta(minutes=i * 7)
+        # The three date formats that end up in the database: CURRENT_TIMESTAMP, the datetime adapter and plain dates
+        returned = None if i % 5 == 0 else str(retrieval + timedelta(days=3, microseconds=i % 1000 + 1))
+        borrows.append((i % 300, i % 1000, 1, str(retrieval.replace(microsecond=0)), str((retrieval + timedelta(days=7)).date()), returned))
+    connection.executemany("INSERT INTO borrows VALUES (?, ?, ?, ?, ?, ?)", borrows)
+    catalog = [(i, f"Item {i}", ["boardgame", "videogame", "book"][i % 3], str(start + timedelta(hours=i)), i % 6, (i + 1) % 6, "Strategy,Party,Cards")
+               for i in range(rows)]
+    connection.executemany("INSERT INTO catalog VALUES (?, ?, ?, ?, ?, ?, ?)", catalog)
+    return connection
+
+
+def timeFactory(connection: SQLite.Connection, factory, query: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        cursor = connection.cursor()
+        cursor.row_factory = factory
+        start = time.perf_counter()
+        cursor.execute(query).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the row factory against the previous per-cell implementation")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    connection = createDatabase(args.rows)
+    for name, query in QUERIES.items():
+        cursor = connection.cursor()
+        cursor.row_factory = legacy_dict_factory
+        expected = cursor.execute(query).fetchall()
+        cursor.row_factory = dict_factory
+        if cursor.execute(query).fetchall() != expected:
+            raise AssertionError(f"Row factories disagree on the {name} query")
+
+        legacy = timeFactory(connection, legacy_dict_factory, query, args.repeat)
+        current = timeFactory(connection, dict_factory, query, args.repeat)
+        print(f"{name}: {args.rows} rows, legacy {legacy * 1000:.1f}ms, current {current * 1000:.1f}ms ({legacy / current:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+import argparse
+import inspect
+import json
+import os
+import platform
+import shutil
+import sqlite3 as SQLite
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import count
+
+from benchmarks.generate import generateDatabase, openDatabase
+from src.database import DBManager, ObjectType, dict_factory
+from src.embed_helpers.boardgame import BoardGameObj
+from src.embed_helpers.common import Difficulty, Platform
+
+# Methods that only manage the singleton
+SKIPPED_METHODS = {"initInstance", "getInstance"}
+BENCHMARK_COPIES = 1000000
+
+
+class Case:
+    def __init__(self, name: str, function, fixed: bool = False):
+        self.name: str = name
+        self.function = function
+        # Fixed cases always run the same number of times, so the case after them can undo every call
+        self.fixed: bool = fixed
+
+
+def buildCases(db: DBManager) -> [Case]:
+    cursor = db.connection.cursor()
+    itemID = cursor.execute("SELECT id FROM boardgames ORDER BY id LIMIT 1").fetchone()['id']
+    # Enough copies that every borrowItem call takes the successful path
+    db.editCopies(itemID, BENCHMARK_COPIES)
+    itemName = db.getItemNameFromID(itemID)
+    bggID = db.getBBGIDFromID(itemID)
+    bggIDs = [row['bgg_id'] for row in cursor.execute("SELECT bgg_id FROM boardgames WHERE bgg_id > 0 ORDER BY id LIMIT 20").fetchall()]
+    heavyUser = cursor.execute("SELECT user FROM borrows GROUP BY user ORDER BY COUNT(*) DESC LIMIT 1").fetchone()['user']
+    openBorrowers = [row['user'] for row in cursor.execute("SELECT DISTINCT user FROM borrows WHERE returned IS NULL ORDER BY user").fetchall()]
+    openBorrow = cursor.execute("SELECT user, item FROM borrows WHERE returned IS NULL ORDER BY user, item LIMIT 1").fetchone()
+    suggestion = cursor.execute("SELECT name FROM suggestions ORDER BY name LIMIT 1").fetchone()['name']
+    boardgames = db.getFilteredList(ObjectType.BOARDGAME, "", "", limit=100)
+    pages = {itemType: db.getFilteredList(itemType, "", "", limit=10) for itemType in ObjectType}
+
+    rawCursor = db.connection.cursor()
+    rawCursor.row_factory = None
+    rawBorrows = rawCursor.execute("SELECT * FROM borrows LIMIT 10000").fetchall()
+
+    # Write benchmarks come in pairs, the second case of each pair undoes the calls of the first one
+    newUsers = count(cursor.execute("SELECT IFNULL(MAX(user), 0) + 1 AS user FROM borrows").fetchone()['user'])
+    numbers = count()
+    borrowed: list[tuple[int, int]] = []
+    claims: list[str] = []
+    insertedItems: list[str] = []
+    addedSuggestions: list[str] = []
+    returningUsers = iter(openBorrowers)
+
+    def borrow():
+        user = next(newUsers)
+        borrowed.append((user, itemID))
+        return db.borrowItem(user, itemID, datetime.now() + timedelta(days=7), None)
+
+    def claim():
+        claims.append(f"benchmark-{next(numbers)}")
+        return db.claimReminders(claims[-1])
+
+    def insertBoardgame():
+        insertedItems.append(f"Benchmark boardgame {next(numbers)}")
+        return db.insertBoardgame(BoardGameObj(-1, insertedItems[-1], 2, 4, 60, 1, 1, categories=["Strategy", "Cards"]))
+
+    def insertVideogame():
+        insertedItems.append(f"Benchmark videogame {next(numbers)}")
+        return db.insertVideogame(insertedItems[-1], Platform.SWITCH, Difficulty.EASY, 1, 4, 30, 1)
+
+    def insertBook():
+        insertedItems.append(f"Benchmark book {next(numbers)}")
+        return db.insertBook(insertedItems[-1], "Author", 100, "Novel", "Abstract", 1)
+
+    def addSuggestion():
+        addedSuggestions.append(f"[BOARD] Benchmark suggestion {next(numbers)}")
+        return db.addSuggestion(1, addedSuggestions[-1], "BOARD")
+
+    def cycle(values: list):
+        calls = count()
+        return lambda: values[next(calls) % len(values)]
+
+    nextSuggestion = {name: cycle(addedSuggestions) for name in ["vote", "unvote", "status"]}
+
+    return [
+        Case("reloadQueries", db.reloadQueries),
+        Case("checkQueryPlans", db.checkQueryPlans),
+        Case("searchIDsFromName", lambda: db.searchIDsFromName("000 12")),
+        Case("searchIDsFromName[short]", lambda: db.searchIDsFromName("12")),
+        Case("getItemIDFromName", lambda: db.getItemIDFromName(itemName)),
+        Case("getItemsToBorrowFromName", lambda: db.getItemsToBorrowFromName(heavyUser, "game 0001")),
+        Case("getItemsToReturnFromName", lambda: db.getItemsToReturnFromName(heavyUser, "game 0001")),
+        Case("getItemNameFromID", lambda: db.getItemNameFromID(itemID)),
+        Case("getItemAvailableCopies", lambda: db.getItemAvailableCopies(itemID)),
+        Case("countFilteredList", lambda: db.countFilteredList(ObjectType.BOARDGAME, "", "min>=2")),
+        *[Case(f"getFilteredList[{itemType.value}]", lambda itemType=itemType: db.getFilteredList(itemType, "", "")) for itemType in ObjectType],
+        Case("getFilteredList[page]", lambda: db.getFilteredList(ObjectType.BOARDGAME, "", "min>=2", True, 10, 50)),
+        Case("getItemData", lambda: db.getItemData(ObjectType.BOARDGAME, itemID)),
+        Case("getBorrowsList[user]", lambda: db.getBorrowsList(user=heavyUser)),
+        Case("getBorrowsList[item]", lambda: db.getBorrowsList(item=itemID)),
+        Case("getBorrowsList[current]", lambda: db.getBorrowsList(current=True)),
+        Case("getBorrowsList[all]", lambda: db.getBorrowsList()),
+        Case("getBorrowsAmount", lambda: db.getBorrowsAmount(heavyUser, False)),
+        *[Case(f"getBorrowStats[user,{order}]", lambda order=order: db.getBorrowStats(order, "user")) for order in ["total", "time", "current"]],
+        *[Case(f"getBorrowStats[item,{order}]", lambda order=order: db.getBorrowStats(order, "item")) for order in ["total", "time", "usertime"]],
+        Case("getReminders", db.getReminders),
+        Case("getInterested", lambda: db.getInterested(itemID)),
+        Case("getUnsyncedBoardgames", lambda: db.getUnsyncedBoardgames(0, 100)),
+        Case("getDMFailures", lambda: db.getDMFailures(7)),
+        Case("getSuggestionNames", db.getSuggestionNames),
+        Case("getSuggestionAlternatives", lambda: db.getSuggestionAlternatives("Sugestion 00012")),
+        Case("getSuggestion", lambda: db.getSuggestion(suggestion)),
+        Case("getSuggestions[page]", lambda: db.getSuggestions(limit=9)),
+        Case("getSuggestions[voters]", lambda: db.getSuggestions(limit=9, withVoters=True)),
+        Case("getSuggestions[all]", lambda: db.getSuggestions(True, True)),
+        Case("getIDFromBGGID", lambda: db.getIDFromBGGID(bggID)),
+        Case("getBoardgamesFromBGGIDs", lambda: db.getBoardgamesFromBGGIDs(bggIDs)),
+        Case("getBBGIDFromID", lambda: db.getBBGIDFromID(itemID)),
+        Case("getBGGIDFromName", lambda: db.getBGGIDFromName("game 0001")),
+        Case("execute", lambda: db.execute("SELECT COUNT(*) FROM borrows")),
+        Case("dict_factory", lambda: [dict_factory(rawCursor, row) for row in rawBorrows]),
+        *[Case(f"getEmbed[{itemType.value}]", lambda page=page: [item.getEmbed([]) for item in page]) for itemType, page in pages.items()],
+        *[Case(f"getEmbed[{itemType.value},compact]", lambda page=page: [item.getEmbed(["compact"]) for item in page]) for itemType, page in pages.items()],
+
+        Case("borrowItem", borrow, True),
+        Case("returnItem", lambda: db.returnItem(*borrowed.pop()), True),
+        Case("returnAllItems", lambda: db.returnAllItems(next(returningUsers)), True),
+        Case("claimReminders", claim, True),
+        Case("finishReminders", lambda: db.finishReminders([], claims.pop()), True),
+        Case("declareInterest", lambda: db.declareInterest(openBorrow['user'], itemID), True),
+        Case("cancelInterest", lambda: db.cancelInterest(openBorrow['user'], itemID), True),
+        Case("addDMFailure", lambda: db.addDMFailure(openBorrow['user'], "Benchmark")),
+        Case("addCopies", lambda: db.addCopies(itemID, 0)),
+        Case("editCopies", lambda: db.editCopies(itemID, BENCHMARK_COPIES)),
+        Case("updateBoardgamesFromBGG", lambda: db.updateBoardgamesFromBGG(boardgames)),
+        Case("insertBoardgame", insertBoardgame, True),
+        Case("deleteBoardgame", lambda: db.deleteBoardgame(db.getItemIDFromName(insertedItems.pop())), True),
+        Case("insertVideogame", insertVideogame, True),
+        Case("deleteVideogame", lambda: db.deleteVideogame(db.getItemIDFromName(insertedItems.pop())), True),
+        Case("insertBook", insertBook, True),
+        Case("deleteBook", lambda: db.deleteBook(db.getItemIDFromName(insertedItems.pop())), True),
+        Case("addSuggestion", addSuggestion, True),
+        Case("voteSuggestion", lambda: db.voteSuggestion(2, nextSuggestion["vote"]()), True),
+        Case("unvoteSuggestion", lambda: db.unvoteSuggestion(2, nextSuggestion["unvote"]()), True),
+        Case("updateSuggestionStatus", lambda: db.updateSuggestionStatus(nextSuggestion["status"](), "ACCEPTED"), True),
+        Case("deleteSuggestion", lambda: db.deleteSuggestion(addedSuggestions.pop()), True),
+        Case("repairAvailability", db.repairAvailability)
+    ]
+
+
+def runCase(db: DBManager, case: Case, repeat: int, budget: float) -> dict:
+    timings = []
+    rejected = []
+    start = time.perf_counter()
+    try:
+        case.function()
+        while len(timings) < repeat and (case.fixed or len(timings) < 3 or time.perf_counter() - start < budget):
+            callStart = time.perf_counter()
+            result = case.function()
+            timings.append(time.perf_counter() - callStart)
+            # Methods answering (False, message) took their early exit, which is worth knowing when reading the timings
+            if isinstance(result, tuple) and len(result) == 2 and result[0] is False:
+                rejected.append(result[1])
+    except Exception as e:
+        if db.connection.in_transaction:
+            db.connection.rollback()
+        return {"error": repr(e)}
+    return {
+        "calls": len(timings),
+        "rejected": len(rejected),
+        "rejection": rejected[-1] if len(rejected) > 0 else None,
+        "min": min(timings) * 1000,
+        "median": statistics.median(timings) * 1000,
+        "mean": statistics.fmean(timings) * 1000,
+        "max": max(timings) * 1000
+    }
+
+
+def getCommit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def runSuite(databasePath: str, repeat: int, budget: float, only: [str] = None) -> dict:
+    # Write benchmarks run on a copy so the generated database can be reused between commits
+    workDir = tempfile.mkdtemp()
+    workPath = os.path.join(workDir, "benchmark.sqlite")
+    shutil.copyfile(databasePath, workPath)
+    db = openDatabase(workPath)
+    try:
+        cases = [case for case in buildCases(db) if only is None or case.name.split("[")[0] in only]
+        results = {}
+        for case in cases:
+            results[case.name] = runCase(db, case, repeat, budget)
+            result = results[case.name]
+            if "error" in result:
+                print(f"{case.name:45} {result['error']}")
+            else:
+                print(f"{case.name:45} {result['median']:10.3f}ms median over {result['calls']} calls"
+                      + (f", {result['rejected']} rejected: {result['rejection']}" if result['rejected'] > 0 else ""))
+        covered = {case.name.split("[")[0] for case in cases}
+        methods = {name for name, _ in inspect.getmembers(DBManager, inspect.isfunction) if not name.startswith("_")} - SKIPPED_METHODS
+        return {"results": results, "uncovered": sorted(methods - covered) if only is None else []}
+    finally:
+        db.connection.close()
+        shutil.rmtree(workDir, ignore_errors=True)
+
+
+def compareReports(base: dict, current: dict):
+    print(f"{'case':45} {'base':>12} {'current':>12} {'ratio':>8}")
+    for name, result in current["results"].items():
+        before = base["results"].get(name)
+        if before is None or "error" in before or "error" in result:
+            continue
+        print(f"{name:45} {before['median']:10.3f}ms {result['median']:10.3f}ms {result['median'] / max(before['median'], 1e-9):7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every public DBManager method against a synthetic database")
+    parser.add_argument("--database", help="Generated database to reuse, one is generated next to the report otherwise")
+    parser.add_argument("--output", default="benchmark_report.json")
+    parser.add_argument("--compare", help="Earlier report to compare the medians against")
+    parser.add_argument("--only", nargs="*", help="Only run the cases of these methods")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--budget", type=float, default=2.0, help="Seconds after which read cases stop repeating")
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--borrows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--suggestions", type=int, default=5000)
+    parser.add_argument("--votes", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    compare = os.path.abspath(args.compare) if args.compare else None
+    commit = getCommit()
+    scale = None
+    if args.database is None:
+        databasePath = os.path.splitext(output)[0] + ".sqlite"
+        print("Generating database...")
+        scale = generateDatabase(databasePath, args.items, args.borrows, args.users, args.suggestions, args.votes, seed=args.seed)
+    else:
+        databasePath = os.path.abspath(args.database)
+
+    report = {
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "sqlite": SQLite.sqlite_version,
+        "platform": platform.platform(),
+        "scale": scale,
+        "repeat": args.repeat,
+        **runSuite(databasePath, args.repeat, args.budget, args.only)
+    }
+    with open(output, "w") as data:
+        json.dump(report, data, indent=4, sort_keys=True)
+    if len(report["uncovered"]) > 0:
+        print(f"Methods without a benchmark: {', '.join(report['uncovered'])}")
+    print(f"Report written to {output}")
+
+    if compare is not None:
+        with open(compare, "r") as data:
+            compareReports(json.load(data), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Any
+
+from src.database import DBManager
+from src.metrics import timedPhase
+
+
+class AsyncDBManager:
+    instance: 'AsyncDBManager' = None
+
+    def __init__(self, manager: DBManager):
+        self.manager: DBManager = manager
+        # SQLite connections are not safe to share between concurrent threads, so every query runs on the same worker
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="database")
+
+    def __getattr__(self, name: str):
+        method = getattr(self.manager, name)
+        if not callable(method):
+            raise AttributeError(f"'{type(self.manager).__name__}.{name}' is not a method")
+
+        async def call(*args, **kwargs):
+            return await self.run(method, *args, **kwargs)
+
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, name, call)
+        return call
+
+    @timedPhase("db")
+    async def run(self, function: Callable, *args, **kwargs) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(function, *args, **kwargs))
+
+    def getDataVersion(self) -> int:
+        # Grows with every row the database changes, reading it does not need to go through the executor
+        return self.manager.connection.total_changes
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    @staticmethod
+    def initInstance(manager: DBManager):
+        AsyncDBManager.instance = AsyncDBManager(manager)
+
+    @staticmethod
+    def getInstance() -> 'AsyncDBManager':
+        if AsyncDBManager.instance is None:
+            AsyncDBManager.initInstance(DBManager.getInstance())
+        return AsyncDBManager.instance
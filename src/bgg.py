@@ -1,62 +1,184 @@
+import asyncio
+import time
+from itertools import islice
 from typing import Callable
 
-import requests
-import xmltodict
-from urllib import parse
+import aiohttp
 
-from src.database import DBManager, ObjectType
+from src.async_database import AsyncDBManager
+from src.bgg_cache import BGGCache
+from src.bgg_parser import iterSearchIDs, iterThings
 from src.embed_helpers.boardgame import BoardGameObj
+from src.metrics import timedPhase
 
+BGG_API_URL: str = "https://boardgamegeek.com/xmlapi2"
+# 202 means BGG queued the request and the data will be ready on a later attempt
+RETRY_STATUSES: set[int] = {202, 429, 500, 502, 503, 504}
 
-def fetchBGGIDsFromName(name: str):
-    ids = []
-    url = f"https://boardgamegeek.com/xmlapi2/search?query={parse.quote_plus(name)}"
-    response = requests.get(url)
-    response.raise_for_status()
-    items = xmltodict.parse(response.content)
-    if "items" not in items or "item" not in items["items"]:
-        return None
-    items = items["items"]["item"]
-    items = [items] if isinstance(items, dict) else items
-    for item in items:
-        if item["@type"] != "boardgame":
-            continue
-        ids.append(int(item["@id"]))
-    if len(ids) == 0:
-        return None
-    if len(ids) > 200:
-        return ids[:200]
+
+class BGGError(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate: float = rate
+        self.capacity: int = capacity
+        self.tokens: float = capacity
+        self.updated: float = time.monotonic()
+        self.lock: asyncio.Lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class BGGClient:
+    instance: 'BGGClient' = None
+
+    def __init__(self, baseURL: str = BGG_API_URL, timeout: float = 30.0, connections: int = 4,
+                 requestsPerSecond: float = 2.0, burst: int = 4, maxRetries: int = 4, retryDelay: float = 2.0):
+        self.baseURL: str = baseURL
+        self.timeout: aiohttp.ClientTimeout = aiohttp.ClientTimeout(total=timeout)
+        self.connections: int = connections
+        self.rateLimit: TokenBucket = TokenBucket(requestsPerSecond, burst)
+        self.maxRetries: int = maxRetries
+        self.retryDelay: float = retryDelay
+        self.session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> 'BGGClient':
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def _getSession(self) -> aiohttp.ClientSession:
+        # The session is created lazily so it is bound to the event loop that actually uses it
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.connections, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self.session
+
+    async def _get(self, endpoint: str, params: dict) -> bytes:
+        for attempt in range(self.maxRetries + 1):
+            await self.rateLimit.acquire()
+            delay = self.retryDelay * 2 ** attempt
+            try:
+                async with self._getSession().get(f"{self.baseURL}/{endpoint}", params=params) as response:
+                    if response.status == 200:
+                        return await response.read()
+                    if response.status not in RETRY_STATUSES:
+                        raise BGGError(f"BGG returned status {response.status} for '{endpoint}'")
+                    error = BGGError(f"BGG returned status {response.status} for '{endpoint}' after {attempt + 1} attempts")
+                    retryAfter = response.headers.get("Retry-After", "")
+                    if retryAfter.isdigit():
+                        delay = max(delay, int(retryAfter))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                error = BGGError(f"Could not reach BGG for '{endpoint}': {e!r}")
+            if attempt < self.maxRetries:
+                await asyncio.sleep(delay)
+        raise error
+
+    @timedPhase("bgg")
+    async def search(self, query: str) -> bytes:
+        return await self._get("search", {"query": query})
+
+    @timedPhase("bgg")
+    async def thing(self, ids: [int]) -> bytes:
+        return await self._get("thing", {"id": ",".join(map(str, ids)), "stats": 1})
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    @staticmethod
+    def initInstance(baseURL: str = BGG_API_URL, **settings):
+        BGGClient.instance = BGGClient(baseURL, **settings)
+
+    @staticmethod
+    def getInstance() -> 'BGGClient':
+        if BGGClient.instance is None:
+            BGGClient.initInstance()
+        return BGGClient.instance
+
+
+async def fetchBGGIDsFromName(name: str, client: BGGClient = None):
+    found, ids = await BGGCache.getInstance().getSearch(name)
+    if found:
+        return ids
+    if client is None:
+        client = BGGClient.getInstance()
+    ids = list(islice(iterSearchIDs(await client.search(name)), 200))
+    ids = ids if len(ids) > 0 else None
+    await BGGCache.getInstance().putSearch(name, ids)
     return ids
 
 
-def fetchBGGameData(ids: [int], extraData: dict = None, updateCallback: Callable[[int], None] = None) -> [BoardGameObj]:
-    games = []
-    # fetch in batches of 20 games
-    for i in range(0, len(ids), 20):
-        nextAmount = min(20, len(ids) - i)
-        url = f'https://boardgamegeek.com/xmlapi2/thing?id={",".join(map(str, ids[i:i + nextAmount]))}&stats=1'
-        response = requests.get(url)
-        response.raise_for_status()
-
-        if extraData is None:
-            extraData = {}
-
-        for key in ids:
-            if key not in extraData:
-                res = DBManager.getInstance().getItemData(ObjectType.BOARDGAME, DBManager.getInstance().getIDFromBGGID(key))
-                if res:
-                    extraData[key] = res.getDict()
-
-        items = xmltodict.parse(response.content)
-        if "items" not in items or "item" not in items["items"]:
-            return None
-        items = items["items"]["item"]
-        items = [items] if isinstance(items, dict) else items
-        for item in items:
-            if item["@type"] != "boardgame" and item["@type"] != "boardgameexpansion":
-                continue
-            game = BoardGameObj.createFromBGG(item, extraData[int(item["@id"])] if int(item["@id"]) in extraData else None)
-            games.append(game)
+async def fetchBGGameData(ids: [int], extraData: dict = None, updateCallback: Callable[[int], None] = None, client: BGGClient = None) -> [BoardGameObj]:
+    if client is None:
+        client = BGGClient.getInstance()
+    if extraData is None:
+        extraData = {}
+
+    # Local data for every requested game is resolved with a single query
+    missingLocal = [key for key in ids if key not in extraData]
+    if len(missingLocal) > 0:
+        extraData.update(await AsyncDBManager.getInstance().getBoardgamesFromBGGIDs(missingLocal))
+
+    things = await BGGCache.getInstance().getThings(ids)
+    missing = [key for key in ids if key not in things]
+    if updateCallback and len(things) > 0:
+        updateCallback(len(things))
+
+    async def fetchBatch(batch: [int]):
+        fetched = {thing["id"]: thing for thing in iterThings(await client.thing(batch))}
+        # IDs that BGG did not return are cached as negative results
+        fetched.update({key: None for key in batch if key not in fetched})
+        await BGGCache.getInstance().putThings(fetched)
+        things.update(fetched)
         if updateCallback:
-            updateCallback(len(games))
+            updateCallback(len(things))
+
+    # fetch in batches of 20 games, a failed batch is skipped instead of failing the whole call
+    batches = [missing[i:i + 20] for i in range(0, len(missing), 20)]
+    results = await asyncio.gather(*[fetchBatch(batch) for batch in batches], return_exceptions=True)
+    for batch, result in zip(batches, results):
+        if isinstance(result, Exception):
+            print(f"Failed to fetch BGG games {batch}: {result}")
+
+    games = []
+    for key in ids:
+        thing = things.get(key)
+        if thing is None or thing["type"] not in ("boardgame", "boardgameexpansion"):
+            continue
+        games.append(BoardGameObj.createFromBGG(thing, extraData[key] if key in extraData else None))
     return games
+
+
+async def syncBoardgamesWithBGG(batchSize: int = 100, client: BGGClient = None, retryDays: int = 7) -> int:
+    # Each batch is marked as synced once it is stored, so an interrupted sync resumes with the batches that are still missing.
+    # Games that BGG did not return are marked as failed and skipped until retryDays have passed, instead of on every start
+    synced = 0
+    lastID = -1
+    while True:
+        pending = await AsyncDBManager.getInstance().getUnsyncedBoardgames(lastID, batchSize, retryDays)
+        if len(pending) == 0:
+            break
+        lastID = pending[-1]['id']
+        games = await fetchBGGameData([row['bgg_id'] for row in pending], client=client)
+        synced += await AsyncDBManager.getInstance().updateBoardgamesFromBGG(games)
+        returned = {game.id for game in games}
+        failed = [row['id'] for row in pending if row['id'] not in returned]
+        if len(failed) > 0:
+            await AsyncDBManager.getInstance().markBoardgamesSyncFailed(failed)
+            print(f"BGG did not return {len(failed)} boardgames, they are tried again in {retryDays} days")
+        print(f"Synced {synced} boardgames with BGG")
+    return synced
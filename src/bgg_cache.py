@@ -0,0 +1,150 @@
+import asyncio
+import json
+import sqlite3 as SQLite
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+SEARCH_TTL: float = 24 * 60 * 60
+THING_TTL: float = 24 * 60 * 60
+NEGATIVE_TTL: float = 60 * 60
+MAX_ENTRIES: int = 5000
+# Tables are only recounted once their estimated size passes the limit, the recount then evicts down to 90% of it
+EVICTION_RATIO: float = 0.1
+# Bump when the cached format changes, outdated caches are dropped on startup
+CACHE_VERSION: int = 2
+
+
+class BGGCache:
+    instance: 'BGGCache' = None
+
+    def __init__(self, path: str, maxEntries: int = MAX_ENTRIES):
+        self.path: str = path
+        self.maxEntries: int = maxEntries
+        self.hits: dict[str, int] = {"search": 0, "thing": 0}
+        self.misses: dict[str, int] = {"search": 0, "thing": 0}
+        # Like AsyncDBManager, the cache runs its queries on a single worker to keep SQLite off the event loop
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bgg_cache")
+        self.connection: SQLite.Connection = SQLite.connect(path, check_same_thread=False)
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != CACHE_VERSION:
+            self.connection.executescript(f"""
+                DROP TABLE IF EXISTS searches;
+                DROP TABLE IF EXISTS things;
+                PRAGMA user_version = {CACHE_VERSION};
+            """)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS searches (
+                query TEXT NOT NULL PRIMARY KEY,
+                ids TEXT,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS things (
+                bgg_id INTEGER NOT NULL PRIMARY KEY,
+                content TEXT,
+                fetched_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS searches_fetched_at ON searches(fetched_at);
+            CREATE INDEX IF NOT EXISTS things_fetched_at ON things(fetched_at);
+        """)
+        # Upper bounds of the table sizes, replaced rows are counted as new until the next eviction recounts them
+        self.counts: dict[str, int] = {table: self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ("searches", "things")}
+
+    def __del__(self):
+        self.executor.shutdown(wait=False)
+        self.connection.close()
+
+    async def run(self, function: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(function, *args))
+
+    @staticmethod
+    def _isFresh(value, fetchedAt: float, now: float, ttl: float) -> bool:
+        return now - fetchedAt < (ttl if value is not None else NEGATIVE_TTL)
+
+    async def getSearch(self, query: str) -> (bool, list[int] | None):
+        return await self.run(self._getSearch, query)
+
+    def _getSearch(self, query: str) -> (bool, list[int] | None):
+        row = self.connection.execute("SELECT ids, fetched_at FROM searches WHERE query = ?", (query.strip().lower(),)).fetchone()
+        if row is None or not BGGCache._isFresh(row[0], row[1], time.time(), SEARCH_TTL):
+            self.misses["search"] += 1
+            return False, None
+        self.hits["search"] += 1
+        return True, json.loads(row[0]) if row[0] is not None else None
+
+    async def putSearch(self, query: str, ids: list[int] | None):
+        await self.run(self._putSearch, query, ids)
+
+    def _putSearch(self, query: str, ids: list[int] | None):
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO searches (query, ids, fetched_at) VALUES (?, ?, ?)",
+                                    (query.strip().lower(), json.dumps(ids) if ids is not None else None, time.time()))
+            self._countInserted("searches", 1)
+
+    async def getThings(self, ids: [int]) -> dict[int, dict | None]:
+        return await self.run(self._getThings, ids)
+
+    def _getThings(self, ids: [int]) -> dict[int, dict | None]:
+        found = {}
+        now = time.time()
+        # Chunked to stay below SQLite's bound parameter limit
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            query = f"SELECT bgg_id, content, fetched_at FROM things WHERE bgg_id IN ({",".join("?" * len(chunk))})"
+            for bggID, content, fetchedAt in self.connection.execute(query, chunk):
+                if BGGCache._isFresh(content, fetchedAt, now, THING_TTL):
+                    found[bggID] = json.loads(content) if content is not None else None
+        self.hits["thing"] += len(found)
+        self.misses["thing"] += len(ids) - len(found)
+        return found
+
+    async def putThings(self, things: dict[int, dict | None]):
+        await self.run(self._putThings, things)
+
+    def _putThings(self, things: dict[int, dict | None]):
+        now = time.time()
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO things (bgg_id, content, fetched_at) VALUES (?, ?, ?)",
+                                        [(bggID, json.dumps(thing) if thing is not None else None, now) for bggID, thing in things.items()])
+            self._countInserted("things", len(things))
+
+    def _countInserted(self, table: str, inserted: int):
+        self.counts[table] += inserted
+        if self.counts[table] <= self.maxEntries:
+            return
+        count = self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        excess = count - int(self.maxEntries * (1 - EVICTION_RATIO))
+        if excess > 0:
+            self.connection.execute(f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} ORDER BY fetched_at LIMIT ?)", (excess,))
+            count -= excess
+        self.counts[table] = count
+
+    async def clear(self):
+        await self.run(self._clear)
+
+    def _clear(self):
+        with self.connection:
+            self.connection.execute("DELETE FROM searches")
+            self.connection.execute("DELETE FROM things")
+        self.counts = {"searches": 0, "things": 0}
+
+    async def getStats(self) -> dict:
+        return await self.run(self._getStats)
+
+    def _getStats(self) -> dict:
+        return {
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "searches": self.connection.execute("SELECT COUNT(*) FROM searches").fetchone()[0],
+            "things": self.connection.execute("SELECT COUNT(*) FROM things").fetchone()[0]
+        }
+
+    @staticmethod
+    def initInstance(path: str):
+        BGGCache.instance = BGGCache(path)
+
+    @staticmethod
+    def getInstance() -> 'BGGCache':
+        if BGGCache.instance is None:
+            BGGCache.initInstance("data_files/bgg_cache.sqlite")
+        return BGGCache.instance
@@ -0,0 +1,80 @@
+from io import BytesIO
+from typing import Iterator
+from xml.etree.ElementTree import iterparse
+
+
+def _toInt(value: str | None, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _toFloat(value: str | None, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _emptyThing() -> dict:
+    return {
+        "id": -1,
+        "type": "",
+        "name": None,
+        "minPlayers": -1,
+        "maxPlayers": -1,
+        "playingTime": -1,
+        "description": "<NO DESCRIPTION>",
+        "thumbnail": "",
+        "categories": [],
+        "rank": None,
+        "averageRating": -1.0,
+        "bggRating": -1.0
+    }
+
+
+def iterSearchIDs(content: bytes, itemType: str = "boardgame") -> Iterator[int]:
+    for _, elem in iterparse(BytesIO(content)):
+        if elem.tag == "item" and elem.get("type") == itemType:
+            yield int(elem.get("id"))
+        elem.clear()
+
+
+def iterThings(content: bytes) -> Iterator[dict]:
+    # Items in a thing response are never nested, so every element that ends belongs to the item that ends next
+    thing = _emptyThing()
+    for _, elem in iterparse(BytesIO(content)):
+        match elem.tag:
+            case "item":
+                thing["id"] = _toInt(elem.get("id"), -1)
+                thing["type"] = elem.get("type", "")
+                thing["rank"] = _toInt(thing["rank"], -1)
+                if thing["name"] is None:
+                    thing["name"] = "<NO NAME ERROR>"
+                yield thing
+                thing = _emptyThing()
+            case "name":
+                if thing["name"] is None:
+                    thing["name"] = elem.get("value")
+            case "minplayers":
+                thing["minPlayers"] = _toInt(elem.get("value"), -1)
+            case "maxplayers":
+                thing["maxPlayers"] = _toInt(elem.get("value"), -1)
+            case "playingtime":
+                thing["playingTime"] = _toInt(elem.get("value"), -1)
+            case "description":
+                thing["description"] = (elem.text or "").strip() or thing["description"]
+            case "thumbnail":
+                thing["thumbnail"] = (elem.text or "").strip()
+            case "link":
+                if elem.get("type") == "boardgamecategory":
+                    thing["categories"].append(elem.get("value", "Unknown"))
+            case "rank":
+                if thing["rank"] is None:
+                    thing["rank"] = elem.get("value")
+            case "average":
+                thing["averageRating"] = _toFloat(elem.get("value"), -1.0)
+            case "bayesaverage":
+                thing["bggRating"] = _toFloat(elem.get("value"), -1.0)
+        elem.clear()
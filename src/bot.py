@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import sys
@@ -8,11 +9,15 @@ from disnake import ApplicationCommandInteraction, Embed, Color
 from disnake.ext.commands import InteractionBot, CommandSyncFlags, CommandError
 
 from src.commands.help_messages import HelperMsgCog
+from src.async_database import AsyncDBManager
+from src.bgg import BGGClient, syncBoardgamesWithBGG
+from src.bgg_cache import BGGCache
 from src.commands.suggestions import SuggestionsCog
 from src.database import DBManager
 from src.commands.general import GeneralCog
 from src.commands.piazza import GamesCog
 from src.commands.boardgamegeek import BoardGamesCog
+from src.metrics import CommandMetrics, instrumentDiscord
 
 configFileName = "data_files/config.json"
 databasePath = "data_files/database.sqlite"
@@ -33,6 +38,12 @@ class BotConfigData:
 
     users: dict = None
 
+    # BGG
+    bggSettings: dict = None
+
+    # METRICS
+    metricsSettings: dict = None
+
 
 def configure() -> BotConfigData | None:
     if not os.path.exists(configFileName):
@@ -48,7 +59,9 @@ def configure() -> BotConfigData | None:
             syncCommandsDebug=data["debug"]["syncCommandsDebug"],
             testGuilds=data["debug"]["testGuilds"],
             errorLogsChannel=data["debug"]["errorLogsChannel"],
-            users=data["users"]
+            users=data["users"],
+            bggSettings=data.get("bgg", {}),
+            metricsSettings=data.get("metrics", {})
         )
 
 
@@ -62,18 +75,38 @@ def main():
         return
 
     DBManager.initInstance(databasePath)
+    AsyncDBManager.initInstance(DBManager.getInstance())
+    # A separate cache keeps responses from a local stand-in (see bgg.baseURL) out of the real one
+    bggSettings = dict(data.bggSettings)
+    BGGCache.initInstance(bggSettings.pop("cachePath", "data_files/bgg_cache.sqlite"))
+    BGGClient.initInstance(**bggSettings)
+    CommandMetrics.initInstance(**data.metricsSettings)
+    instrumentDiscord()
 
     client: InteractionBot = InteractionBot(
         command_sync_flags=CommandSyncFlags(sync_commands_debug=data.syncCommandsDebug),
-        test_guilds=data.testGuilds
+        test_guilds=data.testGuilds,
+        owner_ids=set(data.ownerIDs)
     )
 
     @client.event
     async def on_ready():
         initializeBot(client)
+        # on_ready fires again after reconnecting, the sync only has to be started once
+        if client.bggSync is None:
+            client.bggSync = asyncio.create_task(syncBoardgamesWithBGG())
+        if client.metricsWriter is None:
+            client.metricsWriter = asyncio.create_task(CommandMetrics.getInstance().writePeriodically())
+
+    @client.event
+    async def on_application_command(inter: ApplicationCommandInteraction):
+        # Replaces the default handler, so the commands have to be processed here
+        with CommandMetrics.getInstance().track(inter.data.name):
+            await client.process_application_commands(inter)
 
     @client.event
     async def on_slash_command_error(inter: ApplicationCommandInteraction, error: CommandError):
+        CommandMetrics.getInstance().recordError(inter.data.name)
         embed = Embed(title="Error", description=str(error), color=Color.red())
         embed.add_field(name="Command", value=inter.application_command.name)
         embed.add_field(name="Arguments", value=str(inter.filled_options))
@@ -95,6 +128,8 @@ def main():
     client.add_cog(SuggestionsCog(client))
     client.error_logs_channel = data.errorLogsChannel
     client.userMapping = data.users
+    client.bggSync = None
+    client.metricsWriter = None
 
     client.run(data.token)
 
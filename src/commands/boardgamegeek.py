@@ -1,10 +1,9 @@
-import requests
-import xmltodict
-
 from disnake import ApplicationCommandInteraction, Embed, Color
 from disnake.ext.commands import Cog, slash_command
 
+from src.async_database import AsyncDBManager
 from src.bgg import fetchBGGameData, fetchBGGIDsFromName
+from src.bgg_cache import BGGCache
 from src.embed_helpers.boardgame import BoardGameObj
 from src.utils.paginator import ItemPaginator
 
@@ -17,7 +16,7 @@ class BoardGamesCog(Cog):
     async def fetchBoardgame(self, inter: ApplicationCommandInteraction, query: str, flags: str = "", private: bool = True):
         await inter.response.defer(ephemeral=private)
 
-        ids = fetchBGGIDsFromName(query)
+        ids = await fetchBGGIDsFromName(query)
         print(ids)
         if ids is None:
             try:
@@ -27,7 +26,8 @@ class BoardGamesCog(Cog):
                 await inter.edit_original_response(embed=embed)
                 return
 
-        items = fetchBGGameData(ids)
+        version = AsyncDBManager.getInstance().getDataVersion()
+        items = await fetchBGGameData(ids)
         if len(items) == 0:
             embed = Embed(title=f" Fetching Error", description=f"The game was not found in BGG", color=Color.red())
             await inter.edit_original_response(embed=embed)
@@ -38,7 +38,18 @@ class BoardGamesCog(Cog):
             embed = Embed(title=f" Parsing Error", description=f"Parsing failed successfully", color=Color.red())
             await inter.edit_original_response(embed=embed)
         else:
-            view = ItemPaginator(items, flags, embed)
+            view = ItemPaginator(items, flags, embed, version=version)
             embed.set_footer(text="Use arrows to move between pages")
             view.msg = await inter.original_response()
             await view.msg.edit(embed=embed, view=view)
+
+    @slash_command(name="bggcache", description="Show the BGG cache statistics")
+    async def bggCache(self, inter: ApplicationCommandInteraction, clear: bool = False):
+        await inter.response.defer()
+        if clear:
+            await BGGCache.getInstance().clear()
+        stats = await BGGCache.getInstance().getStats()
+        embed = Embed(title="BGG cache", color=Color.dark_green())
+        embed.add_field(name="Searches", value=f"{stats['searches']} cached\n{stats['hits']['search']} hits / {stats['misses']['search']} misses", inline=True)
+        embed.add_field(name="Games", value=f"{stats['things']} cached\n{stats['hits']['thing']} hits / {stats['misses']['thing']} misses", inline=True)
+        await inter.edit_original_response(embed=embed)
@@ -3,7 +3,10 @@ import random
 from disnake import ApplicationCommandInteraction, Embed, Color, File, Attachment
 from disnake.ext.commands import Cog, slash_command, InteractionBot
 
-from src.database import DBManager
+from src.async_database import AsyncDBManager
+from src.bgg import BGGClient
+from src.metrics import CommandMetrics
+from src.notifications import NotificationDispatcher
 
 
 class GeneralCog(Cog):
@@ -14,6 +17,9 @@ class GeneralCog(Cog):
     async def kill(self, inter: ApplicationCommandInteraction):
         await inter.response.send_message("Shutting down...")
         print("Shutting down...")
+        await NotificationDispatcher.getInstance().close()
+        await BGGClient.getInstance().close()
+        CommandMetrics.getInstance().write()
         await self.bot.close()
 
     @slash_command(name="ping", description="Simple command to test the bot")
@@ -21,10 +27,27 @@ class GeneralCog(Cog):
         await inter.response.send_message("Pong!")
         print("Pong!")
 
+    @slash_command(name="stats", description="Show the latency of the bot's commands")
+    async def stats(self, inter: ApplicationCommandInteraction):
+        if not await self.bot.is_owner(inter.author):
+            await inter.response.send_message("Only the bot owners can see the command stats", ephemeral=True)
+            return
+        embed = Embed(title="Command stats", color=Color.dark_green())
+        # Embeds hold at most 25 fields, the commands that took the most time in total come first
+        for command in CommandMetrics.getInstance().getStats()[:25]:
+            phases = command['phases']
+            embed.add_field(name=f"/{command['command']}", inline=False,
+                            value=f"{command['count']} runs, {command['errors']} errors\n"
+                                  f"avg {command['average'] * 1000:.0f}ms, p50 {command['p50'] * 1000:.0f}ms, p95 {command['p95'] * 1000:.0f}ms, max {command['max'] * 1000:.0f}ms\n"
+                                  f"DB {phases['db'] * 1000:.0f}ms, BGG {phases['bgg'] * 1000:.0f}ms, Discord {phases['discord'] * 1000:.0f}ms per run")
+        if len(embed.fields) == 0:
+            embed.description = "No commands have been run yet"
+        await inter.response.send_message(embed=embed, ephemeral=True)
+
     @slash_command(name="executequery", description="Execute a custom query on the database")
     async def executequery(self, inter: ApplicationCommandInteraction, query: str):
         await inter.response.defer()
-        success, result = DBManager.getInstance().execute(query)
+        success, result = await AsyncDBManager.getInstance().execute(query)
         if len(result) > 4085:
             result = result[:4082] + "..."
         if success:
@@ -37,7 +60,7 @@ class GeneralCog(Cog):
     async def executequeryfile(self, inter: ApplicationCommandInteraction, file: Attachment):
         await inter.response.defer()
         data = (await file.read()).decode('utf-8')
-        success, result = DBManager.getInstance().execute(data)
+        success, result = await AsyncDBManager.getInstance().execute(data)
         if len(result) > 4085:
             result = result[:4082] + "..."
         if success:
@@ -46,6 +69,32 @@ class GeneralCog(Cog):
             embed = Embed(title="Query failed", description=f"Error: {result}", color=Color.red())
         await inter.edit_original_response(embed=embed)
 
+    @slash_command(name="reloadqueries", description="Reload the query files from disk")
+    async def reloadqueries(self, inter: ApplicationCommandInteraction):
+        if not await self.bot.is_owner(inter.author):
+            await inter.response.send_message("Only the bot owners can use this command", ephemeral=True)
+            return
+        await inter.response.defer()
+        success, result = await AsyncDBManager.getInstance().reloadQueries()
+        if success:
+            embed = Embed(title="Queries reloaded", description=result, color=Color.green())
+        else:
+            embed = Embed(title="Query reload failed", description=f"Error: {result}", color=Color.red())
+        await inter.edit_original_response(embed=embed)
+
+    @slash_command(name="repairavailability", description="Recompute the available copies of every item from the borrow history")
+    async def repairavailability(self, inter: ApplicationCommandInteraction):
+        if not await self.bot.is_owner(inter.author):
+            await inter.response.send_message("Only the bot owners can use this command", ephemeral=True)
+            return
+        await inter.response.defer()
+        success, result = await AsyncDBManager.getInstance().repairAvailability()
+        if success:
+            embed = Embed(title="Availability repaired", description=result, color=Color.green())
+        else:
+            embed = Embed(title="Availability repair failed", description=f"Error: {result}", color=Color.red())
+        await inter.edit_original_response(embed=embed)
+
 
     @slash_command(name="killallhumans", description="K, time to ill all humans")
     async def killallhumans(self, inter: ApplicationCommandInteraction):
@@ -6,36 +6,48 @@ from disnake import ApplicationCommandInteraction, Embed, Color, Member
 from disnake.ext.tasks import loop
 from disnake.ext.commands import Cog, slash_command
 
-from src.database import ObjectType, DBManager
-from src.embed_helpers.book import BookObj
+from src.async_database import AsyncDBManager
+from src.bgg import fetchBGGameData
+from src.database import ObjectType
 from src.embed_helpers.common import Difficulty, Platform, getBorrowsListEmbed, getBorrowsStatsEmbed, getBorrowsItemStatsEmbed
+from src.notifications import NotificationDispatcher
+from src.reminders import ReminderRunner
 from src.utils.borrow_paginator import BorrowPaginator
-from src.utils.paginator import ItemPaginator
+from src.utils.member_resolver import MemberResolver
+from src.utils.paginator import ItemPaginator, ITEMS_PER_FETCH
 
 
 class GamesCog(Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.reminderRunner: ReminderRunner = ReminderRunner(bot)
+
+    async def cog_load(self):
+        self.reminders.start()
+
+    def cog_unload(self):
+        self.reminders.cancel()
 
     @loop(time=time(hour=8, minute=0, tzinfo=pytz.timezone('Europe/Stockholm')))
     async def reminders(self):
-        borrows = DBManager.getInstance().getReminders()
-        for borrow in borrows:
-            user = self.bot.get_user(borrow['user'])
-            if user is None:
-                continue
-            if borrow['return_status'] == 'overdue':
-                embed = Embed(title="Reminder", description=f"You are overdue to return {borrow['item_name']} ", color=Color.red())
-            else:
-                embed = Embed(title="Reminder", description=f"You are cheduled to return {borrow['item_name']} " + borrow['return_status'], color=Color.red())
-            await user.send(embed=embed)
-            DBManager.getInstance().setReminderSent(borrow['user'], borrow['item'])
+        await self.reminderRunner.run()
         print("Reminders sent at " + datetime.now(tz=pytz.timezone('Europe/Stockholm')).strftime("%Y-%m-%d %H:%M:%S"))
 
     @slash_command(name="insertbg", description="Insert a new boardgame into the database")
     async def insertBoardgame(self, inter: ApplicationCommandInteraction, bgg_code: int, play_difficulty: str = "undefined", learn_difficulty: str = "undefined", copies: int = 1):
         await inter.response.defer()
-        if DBManager.getInstance().insertBoardgame(bgg_code, Difficulty[play_difficulty.upper()], Difficulty[learn_difficulty.upper()], copies):
+        itemID = await AsyncDBManager.getInstance().getIDFromBGGID(bgg_code)
+        if itemID != -1:
+            success = await AsyncDBManager.getInstance().addCopies(itemID, copies)
+        else:
+            extraData = {bgg_code: {
+                "play_difficulty": Difficulty[play_difficulty.upper()],
+                "learn_difficulty": Difficulty[learn_difficulty.upper()],
+                "copies": copies
+            }}
+            games = await fetchBGGameData([bgg_code], extraData)
+            success = len(games) > 0 and await AsyncDBManager.getInstance().insertBoardgame(games[0])
+        if success:
             embed: Embed = Embed(title="Boardgame inserted", description=f"Boardgame inserted successfully", color=Color.green())
         else:
             embed: Embed = Embed(title="Error inserting boardgame", description=f"Error inserting boardgame, is the BGG ID correct?", color=Color.red())
@@ -44,7 +56,7 @@ class GamesCog(Cog):
     @slash_command(name="insertvg", description="Insert a new videogame into the database")
     async def insertVideogame(self, inter: ApplicationCommandInteraction, name: str, platform: str, min_players: int, max_players: int, length: int, difficulty: str = "undefined", copies: int = 1):
         await inter.response.defer()
-        if DBManager.getInstance().insertVideogame(name, Platform[platform.upper()], Difficulty[difficulty.upper()], min_players, max_players, length, copies):
+        if await AsyncDBManager.getInstance().insertVideogame(name, Platform[platform.upper()], Difficulty[difficulty.upper()], min_players, max_players, length, copies):
             embed: Embed = Embed(title="Videogame inserted", description=f"Videogame {name} inserted successfully", color=Color.green())
         else:
             embed: Embed = Embed(title="Error inserting videogame", description=f"Error inserting videogame {name}, is it already present?", color=Color.red())
@@ -53,7 +65,7 @@ class GamesCog(Cog):
     @slash_command(name="insertbook", description="Insert a new book into the database")
     async def insertBook(self, inter: ApplicationCommandInteraction, name: str, author: str, pages: int, genre: str, abstract: str = "", copies: int = 1):
         await inter.response.defer()
-        if DBManager.getInstance().insertBook(name, author, pages, genre, abstract, copies):
+        if await AsyncDBManager.getInstance().insertBook(name, author, pages, genre, abstract, copies):
             embed: Embed = Embed(title="Book inserted", description=f"Book {name} inserted successfully", color=Color.green())
         else:
             embed: Embed = Embed(title="Error inserting book", description=f"Error inserting book {name}, is it already present?", color=Color.red())
@@ -73,12 +85,12 @@ class GamesCog(Cog):
         if max_length > 0:
             filters.append(f"length<={max_length}")
         filterStr: str = ", ".join(filters)
-        games: [dict] = DBManager.getInstance().getFilteredList(ObjectType.BOARDGAME, "", filterStr)
-        if len(games) == 0:
+        total: int = await AsyncDBManager.getInstance().countFilteredList(ObjectType.BOARDGAME, "", filterStr)
+        if total == 0:
             embed: Embed = Embed(title="No boardgames found", description="No boardgames found with the specified filters", color=Color.red())
             await inter.edit_original_response(embed=embed)
             return
-        await self._sendQueryEmbed(inter, games, flags)
+        await self._sendQueryEmbed(inter, ObjectType.BOARDGAME, filterStr, total, flags)
 
     @slash_command(name="vgsearch", description="Simple command to get the list of videogames with some filters")
     async def getVideogames(self, inter: ApplicationCommandInteraction, name: str = "", max_difficulty: str = "", player_count: int = 0, platform: str = "", flags: str = "", private: bool = True):
@@ -94,12 +106,12 @@ class GamesCog(Cog):
         if platform:
             filters.append(f"platform=={platform}")
         filterStr: str = ", ".join(filters)
-        games: [dict] = DBManager.getInstance().getFilteredList(ObjectType.VIDEOGAME, "", filterStr)
-        if len(games) == 0:
+        total: int = await AsyncDBManager.getInstance().countFilteredList(ObjectType.VIDEOGAME, "", filterStr)
+        if total == 0:
             embed: Embed = Embed(title="No videogames found", description="No videogames found with the specified filters", color=Color.red())
             await inter.edit_original_message(embed=embed)
             return
-        await self._sendQueryEmbed(inter, games, flags)
+        await self._sendQueryEmbed(inter, ObjectType.VIDEOGAME, filterStr, total, flags)
 
     @slash_command(name="booksearch", description="Simple command to get the list of books with some filters")
     async def getBooks(self, inter: ApplicationCommandInteraction, name: str = "", author: str = "", genre: str = "", min_pages: int = 0, flags: str = "", private: bool = True):
@@ -114,55 +126,53 @@ class GamesCog(Cog):
         if min_pages > 0:
             filters.append(f"pages>={min_pages}")
         filterStr: str = ", ".join(filters)
-        books: [BookObj] = DBManager.getInstance().getFilteredList(ObjectType.BOOK, "", filterStr)
-        if len(books) == 0:
+        total: int = await AsyncDBManager.getInstance().countFilteredList(ObjectType.BOOK, "", filterStr)
+        if total == 0:
             embed: Embed = Embed(title="No books found", description="No books found with the specified filters", color=Color.red())
             await inter.edit_original_message(embed=embed)
             return
-        await self._sendQueryEmbed(inter, books, flags)
+        await self._sendQueryEmbed(inter, ObjectType.BOOK, filterStr, total, flags)
 
     @slash_command(name="interest", description="Declare interest in borrowing an item from Piazza")
     async def declareInterest(self, inter: ApplicationCommandInteraction, item: str):
         await inter.response.defer()
-        itemID = DBManager.getInstance().getItemIDFromName(item)
+        itemID = await AsyncDBManager.getInstance().getItemIDFromName(item)
         if itemID == -1:
             embed = Embed(title="Error declaring interest", description="Item not found", color=Color.red())
             await inter.edit_original_response(embed=embed)
             return
-        data = DBManager.getInstance().getBorrowsList(inter.user.id, itemID, True)
-        success = DBManager.getInstance().declareInterest(inter.user.id, itemID)
+        data = await AsyncDBManager.getInstance().getBorrowsList(inter.user.id, itemID, True)
+        success = await AsyncDBManager.getInstance().declareInterest(inter.user.id, itemID)
         if not success:
             embed = Embed(title="Error declaring interest", description="You have already declared interest for this item", color=Color.red())
             await inter.edit_original_response(embed=embed)
             return
+        itemName = await AsyncDBManager.getInstance().getItemNameFromID(itemID)
         embed = Embed(
-            title=f"Someone declared interest for the game {DBManager.getInstance().getItemNameFromID(itemID)}",
+            title=f"Someone declared interest for the game {itemName}",
             description="Don't worry! This does not mean you have to return it right away. It just means someone wants to borrow it too. Just make sure to return it as soon as you are done with it!",
             color=Color.orange())
-        for entry in data:
-            userObj = await inter.guild.fetch_member(entry['user'])
-            if userObj.id == inter.user.id:
-                continue
-            await userObj.send(embed=embed)
+        NotificationDispatcher.getInstance().notify(inter.guild, [entry['user'] for entry in data if entry['user'] != inter.user.id], embed)
         embed = Embed(title="Interest declared successfully", description="You will be notified when someone returns or borrows the game", color=Color.green())
         await inter.edit_original_response(embed=embed)
 
     @slash_command(name="uninterest", description="Cancel interest in borrowing an item from Piazza")
     async def cancelInterest(self, inter: ApplicationCommandInteraction, item: str):
         await inter.response.defer()
-        itemID = DBManager.getInstance().getItemIDFromName(item)
+        itemID = await AsyncDBManager.getInstance().getItemIDFromName(item)
         if itemID == -1:
             embed = Embed(title="Error cancelling interest", description="Item not found", color=Color.red())
             await inter.edit_original_response(embed=embed)
             return
-        success = DBManager.getInstance().cancelInterest(inter.user.id, itemID)
+        success = await AsyncDBManager.getInstance().cancelInterest(inter.user.id, itemID)
         if not success:
             embed = Embed(title="Error cancelling interest", description="You have not declared interest for this item", color=Color.red())
             await inter.edit_original_response(embed=embed)
             return
+        itemName = await AsyncDBManager.getInstance().getItemNameFromID(itemID)
         embed = Embed(
             title=f"Cancelled interest successfully",
-            description=f"You will no longer be notified when someone returns or borows the game {DBManager.getInstance().getItemNameFromID(itemID)}",
+            description=f"You will no longer be notified when someone returns or borows the game {itemName}",
             color=Color.orange())
         await inter.edit_original_response(embed=embed)
 
@@ -179,13 +189,13 @@ class GamesCog(Cog):
             success = False
             message = "Error parsing dates, please use the format YYYY-MM-DD"
         else:
-            itemIDs = DBManager.getInstance().getItemsToBorrowFromName(inter.user.id, item)
+            itemIDs = await AsyncDBManager.getInstance().getItemsToBorrowFromName(inter.user.id, item)
             if len(itemIDs) == 0:
                 success = False
                 message = "Item not found"
             elif len(itemIDs) > 1:
                 success = False
-                gameNames = ["- " + DBManager.getInstance().getItemNameFromID(entry) for entry in itemIDs]
+                gameNames = ["- " + await AsyncDBManager.getInstance().getItemNameFromID(entry) for entry in itemIDs]
                 if len(gameNames) > 15:
                     gameList = "\n".join(gameNames[:15]) + f"\n(+{len(gameNames) - 15})"
                 else:
@@ -193,23 +203,20 @@ class GamesCog(Cog):
                 message = "**Multiple items found:**\n" + gameList + "\n\n**Please be more specific.**"
             else:
                 itemID = itemIDs[0]
-                success, message = DBManager.getInstance().borrowItem(inter.user.id, itemID, planned_return, retrieval_date)
+                success, message = await AsyncDBManager.getInstance().borrowItem(inter.user.id, itemID, planned_return, retrieval_date)
         if success:
-            data = DBManager.getInstance().getInterested(itemID)
-            availableCopies = DBManager.getInstance().getItemAvailableCopies(itemID)
+            data = await AsyncDBManager.getInstance().getInterested(itemID)
+            availableCopies = await AsyncDBManager.getInstance().getItemAvailableCopies(itemID)
             if availableCopies == 0:
                 description = "There are no available copies of this game at the moment. You will be notified when someone returns it."
             else:
                 description = f"There are still {availableCopies} available copies of this game."
-            dmEmbed = Embed(title=f"Someone borrowed the game {DBManager.getInstance().getItemNameFromID(itemID)}", description=description, color=Color.orange() if availableCopies == 0 else Color.yellow())
-            removedInterest = False
-            for entry in data:
-                if entry['user'] == inter.user.id:
-                    DBManager.getInstance().cancelInterest(entry['user'], itemID)
-                    removedInterest = True
-                    continue
-                userObj = await inter.guild.fetch_member(entry['user'])
-                await userObj.send(embed=dmEmbed)
+            itemName = await AsyncDBManager.getInstance().getItemNameFromID(itemID)
+            dmEmbed = Embed(title=f"Someone borrowed the game {itemName}", description=description, color=Color.orange() if availableCopies == 0 else Color.yellow())
+            removedInterest = any(entry['user'] == inter.user.id for entry in data)
+            if removedInterest:
+                await AsyncDBManager.getInstance().cancelInterest(inter.user.id, itemID)
+            NotificationDispatcher.getInstance().notify(inter.guild, [entry['user'] for entry in data if entry['user'] != inter.user.id], dmEmbed)
             if removedInterest:
                 message += "\nYou have been removed from the interest list for this game."
             embed: Embed = Embed(title="Item borrowed", description=message, color=Color.green())
@@ -220,12 +227,12 @@ class GamesCog(Cog):
     @slash_command(name="returnall", description="Return all items you borrowed from Piazza")
     async def returnAllItems(self, inter: ApplicationCommandInteraction):
         await inter.response.defer()
-        amount = DBManager.getInstance().getBorrowsAmount(inter.user.id, True)
+        amount = await AsyncDBManager.getInstance().getBorrowsAmount(inter.user.id, True)
         if amount == 0:
             embed = Embed(title="Error returning items", description="You have not borrowed any items from Piazza", color=Color.red())
             await inter.edit_original_response(embed=embed)
             return
-        success, message = DBManager.getInstance().returnAllItems(inter.user.id)
+        success, message = await AsyncDBManager.getInstance().returnAllItems(inter.user.id)
         if not success:
             embed = Embed(title="Error returning items", description=message, color=Color.red())
             await inter.edit_original_response(embed=embed)
@@ -236,13 +243,13 @@ class GamesCog(Cog):
     @slash_command(name="return", description="Return something you borrowed to Piazza")
     async def returnItem(self, inter: ApplicationCommandInteraction, item: str):
         await inter.response.defer()
-        itemIDs = DBManager.getInstance().getItemsToReturnFromName(inter.user.id, item)
+        itemIDs = await AsyncDBManager.getInstance().getItemsToReturnFromName(inter.user.id, item)
         if len(itemIDs) == 0:
             embed = Embed(title="Error returning item", description="Item not found", color=Color.red())
             await inter.edit_original_response(embed=embed)
             return
         elif len(itemIDs) > 1:
-            gameNames = ["- " + DBManager.getInstance().getItemNameFromID(entry) for entry in itemIDs]
+            gameNames = ["- " + await AsyncDBManager.getInstance().getItemNameFromID(entry) for entry in itemIDs]
             if len(gameNames) > 15:
                 gameList = "\n".join(gameNames[:15]) + f"\n(+{len(gameNames) - 15})"
             else:
@@ -252,33 +259,33 @@ class GamesCog(Cog):
             return
         else:
             itemID = itemIDs[0]
-            success, message = DBManager.getInstance().returnItem(inter.user.id, itemID)
+            success, message = await AsyncDBManager.getInstance().returnItem(inter.user.id, itemID)
         if not success:
             embed = Embed(title="Error returning item", description=message, color=Color.red())
             await inter.edit_original_response(embed=embed)
             return
         embed = Embed(title="Item returned", description=message, color=Color.green())
         await inter.edit_original_response(embed=embed)
-        data = DBManager.getInstance().getInterested(itemID)
-        availableCopies = DBManager.getInstance().getItemAvailableCopies(itemID)
+        data = await AsyncDBManager.getInstance().getInterested(itemID)
+        availableCopies = await AsyncDBManager.getInstance().getItemAvailableCopies(itemID)
         description = f"There are {availableCopies} available copies of this game."
-        dmEmbed = Embed(title=f"Someone returned the game {DBManager.getInstance().getItemNameFromID(itemID)}", description=description, color=Color.green())
-        for entry in data:
-            userObj = await inter.guild.fetch_member(entry['user'])
-            await userObj.send(embed=dmEmbed)
+        itemName = await AsyncDBManager.getInstance().getItemNameFromID(itemID)
+        dmEmbed = Embed(title=f"Someone returned the game {itemName}", description=description, color=Color.green())
+        NotificationDispatcher.getInstance().notify(inter.guild, [entry['user'] for entry in data], dmEmbed)
 
     @staticmethod
     async def execGetBorrowsCommand(inter: ApplicationCommandInteraction, current: bool, user: Member = None, private: bool = True):
         await inter.response.defer(ephemeral=private)
-        amount = DBManager.getInstance().getBorrowsAmount(user.id if user is not None else None, current)
+        amount = await AsyncDBManager.getInstance().getBorrowsAmount(user.id if user is not None else None, current)
         if amount == 0:
             titleAppend = (" by " + (user.nick if user.nick is not None else user.name)) if user is not None else ""
             embed: Embed = Embed(title="Items borrowed" + titleAppend, description="No items have been borrowed from Piazza" + titleAppend, color=Color.red())
             await inter.edit_original_response(embed=embed)
             return
-        items = DBManager.getInstance().getBorrowsList(user.id if user is not None else None, None, current)
+        items = await AsyncDBManager.getInstance().getBorrowsList(user.id if user is not None else None, None, current)
+        # A mention only needs the user ID, Discord renders the name on its side
         for item in items:
-            item['user'] = (await inter.guild.fetch_member(item['user'])).mention
+            item['user'] = f"<@{item['user']}>"
         embed = getBorrowsListEmbed(items[:9], user, current)
         view = BorrowPaginator(items, embed, partial(getBorrowsListEmbed, user=user, current=current))
         view.msg = await inter.original_response()
@@ -308,24 +315,45 @@ class GamesCog(Cog):
                 order = "total"
             if order == "amount" or order == "count":
                 order = "total"
-        data = DBManager.getInstance().getBorrowStats(order, target)
+        data = await AsyncDBManager.getInstance().getBorrowStats(order, target)
         if len(data) == 0:
             embed = Embed(title="No borrow stats retrieved", description="Either this is a very weird error or no one has borrowed anything yet", color=Color.red())
             await inter.edit_original_response(embed=embed)
             return
         for count, entry in enumerate(data):
             entry['rank'] = count + 1
-            entry['user'] = await inter.guild.fetch_member(entry['user'])
+
+        # Members are only resolved for the page being shown, pages that were already visited keep theirs
+        async def resolveMembers(entries: [dict]):
+            pending = [entry for entry in entries if 'member' not in entry]
+            members = await MemberResolver.getInstance().resolveMany(inter.guild, [entry['user'] for entry in pending])
+            for entry in pending:
+                entry['member'] = members.get(entry['user'])
+
+        if target == "user":
+            await resolveMembers(data[:9])
         embed = getBorrowsStatsEmbed(data[:9], order) if target == "user" else getBorrowsItemStatsEmbed(data[:9], order)
-        view = BorrowPaginator(data, embed, partial(getBorrowsStatsEmbed, order=order) if target == "user" else partial(getBorrowsItemStatsEmbed, order=order))
+        view = BorrowPaginator(data, embed, partial(getBorrowsStatsEmbed, order=order) if target == "user" else partial(getBorrowsItemStatsEmbed, order=order), resolveMembers if target == "user" else None)
         view.msg = await inter.original_response()
         embed.set_footer(text="Use arrows to move between pages")
         await view.msg.edit(embed=embed, view=view)
 
     @staticmethod
-    async def _sendQueryEmbed(inter: ApplicationCommandInteraction, items: list, flags: str):
+    async def _sendQueryEmbed(inter: ApplicationCommandInteraction, itemType: ObjectType, filterStr: str, total: int, flags: str):
+        async def fetchItems(offset: int, limit: int) -> list:
+            return await AsyncDBManager.getInstance().getFilteredList(itemType, "", filterStr, False, limit, offset)
+
+        version = AsyncDBManager.getInstance().getDataVersion()
+        items = await fetchItems(0, ITEMS_PER_FETCH)
+        if len(items) == 0:
+            # The items were removed after they were counted
+            embed = Embed(title="No items found", description="No items found with the specified filters", color=Color.red())
+            await inter.edit_original_response(embed=embed)
+            return
+        if len(items) < ITEMS_PER_FETCH:
+            total = len(items)
         embed = items[0].getEmbed([flag.strip() for flag in flags.split(",")])
-        view = ItemPaginator(items, flags, embed)
+        view = ItemPaginator(items, flags, embed, total, fetchItems, version)
         embed.set_footer(text="Use arrows to move between pages")
         view.msg = await inter.original_response()
         await view.msg.edit(embed=embed, view=view)
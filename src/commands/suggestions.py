@@ -4,12 +4,10 @@ from functools import partial
 from disnake import ApplicationCommandInteraction, Embed, Color
 from disnake.ext.commands import Cog, InteractionBot, slash_command
 
-from src.database import DBManager
-
-from fuzzywuzzy import fuzz
+from src.async_database import AsyncDBManager
 
 from src.utils.confirm import ConfirmDialog
-from src.utils.suggestion_paginator import SuggestionPaginator
+from src.utils.suggestion_paginator import SuggestionPaginator, SUGGESTIONS_PER_PAGE
 
 
 class SuggestionType(Enum):
@@ -34,20 +32,21 @@ class SuggestionsCog(Cog):
         self.bot: InteractionBot = bot
 
     @staticmethod
-    def getAlternatives(suggestion: str):
-        names = DBManager.getInstance().getSuggestionNames()
-        similar = []
-        for name in names:
-            score = fuzz.partial_ratio(name, suggestion)
-            similar.append((score, name))
-        similar.sort(key=lambda x: x[0], reverse=True)
-        names = [s[1] for s in similar][:(3 if len(similar) > 3 else len(similar))]
-        return names
+    async def getAlternatives(suggestion: str, suggestionType: str = ""):
+        return await AsyncDBManager.getInstance().getSuggestionAlternatives(suggestion, suggestionType)
+
+    @staticmethod
+    def formatSuggestions(suggestions: [dict], start: int) -> [str]:
+        items = []
+        for i, suggestion in enumerate(suggestions):
+            status = SuggestionStatus[suggestion['status']].value
+            items.append(f"**{start + i + 1}.** {status} {suggestion['name']}  **({suggestion['votes']}⭐)**")
+        return items
 
     @slash_command(name="suggest", description="Suggest a feature for the bot")
     async def suggest(self, inter: ApplicationCommandInteraction, suggestion: str, type: str):
-        def confirmInsertion(author: int, suggestionName: str, suggestion_type: str):
-            success, message = DBManager.getInstance().addSuggestion(author, suggestionName, suggestion_type)
+        async def confirmInsertion(author: int, suggestionName: str, suggestion_type: str):
+            success, message = await AsyncDBManager.getInstance().addSuggestion(author, suggestionName, suggestion_type)
             if not success:
                 newEmbed: Embed = Embed(title="Suggestion failed", description=message, color=Color.red())
             else:
@@ -62,7 +61,7 @@ class SuggestionsCog(Cog):
 
         suggestionType = SuggestionType[type.upper()]
         suggestion = f"[{suggestionType.value}] {suggestion}"
-        names = SuggestionsCog.getAlternatives(suggestion)
+        names = await SuggestionsCog.getAlternatives(suggestion, suggestionType.name)
         if len(names) > 0:
             string = "Before you continue, these are the most similar suggestions found:"
             for name in names:
@@ -73,13 +72,13 @@ class SuggestionsCog(Cog):
             msg = await inter.original_response()
             await msg.edit(embed=embed, view=view)
         else:
-            embed = confirmInsertion(inter.author.id, suggestion, suggestionType.name)
+            embed = await confirmInsertion(inter.author.id, suggestion, suggestionType.name)
             await inter.edit_original_response(embed=embed)
 
     @slash_command(name="votesuggestion", description="Vote a suggestion")
     async def vote(self, inter: ApplicationCommandInteraction, suggestion: str):
-        def confirmVote(authorID: int, suggestionName: str, voteCount: int):
-            succ, errMsg = DBManager.getInstance().voteSuggestion(authorID, suggestionName)
+        async def confirmVote(authorID: int, suggestionName: str, voteCount: int):
+            succ, errMsg = await AsyncDBManager.getInstance().voteSuggestion(authorID, suggestionName)
             if not succ:
                 newEmbed = Embed(title="Vote failed", description=errMsg, color=Color.red())
             else:
@@ -87,15 +86,15 @@ class SuggestionsCog(Cog):
             return newEmbed
 
         await inter.response.defer()
-        suggestionData, votes = DBManager.getInstance().getSuggestion(suggestion)
+        suggestionData, votes = await AsyncDBManager.getInstance().getSuggestion(suggestion)
         if suggestionData is None:
-            names = SuggestionsCog.getAlternatives(suggestion)
+            names = await SuggestionsCog.getAlternatives(suggestion)
             if len(names) > 0:
                 string = "Did you mean:"
                 for name in names:
                     string += f"\n**- {name}**"
                 embed = Embed(title="Suggestion not found", description=string, color=Color.red())
-                suggestionData, votes = DBManager.getInstance().getSuggestion(names[0])
+                suggestionData, votes = await AsyncDBManager.getInstance().getSuggestion(names[0])
                 view = ConfirmDialog(embed, partial(confirmVote, inter.author.id, suggestionData['name'], len(votes) + 1), inter.author.id, "Vote First Suggestion", "Cancel")
                 msg = await inter.original_response()
                 await msg.edit(embed=embed, view=view)
@@ -107,23 +106,23 @@ class SuggestionsCog(Cog):
                 embed = Embed(title="Vote failed", description="Suggestion is already bought or is rejected", color=Color.red())
                 await inter.edit_original_response(embed=embed)
                 return
-            embed = confirmVote(authorID=inter.author.id, suggestionName=suggestionData['name'], voteCount=len(votes) + 1)
+            embed = await confirmVote(authorID=inter.author.id, suggestionName=suggestionData['name'], voteCount=len(votes) + 1)
             await inter.edit_original_response(embed=embed)
 
     @slash_command(name="getsuggestions", description="Get all suggestions")
     async def getsuggestions(self, inter: ApplicationCommandInteraction, showrejected: bool = False, showbought: bool = False, private: bool = True):
         await inter.response.defer(ephemeral=private)
-        suggestions = DBManager.getInstance().getSuggestions(showrejected, showbought)
-        if len(suggestions) == 0:
+
+        async def fetchPage(page: int) -> [str]:
+            _, pageSuggestions = await AsyncDBManager.getInstance().getSuggestions(showrejected, showbought, SUGGESTIONS_PER_PAGE, page * SUGGESTIONS_PER_PAGE)
+            return SuggestionsCog.formatSuggestions(pageSuggestions, page * SUGGESTIONS_PER_PAGE)
+
+        total, suggestions = await AsyncDBManager.getInstance().getSuggestions(showrejected, showbought, SUGGESTIONS_PER_PAGE)
+        if total == 0:
             embed = Embed(title="No suggestions", description="No suggestions have been made yet", color=Color.red())
             await inter.edit_original_response(embed=embed)
             return
-        suggestions.sort(key=lambda x: len(x['votes']), reverse=True)
-        items = []
-        for i, suggestion in enumerate(suggestions):
-            status = SuggestionStatus[suggestion['status']].value
-            items.append(f"**{i + 1}.** {status} {suggestion['name']}  **({len(suggestion['votes'])}⭐)**")
-        view = SuggestionPaginator(items)
+        view = SuggestionPaginator(SuggestionsCog.formatSuggestions(suggestions, 0), total, fetchPage)
         msg = await inter.original_response()
         await msg.edit(view=view, embed=view.embed)
 
@@ -131,9 +130,9 @@ class SuggestionsCog(Cog):
     async def updatestatus(self, inter: ApplicationCommandInteraction, suggestion: str, status: str):
         await inter.response.defer()
         status = SuggestionStatus[status.upper()]
-        success, message = DBManager.getInstance().updateSuggestionStatus(suggestion, status.name)
+        success, message = await AsyncDBManager.getInstance().updateSuggestionStatus(suggestion, status.name)
         if not success:
-            names = SuggestionsCog.getAlternatives(suggestion)
+            names = await SuggestionsCog.getAlternatives(suggestion)
             if len(names) > 0:
                 string = "Did you mean:"
                 for name in names:
@@ -149,12 +148,12 @@ class SuggestionsCog(Cog):
     @slash_command(name="mergesuggestion", description="Merge two suggestions into one")
     async def mergesuggestion(self, inter: ApplicationCommandInteraction, suggestion1: str, suggestion2: str):
         await inter.response.defer()
-        suggestion1Data = DBManager.getInstance().getSuggestion(suggestion1)
-        suggestion2Data = DBManager.getInstance().getSuggestion(suggestion2)
+        suggestion1Data = await AsyncDBManager.getInstance().getSuggestion(suggestion1)
+        suggestion2Data = await AsyncDBManager.getInstance().getSuggestion(suggestion2)
         for vote in suggestion2Data['votes']:
             if vote not in suggestion1Data['votes']:
-                DBManager.getInstance().voteSuggestion(vote, suggestion1)
-        success, _ = DBManager.getInstance().deleteSuggestion(suggestion2)
+                await AsyncDBManager.getInstance().voteSuggestion(vote, suggestion1)
+        success, _ = await AsyncDBManager.getInstance().deleteSuggestion(suggestion2)
         if not success:
             embed = Embed(title="Merge failed", description="Failed to delete second suggestion", color=Color.red())
         else:
@@ -164,9 +163,9 @@ class SuggestionsCog(Cog):
     @slash_command(name="deletesuggestion", description="Delete a suggestion")
     async def deletesuggestion(self, inter: ApplicationCommandInteraction, suggestion: str):
         await inter.response.defer()
-        success, _ = DBManager.getInstance().deleteSuggestion(suggestion)
+        success, _ = await AsyncDBManager.getInstance().deleteSuggestion(suggestion)
         if not success:
-            names = SuggestionsCog.getAlternatives(suggestion)
+            names = await SuggestionsCog.getAlternatives(suggestion)
             if len(names) > 0:
                 string = "Did you mean:"
                 for name in names:
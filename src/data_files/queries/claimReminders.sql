@@ -0,0 +1,17 @@
+UPDATE borrows
+SET reminder_claim = ?
+WHERE planned_return IS NOT NULL
+  AND planned_return <= datetime('now', '+48 hours')
+  AND returned IS NULL
+  AND reminded = FALSE
+  AND reminder_claim IS NULL
+RETURNING
+    user,
+    item,
+    retrieval_date AS retrieval_key,
+    (SELECT name FROM items WHERE id = borrows.item) AS item_name,
+    CASE
+        WHEN planned_return >= datetime('now') AND planned_return < datetime('now', '+24 hours') THEN 'today'
+        WHEN planned_return >= datetime('now', '+24 hours') AND planned_return < datetime('now', '+48 hours') THEN 'tomorrow'
+        WHEN planned_return < datetime('now') THEN 'overdue'
+    END AS return_status
\ No newline at end of file
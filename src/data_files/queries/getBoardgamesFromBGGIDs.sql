@@ -0,0 +1,10 @@
+SELECT
+    i.*,
+    t.*,
+    GROUP_CONCAT(c.category, ',') AS categories,
+    i.copies - i.borrowed_count AS available_copies
+FROM boardgames t
+JOIN items i USING (id)
+LEFT JOIN categories c ON i.id = c.id
+WHERE t.bgg_id IN (SELECT value FROM json_each(?))
+GROUP BY i.id;
\ No newline at end of file
@@ -1,44 +1,33 @@
-WITH BorrowDurations AS (
-    -- Calculate the duration each borrow has been active (whether returned or not) in seconds
+-- Returned borrows are already summed in closed_time, only open borrows are measured up to now
+WITH Candidates AS (
+    -- Open borrows only add time, so the longest borrower is either the pair with the most returned time or a pair still borrowing
     SELECT
-        b.item,
-        b.user,
-        i.name AS item_name,
-        CASE
-            -- If the item has been returned, calculate the duration between retrieval and return in minutes
-            WHEN b.returned IS NOT NULL THEN (JULIANDAY(b.returned) - JULIANDAY(b.retrieval_date)) * 24 * 60
-            -- If the item has not been returned, calculate the duration until now in minutes
-            ELSE (JULIANDAY('now') - JULIANDAY(b.retrieval_date)) * 24 * 60
-        END AS borrow_duration
-    FROM borrows b
-    JOIN items i ON b.item = i.id
-),
-BorrowAggregates AS (
-    -- Aggregate the durations by item and user
+        s.item,
+        (SELECT p.user FROM item_user_borrow_stats p WHERE p.item = s.item ORDER BY p.closed_time DESC LIMIT 1) AS user,
+        (SELECT MAX(p.closed_time) FROM item_user_borrow_stats p WHERE p.item = s.item) AS usertime
+    FROM item_borrow_stats s
+    WHERE s.total > 0
+    UNION ALL
     SELECT
         item,
         user,
-        SUM(borrow_duration) AS total_borrow_duration
-    FROM BorrowDurations
-    GROUP BY item, user
+        closed_time + (current * julianday(CURRENT_TIMESTAMP) - open_start) * 24 * 60 AS usertime
+    FROM item_user_borrow_stats
+    WHERE current > 0
 )
 SELECT
     i.name,
-    COUNT(b.user) AS total,
-    SUM(bd.total_borrow_duration) AS time,
+    s.total,
+    s.closed_time + (s.current * julianday(CURRENT_TIMESTAMP) - s.open_start) * 24 * 60 AS time,
     u.user,
-    MAX(bd.total_borrow_duration) AS usertime
-FROM borrows b
-JOIN items i ON b.item = i.id
-JOIN BorrowAggregates bd ON b.item = bd.item
+    u.usertime
+FROM item_borrow_stats s
+JOIN items i ON s.item = i.id
 JOIN (
-    -- Subquery to get the user who has borrowed each item for the longest time in seconds
-    SELECT
-        item,
-        user,
-        MAX(total_borrow_duration) AS longest_borrow_duration
-    FROM BorrowAggregates
+    -- SQLite takes the bare user column from the row holding the MAX
+    SELECT item, user, MAX(usertime) AS usertime
+    FROM Candidates
     GROUP BY item
-) u ON bd.item = u.item AND bd.user = u.user
-GROUP BY i.id
+) u ON s.item = u.item
+WHERE s.total > 0
 ORDER BY {} DESC;
\ No newline at end of file
@@ -1,7 +1,9 @@
+-- Returned borrows are already summed in closed_time, only open borrows are measured up to now
 SELECT
     user,
-    COUNT(*) AS total,
-    SUM(COALESCE((julianday(COALESCE(returned, CURRENT_TIMESTAMP)) - julianday(retrieval_date)) * 24 * 60, 0)) AS time,
-    COUNT(CASE WHEN returned IS NULL THEN 1 END) AS current
-FROM borrows
-GROUP BY user ORDER BY {} DESC
\ No newline at end of file
+    total,
+    closed_time + (current * julianday(CURRENT_TIMESTAMP) - open_start) * 24 * 60 AS time,
+    current
+FROM user_borrow_stats
+WHERE total > 0
+ORDER BY {} DESC
\ No newline at end of file
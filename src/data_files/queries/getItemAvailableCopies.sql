@@ -1,10 +1,4 @@
 SELECT
-    copies - IFNULL(br.borrowed_count, 0) AS copies_left
-FROM items t
-LEFT JOIN (
-    SELECT item, COUNT(*) AS borrowed_count
-    FROM borrows
-    WHERE returned IS NULL
-    GROUP BY item
-) br ON t.id = br.item
+    copies - borrowed_count AS copies_left
+FROM items
 WHERE id = ?
\ No newline at end of file
@@ -0,0 +1,19 @@
+SELECT
+    s.name,
+    s.suggestion_type,
+    s.proposer,
+    s.status,
+    s.proposed_date,
+    COUNT(v.user) AS votes,
+    COUNT(*) OVER () AS total{}
+FROM
+    suggestions s
+LEFT JOIN
+    suggestion_votes v ON v.name = s.name
+WHERE
+    s.status NOT IN (SELECT value FROM json_each(?))
+GROUP BY
+    s.name
+ORDER BY
+    votes DESC, s.proposed_date ASC, s.name ASC
+LIMIT ? OFFSET ?
\ No newline at end of file
@@ -0,0 +1,7 @@
+CREATE INDEX IF NOT EXISTS borrows_user_returned ON borrows(user, returned);
+CREATE INDEX IF NOT EXISTS borrows_item_returned ON borrows(item, returned);
+CREATE INDEX IF NOT EXISTS borrows_returned_planned_return ON borrows(returned, planned_return);
+CREATE INDEX IF NOT EXISTS boardgames_bgg_id ON boardgames(bgg_id);
+CREATE INDEX IF NOT EXISTS interests_item ON interests(item);
+CREATE INDEX IF NOT EXISTS suggestion_votes_name_user ON suggestion_votes(name, user);
+CREATE INDEX IF NOT EXISTS items_lower_name ON items(LOWER(name));
\ No newline at end of file
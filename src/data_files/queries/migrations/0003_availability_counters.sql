@@ -0,0 +1,25 @@
+ALTER TABLE items ADD COLUMN borrowed_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE items SET borrowed_count = (
+    SELECT IFNULL(SUM(amount), 0)
+    FROM borrows
+    WHERE borrows.item = items.id AND borrows.returned IS NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS borrows_insert_availability AFTER INSERT ON borrows
+WHEN NEW.returned IS NULL
+BEGIN
+    UPDATE items SET borrowed_count = borrowed_count + NEW.amount WHERE id = NEW.item;
+END;
+
+CREATE TRIGGER IF NOT EXISTS borrows_delete_availability AFTER DELETE ON borrows
+WHEN OLD.returned IS NULL
+BEGIN
+    UPDATE items SET borrowed_count = borrowed_count - OLD.amount WHERE id = OLD.item;
+END;
+
+CREATE TRIGGER IF NOT EXISTS borrows_update_availability AFTER UPDATE OF item, amount, returned ON borrows
+BEGIN
+    UPDATE items SET borrowed_count = borrowed_count - OLD.amount WHERE id = OLD.item AND OLD.returned IS NULL;
+    UPDATE items SET borrowed_count = borrowed_count + NEW.amount WHERE id = NEW.item AND NEW.returned IS NULL;
+END;
\ No newline at end of file
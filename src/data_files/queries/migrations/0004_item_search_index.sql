@@ -0,0 +1,25 @@
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    name,
+    description,
+    content='items',
+    content_rowid='id',
+    tokenize='trigram'
+);
+
+INSERT INTO items_fts(items_fts) VALUES ('rebuild');
+
+CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items
+BEGIN
+    INSERT INTO items_fts(rowid, name, description) VALUES (NEW.id, NEW.name, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items
+BEGIN
+    INSERT INTO items_fts(items_fts, rowid, name, description) VALUES ('delete', OLD.id, OLD.name, OLD.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF name, description ON items
+BEGIN
+    INSERT INTO items_fts(items_fts, rowid, name, description) VALUES ('delete', OLD.id, OLD.name, OLD.description);
+    INSERT INTO items_fts(rowid, name, description) VALUES (NEW.id, NEW.name, NEW.description);
+END;
\ No newline at end of file
@@ -0,0 +1,6 @@
+ALTER TABLE boardgames ADD COLUMN bgg_synced_at DATETIME;
+
+-- Games added before this migration were fetched from BGG when they were inserted
+UPDATE boardgames SET bgg_synced_at = CURRENT_TIMESTAMP WHERE bgg_id > 0;
+
+CREATE INDEX IF NOT EXISTS boardgames_unsynced ON boardgames(id) WHERE bgg_synced_at IS NULL;
\ No newline at end of file
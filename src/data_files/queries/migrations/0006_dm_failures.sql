@@ -0,0 +1,5 @@
+CREATE TABLE IF NOT EXISTS dm_failures (
+    user INTEGER NOT NULL PRIMARY KEY,
+    reason TEXT NOT NULL,
+    failed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
\ No newline at end of file
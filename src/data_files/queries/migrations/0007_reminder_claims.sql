@@ -0,0 +1,2 @@
+-- Reminder runs claim the borrows they are about to remind, so a crashed run can tell them apart from new ones
+ALTER TABLE borrows ADD COLUMN reminder_claim TEXT;
\ No newline at end of file
@@ -0,0 +1,122 @@
+-- Borrow totals per user, per item and per (item, user). Returned borrows add their duration to closed_time,
+-- open borrows add julianday(retrieval_date) to open_start so their running time can be computed at read time as
+-- current * julianday('now') - open_start
+
+-- What each borrow contributes to closed_time and open_start, defined once so the backfill and the triggers agree
+ALTER TABLE borrows ADD COLUMN closed_minutes REAL GENERATED ALWAYS AS (
+    CASE WHEN returned IS NOT NULL THEN COALESCE((julianday(returned) - julianday(retrieval_date)) * 24 * 60, 0) ELSE 0 END
+) VIRTUAL;
+
+ALTER TABLE borrows ADD COLUMN open_julian REAL GENERATED ALWAYS AS (
+    CASE WHEN returned IS NULL THEN julianday(retrieval_date) ELSE 0 END
+) VIRTUAL;
+
+CREATE TABLE IF NOT EXISTS user_borrow_stats (
+    user INTEGER NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    current INTEGER NOT NULL DEFAULT 0,
+    closed_time REAL NOT NULL DEFAULT 0,
+    open_start REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY(user)
+);
+
+CREATE TABLE IF NOT EXISTS item_borrow_stats (
+    item INTEGER NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    current INTEGER NOT NULL DEFAULT 0,
+    closed_time REAL NOT NULL DEFAULT 0,
+    open_start REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY(item)
+);
+
+CREATE TABLE IF NOT EXISTS item_user_borrow_stats (
+    item INTEGER NOT NULL,
+    user INTEGER NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    current INTEGER NOT NULL DEFAULT 0,
+    closed_time REAL NOT NULL DEFAULT 0,
+    open_start REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY(item, user)
+);
+
+CREATE INDEX IF NOT EXISTS user_borrow_stats_total ON user_borrow_stats(total);
+
+CREATE INDEX IF NOT EXISTS user_borrow_stats_current ON user_borrow_stats(current);
+
+CREATE INDEX IF NOT EXISTS item_borrow_stats_total ON item_borrow_stats(total);
+
+INSERT INTO user_borrow_stats (user, total, current, closed_time, open_start)
+SELECT user, COUNT(*), COUNT(CASE WHEN returned IS NULL THEN 1 END), SUM(closed_minutes), SUM(open_julian)
+FROM borrows
+GROUP BY user;
+
+INSERT INTO item_borrow_stats (item, total, current, closed_time, open_start)
+SELECT item, COUNT(*), COUNT(CASE WHEN returned IS NULL THEN 1 END), SUM(closed_minutes), SUM(open_julian)
+FROM borrows
+GROUP BY item;
+
+INSERT INTO item_user_borrow_stats (item, user, total, current, closed_time, open_start)
+SELECT item, user, COUNT(*), COUNT(CASE WHEN returned IS NULL THEN 1 END), SUM(closed_minutes), SUM(open_julian)
+FROM borrows
+GROUP BY item, user;
+
+CREATE TRIGGER IF NOT EXISTS borrows_insert_stats AFTER INSERT ON borrows
+BEGIN
+    INSERT INTO user_borrow_stats (user, total, current, closed_time, open_start)
+    VALUES (NEW.user, 1, NEW.returned IS NULL, NEW.closed_minutes, NEW.open_julian)
+    ON CONFLICT(user) DO UPDATE SET
+        total = total + excluded.total, current = current + excluded.current,
+        closed_time = closed_time + excluded.closed_time, open_start = open_start + excluded.open_start;
+    INSERT INTO item_borrow_stats (item, total, current, closed_time, open_start)
+    VALUES (NEW.item, 1, NEW.returned IS NULL, NEW.closed_minutes, NEW.open_julian)
+    ON CONFLICT(item) DO UPDATE SET
+        total = total + excluded.total, current = current + excluded.current,
+        closed_time = closed_time + excluded.closed_time, open_start = open_start + excluded.open_start;
+    INSERT INTO item_user_borrow_stats (item, user, total, current, closed_time, open_start)
+    VALUES (NEW.item, NEW.user, 1, NEW.returned IS NULL, NEW.closed_minutes, NEW.open_julian)
+    ON CONFLICT(item, user) DO UPDATE SET
+        total = total + excluded.total, current = current + excluded.current,
+        closed_time = closed_time + excluded.closed_time, open_start = open_start + excluded.open_start;
+END;
+
+CREATE TRIGGER IF NOT EXISTS borrows_delete_stats AFTER DELETE ON borrows
+BEGIN
+    UPDATE user_borrow_stats SET total = total - 1, current = current - (OLD.returned IS NULL),
+        closed_time = closed_time - OLD.closed_minutes, open_start = open_start - OLD.open_julian
+    WHERE user = OLD.user;
+    UPDATE item_borrow_stats SET total = total - 1, current = current - (OLD.returned IS NULL),
+        closed_time = closed_time - OLD.closed_minutes, open_start = open_start - OLD.open_julian
+    WHERE item = OLD.item;
+    UPDATE item_user_borrow_stats SET total = total - 1, current = current - (OLD.returned IS NULL),
+        closed_time = closed_time - OLD.closed_minutes, open_start = open_start - OLD.open_julian
+    WHERE item = OLD.item AND user = OLD.user;
+END;
+
+-- An update removes the old row's contribution and adds the new one, the same statements as the two triggers above
+CREATE TRIGGER IF NOT EXISTS borrows_update_stats AFTER UPDATE OF user, item, retrieval_date, returned ON borrows
+BEGIN
+    UPDATE user_borrow_stats SET total = total - 1, current = current - (OLD.returned IS NULL),
+        closed_time = closed_time - OLD.closed_minutes, open_start = open_start - OLD.open_julian
+    WHERE user = OLD.user;
+    UPDATE item_borrow_stats SET total = total - 1, current = current - (OLD.returned IS NULL),
+        closed_time = closed_time - OLD.closed_minutes, open_start = open_start - OLD.open_julian
+    WHERE item = OLD.item;
+    UPDATE item_user_borrow_stats SET total = total - 1, current = current - (OLD.returned IS NULL),
+        closed_time = closed_time - OLD.closed_minutes, open_start = open_start - OLD.open_julian
+    WHERE item = OLD.item AND user = OLD.user;
+    INSERT INTO user_borrow_stats (user, total, current, closed_time, open_start)
+    VALUES (NEW.user, 1, NEW.returned IS NULL, NEW.closed_minutes, NEW.open_julian)
+    ON CONFLICT(user) DO UPDATE SET
+        total = total + excluded.total, current = current + excluded.current,
+        closed_time = closed_time + excluded.closed_time, open_start = open_start + excluded.open_start;
+    INSERT INTO item_borrow_stats (item, total, current, closed_time, open_start)
+    VALUES (NEW.item, 1, NEW.returned IS NULL, NEW.closed_minutes, NEW.open_julian)
+    ON CONFLICT(item) DO UPDATE SET
+        total = total + excluded.total, current = current + excluded.current,
+        closed_time = closed_time + excluded.closed_time, open_start = open_start + excluded.open_start;
+    INSERT INTO item_user_borrow_stats (item, user, total, current, closed_time, open_start)
+    VALUES (NEW.item, NEW.user, 1, NEW.returned IS NULL, NEW.closed_minutes, NEW.open_julian)
+    ON CONFLICT(item, user) DO UPDATE SET
+        total = total + excluded.total, current = current + excluded.current,
+        closed_time = closed_time + excluded.closed_time, open_start = open_start + excluded.open_start;
+END;
\ No newline at end of file
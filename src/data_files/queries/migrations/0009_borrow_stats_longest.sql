@@ -0,0 +1,4 @@
+-- The longest borrower of an item is either the pair with the most returned time, found through the index, or one still borrowing it
+CREATE INDEX IF NOT EXISTS item_user_borrow_stats_closed ON item_user_borrow_stats(item, closed_time, user);
+
+CREATE INDEX IF NOT EXISTS item_user_borrow_stats_open ON item_user_borrow_stats(item) WHERE current > 0;
\ No newline at end of file
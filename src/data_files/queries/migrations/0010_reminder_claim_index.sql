@@ -0,0 +1,2 @@
+-- Claims are released by value, the index only holds the few borrows that are claimed at any time
+CREATE INDEX IF NOT EXISTS borrows_reminder_claim ON borrows(reminder_claim) WHERE reminder_claim IS NOT NULL;
\ No newline at end of file
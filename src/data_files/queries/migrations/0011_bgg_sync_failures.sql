@@ -0,0 +1 @@
+ALTER TABLE boardgames ADD COLUMN bgg_sync_failed_at DATETIME;
\ No newline at end of file
@@ -0,0 +1,11 @@
+UPDATE items
+SET borrowed_count = borrowed.actual_count
+FROM (
+    SELECT i.id, (
+        SELECT IFNULL(SUM(b.amount), 0)
+        FROM borrows b
+        WHERE b.item = i.id AND b.returned IS NULL
+    ) AS actual_count
+    FROM items i
+) borrowed
+WHERE items.id = borrowed.id AND items.borrowed_count != borrowed.actual_count;
\ No newline at end of file
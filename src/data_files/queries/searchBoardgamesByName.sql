@@ -0,0 +1,5 @@
+SELECT bg.bgg_id
+FROM items_fts f
+JOIN boardgames bg ON bg.id = f.rowid
+WHERE items_fts MATCH ?
+ORDER BY f.rank;
\ No newline at end of file
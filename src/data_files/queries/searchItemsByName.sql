@@ -0,0 +1,4 @@
+SELECT rowid AS id
+FROM items_fts
+WHERE items_fts MATCH ?
+ORDER BY rank;
\ No newline at end of file
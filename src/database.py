@@ -1,15 +1,35 @@
+import json
 import os
 import sqlite3 as SQLite
 import csv
+import time
+from dataclasses import replace
 from datetime import datetime
 
 from enum import Enum
-from typing import Any
+from typing import Any, Callable
 
 from src.embed_helpers.boardgame import BoardGameObj
 from src.embed_helpers.book import BookObj
 from src.embed_helpers.common import Difficulty, Platform
 from src.embed_helpers.videogame import VideoGameObj
+from src.migrations import MigrationManager
+from src.query_registry import QueryRegistry
+from src.utils.fuzzy_index import FuzzyIndex
+
+EXACT_NAME_FILTER = "LOWER(i.name) = LOWER(?)"
+PARTIAL_NAME_FILTER = "LOWER(i.name) LIKE LOWER('%' || ? || '%')"
+INDEXED_NAME_FILTER = "i.id IN (SELECT rowid FROM items_fts WHERE items_fts MATCH ?)"
+IMPORT_BATCH_SIZE = 500
+SUGGESTION_VOTERS_COLUMN = ",\n    json_group_array(v.user) FILTER (WHERE v.user IS NOT NULL) AS voters"
+
+
+def nameSearchExpression(name: str) -> str | None:
+    name = name.strip()
+    # The trigram index can only answer substring searches of at least 3 characters
+    if len(name) < 3:
+        return None
+    return '{name} : "' + name.replace('"', '""') + '"'
 
 
 class Operation(Enum):
@@ -27,29 +47,82 @@ class ObjectType(Enum):
     BOOK = "books"
 
 
+OBJECT_CLASSES = {
+    ObjectType.BOARDGAME: BoardGameObj,
+    ObjectType.VIDEOGAME: VideoGameObj,
+    ObjectType.BOOK: BookObj
+}
+
+
+def _enumConverter(enum: type[Enum], suffix: str = ""):
+    members = {member.value.removesuffix(suffix) if suffix else member.value: member for member in enum}
+
+    def convert(value):
+        member = members.get(value)
+        # Unknown values still go through the enum so they fail the same way they always did
+        return member if member is not None else enum(value + suffix)
+    return convert
+
+
+def _dateConverter(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+def _categoriesConverter(value: str | None) -> [str]:
+    return value.split(",") if value is not None else []
+
+
+ROW_CONVERTERS = {
+    "play_difficulty": _enumConverter(Difficulty),
+    "learn_difficulty": _enumConverter(Difficulty),
+    "difficulty": _enumConverter(Difficulty),
+    "platform": _enumConverter(Platform),
+    "type": _enumConverter(ObjectType, "s"),
+    "returned": _dateConverter,
+    "planned_return": _dateConverter,
+    "retrieval_date": _dateConverter,
+    "register_date": _dateConverter,
+    "declared_date": _dateConverter,
+    "categories": _categoriesConverter
+}
+# description -> (column names, (index, name, converter) for the columns that need converting)
+rowPlans: dict[tuple, tuple[tuple[str, ...], tuple]] = {}
+lastRowPlan: tuple[tuple | None, tuple | None] = (None, None)
+
+
+def getRowPlan(description: tuple) -> tuple[tuple[str, ...], tuple]:
+    global lastRowPlan
+    # Every row of a query shares the same description object, so the dict lookup only happens once per query
+    lastDescription, plan = lastRowPlan
+    if lastDescription is description:
+        return plan
+    plan = rowPlans.get(description)
+    if plan is None:
+        names = tuple(col[0] for col in description)
+        plan = (names, tuple((idx, name, ROW_CONVERTERS[name]) for idx, name in enumerate(names) if name in ROW_CONVERTERS))
+        rowPlans[description] = plan
+    lastRowPlan = (description, plan)
+    return plan
+
+# (object class, description) -> reader turning a plain row into constructor arguments
+objectReaders: dict[tuple, Callable[[tuple], list]] = {}
+
+
+def fetchObjects(cursor: SQLite.Cursor, objClass: type[BoardGameObj | VideoGameObj | BookObj]) -> list:
+    # Item queries skip dict_factory and build the objects straight from the row tuples
+    key = (objClass, cursor.description)
+    reader = objectReaders.get(key)
+    if reader is None:
+        reader = objClass.getRowReader(cursor.description)
+        objectReaders[key] = reader
+    return [objClass(*reader(row)) for row in cursor]
+
+
 def dict_factory(cursor, row):
-    d = {}
-    for idx, col in enumerate(cursor.description):
-        d[col[0]] = row[idx]
-        if col[0] in ["play_difficulty", "learn_difficulty", "difficulty"]:
-            d[col[0]] = Difficulty(d[col[0]])
-        if col[0] == "platform":
-            d[col[0]] = Platform(d[col[0]])
-        if col[0] == "type":
-            d[col[0]] = ObjectType(d[col[0]] + "s")
-        if col[0] in ["returned", "planned_return", "retrieval_date", "register_date", "declared_date"]:
-            if d[col[0]] is not None:
-                try:
-                    d[col[0]] = datetime.strptime(d[col[0]], "%Y-%m-%d %H:%M:%S")
-                except ValueError:
-                    try:
-                        d[col[0]] = datetime.strptime(d[col[0]], "%Y-%m-%d %H:%M:%S.%f")
-                    except ValueError:
-                        d[col[0]] = datetime.strptime(d[col[0]], "%Y-%m-%d")
-            else:
-                d[col[0]] = None
-        if col[0] == "categories":
-            d[col[0]] = d[col[0]].split(",") if d[col[0]] is not None else []
+    names, converters = getRowPlan(cursor.description)
+    d = dict(zip(names, row))
+    for idx, name, converter in converters:
+        d[name] = converter(row[idx])
     return d
 
 
@@ -58,6 +131,8 @@ class DBManager:
 
     def __init__(self, database: str):
         self.path: str = database
+        self.queries: QueryRegistry = QueryRegistry("data_files/queries")
+        self.suggestionIndex: FuzzyIndex | None = None
         self._createDatabase(not os.path.exists(database))
         print("Database connection established")
 
@@ -69,54 +144,135 @@ class DBManager:
         print("Initializing database...")
         if hardReset and os.path.exists(self.path):
             os.remove(self.path)
-        self.connection: SQLite.Connection = SQLite.connect(self.path)
+        self.connection: SQLite.Connection = SQLite.connect(self.path, check_same_thread=False)
         self.connection.row_factory = dict_factory
         cursor: SQLite.Cursor = self.connection.cursor()
 
-        with open("data_files/queries/generateDB.sql", 'r') as data:
-            cursor.executescript(data.read())
+        MigrationManager("data_files/queries/migrations").migrate(self.connection)
+        self._registerQueries()
 
         if hardReset:
-            from src.bgg import fetchBGGameData
-
-            print("Populating default data...")
-            with open("data_files/other/boardgames.csv", 'r') as data:
-                csvData = csv.DictReader(data)
-                games = {}
-                customGames = []
-                for row in csvData:
-                    if row['bgg_id'] == "":
-                        customGames.append(row)
-                    else:
-                        games[row['bgg_id']] = row
-            for game in fetchBGGameData(list(games.keys()), games, lambda x: print(f"Populating DB: {x} games done")):
-                queries = game.getInsertQueries(self.getNextItemID())
-                for query, values in queries:
-                    cursor.execute(query, values)
-            for game in customGames:
-                queries = BoardGameObj.createFromDB(game).getInsertQueries(self.getNextItemID())
-                for query, values in queries:
-                    cursor.execute(query, values)
-
-            with open("data_files/other/videogames.csv", 'r') as data:
-                csvData = csv.DictReader(data)
-                for entry in csvData:
-                    queries = VideoGameObj.createFromDB(entry).getInsertQueries(self.getNextItemID())
-                    for query, values in queries:
-                        cursor.execute(query, values)
-
-            with open("data_files/other/books.csv", 'r') as data:
-                csvData = csv.DictReader(data)
-                for entry in csvData:
-                    queries = BookObj.createFromDB(entry).getInsertQueries(self.getNextItemID())
-                    for query, values in queries:
-                        cursor.execute(query, values)
+            self._importDefaultData()
 
         self.connection.commit()
 
+    @staticmethod
+    def _readDefaultItems(path: str, createItem: Callable[[dict], BoardGameObj | VideoGameObj | BookObj]):
+        with open(path, 'r') as data:
+            for row in csv.DictReader(data):
+                yield createItem(row)
+
+    @staticmethod
+    def _defaultBoardgame(row: dict) -> BoardGameObj:
+        # Boardgames are imported with the local data only, syncBoardgamesWithBGG fills in the rest once the bot is running
+        row['bgg_id'] = int(row['bgg_id']) if row['bgg_id'] != "" else -1
+        return BoardGameObj.createFromDB(row)
+
+    @staticmethod
+    def _defaultBook(row: dict) -> BookObj:
+        row['categories'] = [category.strip() for category in row['categories'].split(",") if category.strip() != ""]
+        return BookObj.createFromDB(row)
+
+    def _writeRows(self, rows: dict[str, list]) -> int:
+        # Item rows are queued before their details, so they are written first
+        written = 0
+        for query, values in rows.items():
+            self.connection.executemany(query, values)
+            written += len(values)
+        rows.clear()
+        return written
+
+    def _importDefaultData(self):
+        print("Populating default data...")
+        start = time.perf_counter()
+        sources = [
+            DBManager._readDefaultItems("data_files/other/boardgames.csv", DBManager._defaultBoardgame),
+            DBManager._readDefaultItems("data_files/other/videogames.csv", VideoGameObj.createFromDB),
+            DBManager._readDefaultItems("data_files/other/books.csv", DBManager._defaultBook)
+        ]
+
+        itemCount = 0
+        rowCount = 0
+        rows: dict[str, list] = {}
+        with self.connection:
+            # The import holds the write lock from the start, so the IDs can be handed out in memory
+            self.connection.execute("BEGIN IMMEDIATE")
+            nextID = self.connection.execute("SELECT IFNULL(MAX(id), 0) + 1 AS next_id FROM items").fetchone()['next_id']
+            # Rows are written in batches while the files are read, only one batch is held in memory at a time
+            for source in sources:
+                for item in source:
+                    item = replace(item, id=nextID)
+                    nextID += 1
+                    itemCount += 1
+                    for query, values in [item.getItemInsertQuery(), *item.getDetailInsertQueries()]:
+                        rows.setdefault(query, []).append(values)
+                    if itemCount % IMPORT_BATCH_SIZE == 0:
+                        rowCount += self._writeRows(rows)
+                rowCount += self._writeRows(rows)
+        elapsed = time.perf_counter() - start
+        print(f"Imported {itemCount} items ({rowCount} rows) in {elapsed:.2f}s, {itemCount / max(elapsed, 1e-6):.0f} items/s")
+
+    def _registerQueries(self):
+        self.queries.register("getFilteredList", [(itemType.value,) for itemType in ObjectType])
+        self.queries.register("getItem", [(itemType.value,) for itemType in ObjectType])
+        self.queries.register("getBoardgamesFromBGGIDs")
+        self.queries.register("getItemAvailableCopies")
+        self.queries.register("getItemsToBorrow", [(EXACT_NAME_FILTER,), (PARTIAL_NAME_FILTER,), (INDEXED_NAME_FILTER,)])
+        self.queries.register("getItemsToReturn", [(EXACT_NAME_FILTER,), (PARTIAL_NAME_FILTER,), (INDEXED_NAME_FILTER,)])
+        self.queries.register("searchItemsByName")
+        self.queries.register("searchBoardgamesByName")
+        self.queries.register("getBorrowStats", [(order,) for order in ["total", "time", "current"]])
+        self.queries.register("getBorrowItemStats", [(order,) for order in ["total", "time", "usertime"]])
+        self.queries.register("getReminders")
+        self.queries.register("claimReminders")
+        self.queries.register("repairAvailability")
+        self.queries.register("getSuggestionList", [("",), (SUGGESTION_VOTERS_COLUMN,)])
+        self.queries.validate(self.connection)
+
+    def reloadQueries(self) -> (bool, str):
+        try:
+            self.queries.reload()
+            self.queries.validate(self.connection)
+        except (OSError, KeyError, ValueError) as e:
+            return False, str(e)
+        return True, f"Reloaded {len(self.queries.templates)} query files"
+
+    def checkQueryPlans(self) -> [str]:
+        # Hot lookups and the index each of them is expected to use, checked by tests/test_query_plans.py
+        checks = [
+            ("getItemIDFromName", "SELECT id FROM items WHERE LOWER(name) = LOWER(?)", ("",), "items_lower_name"),
+            ("getItemsToBorrowFromName", self.queries.get("getItemsToBorrow", EXACT_NAME_FILTER), ("", 0), "items_lower_name"),
+            ("getItemsToReturnFromName", self.queries.get("getItemsToReturn", EXACT_NAME_FILTER), ("", 0), "borrows_user_returned"),
+            ("getBorrowsAmount", "SELECT COUNT(*) AS amount FROM borrows WHERE user = ? AND returned IS NULL", (0,), "borrows_user_returned"),
+            ("getBorrowsList", self.queries.get("getMixedList", "WHERE item = ? AND returned IS NULL"), (0,), "borrows_item_returned"),
+            ("getReminders", self.queries.get("getReminders"), (), "borrows_returned_planned_return"),
+            ("claimReminders", self.queries.get("claimReminders"), ("",), "borrows_returned_planned_return"),
+            ("finishReminders", "UPDATE borrows SET reminder_claim = NULL WHERE reminder_claim = ?", ("",), "borrows_reminder_claim"),
+            ("searchIDsFromName", self.queries.get("searchItemsByName"), ('"abc"',), "items_fts"),
+            ("getUnsyncedBoardgames", "SELECT id, bgg_id FROM boardgames WHERE bgg_synced_at IS NULL AND bgg_id > 0 AND id > ? "
+             "AND (bgg_sync_failed_at IS NULL OR bgg_sync_failed_at < datetime('now', ?)) ORDER BY id LIMIT ?", (-1, "-7 days", 100), "boardgames_unsynced"),
+            ("getIDFromBGGID", "SELECT id FROM boardgames WHERE bgg_id = ?", (0,), "boardgames_bgg_id"),
+            ("getInterested", "SELECT user, declared_date FROM interests WHERE item = ?", (0,), "interests_item"),
+            ("getSuggestion", "SELECT user FROM suggestion_votes WHERE name = ?", ("",), "suggestion_votes_name_user"),
+            ("getSuggestions", self.queries.get("getSuggestionList", ""), ("[]", -1, 0), "suggestion_votes_name_user"),
+            ("getBorrowStats", self.queries.get("getBorrowStats", "total"), (), "user_borrow_stats_total"),
+            ("getBorrowItemStats", self.queries.get("getBorrowItemStats", "total"), (), "item_user_borrow_stats_closed"),
+        ]
+        warnings = []
+        cursor = self.connection.cursor()
+        for name, query, args, index in checks:
+            plan = " | ".join(row['detail'] for row in cursor.execute("EXPLAIN QUERY PLAN " + query, args).fetchall())
+            if index not in plan:
+                warnings.append(f"{name} does not use index '{index}': {plan}")
+        return warnings
+
     def searchIDsFromName(self, name: str) -> [int]:
         cursor = self.connection.cursor()
-        cursor.execute("SELECT id FROM items WHERE LOWER(name) LIKE LOWER(?)", ("%" + name + "%",))
+        expression = nameSearchExpression(name)
+        if expression is not None:
+            cursor.execute(self.queries.get("searchItemsByName"), (expression,))
+        else:
+            cursor.execute("SELECT id FROM items WHERE LOWER(name) LIKE LOWER(?)", ("%" + name + "%",))
         data = cursor.fetchall()
         if len(data) == 0:
             try:
@@ -144,26 +300,28 @@ class DBManager:
 
     def getItemsToBorrowFromName(self, user: int, name: str):
         cursor = self.connection.cursor()
-        with open("data_files/queries/getItemsToBorrow.sql", 'r') as data:
-            cursor.execute(data.read().format("LOWER(i.name) = LOWER(?)"), (name, user))
-            res = cursor.fetchall()
-            if len(res) == 0:
-                data.seek(0)
-                cursor.execute(data.read().format("LOWER(i.name) LIKE LOWER('%' || ? || '%')"), (name, user))
-            else:
-                return [res[0]['id']]
+        cursor.execute(self.queries.get("getItemsToBorrow", EXACT_NAME_FILTER), (name, user))
+        res = cursor.fetchall()
+        if len(res) != 0:
+            return [res[0]['id']]
+        expression = nameSearchExpression(name)
+        if expression is not None:
+            cursor.execute(self.queries.get("getItemsToBorrow", INDEXED_NAME_FILTER), (expression, user))
+        else:
+            cursor.execute(self.queries.get("getItemsToBorrow", PARTIAL_NAME_FILTER), (name, user))
         return [item['id'] for item in cursor.fetchall()]
 
     def getItemsToReturnFromName(self, user: int, name: str):
         cursor = self.connection.cursor()
-        with open("data_files/queries/getItemsToReturn.sql", 'r') as data:
-            cursor.execute(data.read().format("LOWER(i.name) = LOWER(?)"), (name, user))
-            res = cursor.fetchall()
-            if len(res) == 0:
-                data.seek(0)
-                cursor.execute(data.read().format("LOWER(i.name) LIKE LOWER('%' || ? || '%')"), (name, user))
-            else:
-                return [res[0]['id']]
+        cursor.execute(self.queries.get("getItemsToReturn", EXACT_NAME_FILTER), (name, user))
+        res = cursor.fetchall()
+        if len(res) != 0:
+            return [res[0]['id']]
+        expression = nameSearchExpression(name)
+        if expression is not None:
+            cursor.execute(self.queries.get("getItemsToReturn", INDEXED_NAME_FILTER), (expression, user))
+        else:
+            cursor.execute(self.queries.get("getItemsToReturn", PARTIAL_NAME_FILTER), (name, user))
         return [item['id'] for item in cursor.fetchall()]
 
     def getItemNameFromID(self, id: int) -> str:
@@ -174,18 +332,21 @@ class DBManager:
 
     def getItemAvailableCopies(self, id: int) -> int:
         cursor = self.connection.cursor()
-        with open("data_files/queries/getItemAvailableCopies.sql", 'r') as data:
-            cursor.execute(data.read(), (id,))
+        cursor.execute(self.queries.get("getItemAvailableCopies"), (id,))
         return cursor.fetchone()['copies_left']
 
-    def getFilteredList(self, itemType: ObjectType, orFilters: str, andFilters: str, ascending: bool = False, limit: int = 0, offset: int = 0) -> [dict]:
+    def repairAvailability(self) -> (bool, str):
+        cursor = self.connection.cursor()
+        cursor.execute(self.queries.get("repairAvailability"))
+        self.connection.commit()
+        return True, f"Fixed the availability of {cursor.rowcount} items"
+
+    def _getFilteredQuery(self, itemType: ObjectType, orFilters: str, andFilters: str) -> (str, list):
         orFilterData = self._parseFilterTokens(orFilters)
         andFilterData = self._parseFilterTokens(andFilters)
-        with open("data_files/queries/getFilteredList.sql", 'r') as data:
-            query = data.read().format(itemType.value)
-        cursor = self.connection.cursor()
+        query = self.queries.get("getFilteredList", itemType.value)
         queries = []
-        arguments = [itemType.value[:-1]]
+        arguments = []
         if len(orFilterData) > 0 or len(andFilterData) > 0:
             query += f" WHERE "
         for filterToken in orFilterData:
@@ -201,58 +362,50 @@ class DBManager:
             queries.append(queryFragment)
             arguments.append(arg)
         query += f" AND ".join(queries)
-        if ascending:
-            query += " ORDER BY name ASC "
+        return query, arguments
+
+    def countFilteredList(self, itemType: ObjectType, orFilters: str, andFilters: str) -> int:
+        query, arguments = self._getFilteredQuery(itemType, orFilters, andFilters)
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT COUNT(*) AS total FROM ({query})", arguments)
+        return cursor.fetchone()['total']
+
+    def getFilteredList(self, itemType: ObjectType, orFilters: str, andFilters: str, ascending: bool = False, limit: int = 0, offset: int = 0) -> [dict]:
+        query, arguments = self._getFilteredQuery(itemType, orFilters, andFilters)
+        cursor = self.connection.cursor()
+        # Pages are only stable if the order is, items without an explicit order are listed by ID
+        query += " ORDER BY name ASC " if ascending else " ORDER BY id ASC "
         if limit > 0:
             query += f" LIMIT ? "
             arguments.append(limit)
             if offset > 0:
                 query += f" OFFSET ? "
                 arguments.append(offset)
+        cursor.row_factory = None
         cursor.execute(query, arguments)
-        items = []
-        match itemType:
-            case ObjectType.BOARDGAME:
-                for entry in cursor.fetchall():
-                    items.append(BoardGameObj.createFromDB(entry))
-            case ObjectType.VIDEOGAME:
-                for entry in cursor.fetchall():
-                    items.append(VideoGameObj.createFromDB(entry))
-            case ObjectType.BOOK:
-                for entry in cursor.fetchall():
-                    items.append(BookObj.createFromDB(entry))
-        return items
+        return fetchObjects(cursor, OBJECT_CLASSES[itemType])
 
     def getItemData(self, itemType: ObjectType, itemID: int) -> BoardGameObj | VideoGameObj | BookObj | None:
         cursor = self.connection.cursor()
-        with open("data_files/queries/getItem.sql", 'r') as data:
-            cursor.execute(data.read().format(itemType.value), (itemType.value[:-1], itemID))
-        queryResult = cursor.fetchone()
-        if queryResult is None:
-            return None
-        if itemType.value == ObjectType.BOARDGAME.value:
-            return BoardGameObj.createFromDB(queryResult)
-        elif itemType.value == ObjectType.VIDEOGAME.value:
-            return VideoGameObj.createFromDB(queryResult)
-        else:
-            return BookObj.createFromDB(queryResult)
+        cursor.row_factory = None
+        cursor.execute(self.queries.get("getItem", itemType.value), (itemID,))
+        items = fetchObjects(cursor, OBJECT_CLASSES[itemType])
+        return items[0] if len(items) > 0 else None
 
     def getBorrowsList(self, user: int = None, item: int = None, current: bool = None):
         cursor = self.connection.cursor()
-        with open("data_files/queries/getMixedList.sql", 'r') as data:
-            query = data.read()
-        finalFilter = ""
+        filters = []
         args = []
         if user is not None:
+            filters.append("user = ?")
             args.append(user)
         if item is not None:
+            filters.append("item = ?")
             args.append(item)
-        finalFilter += "WHERE user = ?" if user is not None else ""
-        if item is not None:
-            finalFilter += ("WHERE" if finalFilter == "" else "AND") + f" item = ?"
         if current is not None:
-            finalFilter += ("WHERE" if finalFilter == "" else "AND") + f" returned IS {"" if current else "NOT"} NULL"
-        cursor.execute(query.format(finalFilter), args)
+            filters.append(f"returned IS {"" if current else "NOT"} NULL")
+        finalFilter = ("WHERE " + " AND ".join(filters)) if len(filters) > 0 else ""
+        cursor.execute(self.queries.get("getMixedList", finalFilter), args)
         return cursor.fetchall()
 
     def getBorrowsAmount(self, user: int, current: bool) -> int:
@@ -266,19 +419,30 @@ class DBManager:
     def getBorrowStats(self, order: str, target: str) -> [dict]:
         cursor = self.connection.cursor()
         if target == "user":
-            with open("data_files/queries/getBorrowStats.sql", 'r') as data:
-                cursor.execute(data.read().format(order))
+            cursor.execute(self.queries.get("getBorrowStats", order))
         else:
-            with open("data_files/queries/getBorrowItemStats.sql", 'r') as data:
-                cursor.execute(data.read().format(order))
+            cursor.execute(self.queries.get("getBorrowItemStats", order))
         return cursor.fetchall()
 
     def getReminders(self) -> [dict]:
         cursor = self.connection.cursor()
-        with open("data_files/queries/getReminders.sql", 'r') as data:
-            cursor.execute(data.read())
+        cursor.execute(self.queries.get("getReminders"))
         return cursor.fetchall()
 
+    def claimReminders(self, claim: str) -> [dict]:
+        with self.connection:
+            return self.connection.execute(self.queries.get("claimReminders"), (claim,)).fetchall()
+
+    def finishReminders(self, done: [tuple[int, int, str]], claim: str | None) -> int:
+        # Borrows are matched on their primary key, claims left by a crashed run are released when claim is None
+        with self.connection:
+            self.connection.executemany("UPDATE borrows SET reminded = TRUE, reminder_claim = NULL WHERE user = ? AND item = ? AND retrieval_date = ?", done)
+            if claim is None:
+                self.connection.execute("UPDATE borrows SET reminder_claim = NULL WHERE reminder_claim IS NOT NULL")
+            else:
+                self.connection.execute("UPDATE borrows SET reminder_claim = NULL WHERE reminder_claim = ?", (claim,))
+        return len(done)
+
     def getInterested(self, item: int):
         cursor = self.connection.cursor()
         cursor.execute("SELECT user, declared_date FROM interests WHERE item = ?", (item,))
@@ -317,33 +481,46 @@ class DBManager:
         self.connection.commit()
         return True, "Successfully returned the following items:\n- " + "\n- ".join([item['name'] for item in items])
 
-    def setReminderSent(self, user: int, item: int) -> bool:
-        cursor = self.connection.cursor()
-        cursor.execute("UPDATE borrows SET reminded = TRUE WHERE user = ? and item = ?", (user, item))
-        self.connection.commit()
+    def _insertItem(self, item: BoardGameObj | VideoGameObj | BookObj) -> int:
+        query, values = item.getItemInsertQuery()
+        # The item row and its detail rows are committed together or not at all
+        with self.connection:
+            item = replace(item, id=self.connection.execute(query + " RETURNING id", values).fetchone()['id'])
+            for query, values in item.getDetailInsertQueries():
+                self.connection.execute(query, values)
+        return item.id
+
+    def insertBoardgame(self, game: BoardGameObj) -> bool:
+        self._insertItem(game)
         return True
 
-    def insertBoardgame(self, bggCode: int, play_difficulty: Difficulty, learn_difficulty: Difficulty, copies: int) -> bool:
+    def getUnsyncedBoardgames(self, afterID: int, limit: int, retryDays: int = 7) -> [dict]:
+        # Games that BGG did not return are only tried again after retryDays
         cursor = self.connection.cursor()
+        cursor.execute("SELECT id, bgg_id FROM boardgames WHERE bgg_synced_at IS NULL AND bgg_id > 0 AND id > ? "
+                       "AND (bgg_sync_failed_at IS NULL OR bgg_sync_failed_at < datetime('now', ?)) ORDER BY id LIMIT ?",
+                       (afterID, f"-{retryDays} days", limit))
+        return cursor.fetchall()
 
-        cursor.execute("SELECT id FROM boardgames WHERE bgg_id = ?", (bggCode,))
-        existingData = cursor.fetchone()
-        if existingData is not None:
-            cursor.execute("UPDATE items SET copies = copies + ? WHERE id = ?", (copies, existingData['id']))
-            return True
-
-        extraData = {bggCode: {
-            "play_difficulty": play_difficulty,
-            "learn_difficulty": learn_difficulty,
-            "copies": copies
-        }}
-        from src.bgg import fetchBGGameData
-        game = fetchBGGameData([bggCode], extraData)
-        if len(game) == 0:
-            return False
-        queries = game[0].getInsertQueries(self.getNextItemID())
-        for query, values in queries:
-            cursor.execute(query, values)
+    def markBoardgamesSyncFailed(self, ids: [int]) -> int:
+        with self.connection:
+            self.connection.executemany("UPDATE boardgames SET bgg_sync_failed_at = CURRENT_TIMESTAMP WHERE id = ?", [(itemID,) for itemID in ids])
+        return len(ids)
+
+    def updateBoardgamesFromBGG(self, games: [BoardGameObj]) -> int:
+        with self.connection:
+            self.connection.executemany("UPDATE items SET description = ?, thumbnail = ?, length = ? WHERE id = ?",
+                                        [(game.description, game.thumbnail, game.playingTime, game.id) for game in games])
+            self.connection.executemany("UPDATE boardgames SET min_players = ?, max_players = ?, bgg_rating = ?, bgg_average_rating = ?, bgg_rank = ?, bgg_synced_at = CURRENT_TIMESTAMP WHERE id = ?",
+                                        [(game.minPlayers, game.maxPlayers, game.bggRating, game.averageRating, game.rank, game.id) for game in games])
+            self.connection.executemany("DELETE FROM categories WHERE id = ?", [(game.id,) for game in games])
+            self.connection.executemany("INSERT INTO categories (id, category) VALUES (?, ?)",
+                                        [(game.id, category) for game in games for category in game.categories])
+        return len(games)
+
+    def addCopies(self, itemID: int, copies: int) -> bool:
+        cursor = self.connection.cursor()
+        cursor.execute("UPDATE items SET copies = copies + ? WHERE id = ?", (copies, itemID))
         self.connection.commit()
         return True
 
@@ -354,7 +531,6 @@ class DBManager:
         return True
 
     def insertVideogame(self, name: str, platform: Platform, difficulty: Difficulty, min_players: int, max_players: int, length: int, copies: int) -> bool:
-        cursor = self.connection.cursor()
         game = VideoGameObj.createFromDB({
             "name": name,
             "platform": platform,
@@ -364,10 +540,7 @@ class DBManager:
             "length": length,
             "copies": copies
         })
-        queries = game.getInsertQueries(self.getNextItemID())
-        for query, values in queries:
-            cursor.execute(query, values)
-        self.connection.commit()
+        self._insertItem(game)
         return True
 
     def deleteVideogame(self, itemID: int) -> bool:
@@ -377,7 +550,6 @@ class DBManager:
         return True
 
     def insertBook(self, name: str, author: str, pages: int, genre: str, abstract: str, copies: int) -> bool:
-        cursor = self.connection.cursor()
         book = BookObj.createFromDB({
             "name": name,
             "author": author,
@@ -386,10 +558,7 @@ class DBManager:
             "abstract": abstract,
             "copies": copies
         })
-        queries = book.getInsertQueries(self.getNextItemID())
-        for query, values in queries:
-            cursor.execute(query, values)
-        self.connection.commit()
+        self._insertItem(book)
         return True
 
     def deleteBook(self, itemID: int) -> bool:
@@ -420,7 +589,7 @@ class DBManager:
             return False, "You are already borrowing this item"
 
         # Check the item is available
-        cursor.execute("SELECT type, copies - IFNULL(br.borrowed_count, 0) AS copies_left FROM items t LEFT JOIN (SELECT item, COUNT(*) AS borrowed_count FROM borrows WHERE returned IS NULL GROUP BY item) br ON t.id = br.item WHERE id = ?", (item,))
+        cursor.execute(self.queries.get("getItemAvailableCopies"), (item,))
         copies_left = cursor.fetchone()['copies_left']
         if copies_left <= 0:
             return False, "There are no copies left of this item in Piazza"
@@ -465,6 +634,18 @@ class DBManager:
         self.connection.commit()
         return True
 
+    def addDMFailure(self, user: int, reason: str) -> bool:
+        cursor = self.connection.cursor()
+        cursor.execute("INSERT OR REPLACE INTO dm_failures (user, reason, failed_at) VALUES (?, ?, CURRENT_TIMESTAMP)", (user, reason))
+        self.connection.commit()
+        return True
+
+    def getDMFailures(self, maxAgeDays: int) -> dict[int, int]:
+        # User -> unix time of their last failure
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT user, CAST(strftime('%s', failed_at) AS INTEGER) AS failed_at FROM dm_failures WHERE failed_at > datetime('now', ?)", (f"-{maxAgeDays} days",))
+        return {entry['user']: entry['failed_at'] for entry in cursor.fetchall()}
+
     def addSuggestion(self, user: int, suggestion: str, suggestion_type: str):
         cursor = self.connection.cursor()
         cursor.execute("SELECT EXISTS(SELECT 1 FROM suggestions WHERE name = ?) AS suggestion_exists", (suggestion,))
@@ -473,6 +654,7 @@ class DBManager:
         cursor.execute("INSERT INTO suggestions (name, proposer, suggestion_type) VALUES (?, ?, ?)", (suggestion, user, suggestion_type))
         cursor.execute("INSERT INTO suggestion_votes (user, name) VALUES (?, ?)", (user, suggestion))
         self.connection.commit()
+        self._getSuggestionIndex().add(suggestion, suggestion_type)
         return True, f"A suggestion for **{suggestion}** was added successfully"
 
     def deleteSuggestion(self, suggestion: str):
@@ -483,6 +665,7 @@ class DBManager:
         cursor.execute("DELETE FROM suggestions WHERE name = ?", (suggestion,))
         cursor.execute("DELETE FROM suggestion_votes WHERE name = ?", (suggestion,))
         self.connection.commit()
+        self._getSuggestionIndex().remove(suggestion)
         return True, "Suggestion deleted successfully"
 
     def getSuggestionNames(self, suggestion_type: str = ""):
@@ -494,6 +677,17 @@ class DBManager:
         names = [suggestion['name'] for suggestion in cursor.fetchall()]
         return names
 
+    def _getSuggestionIndex(self) -> FuzzyIndex:
+        if self.suggestionIndex is None:
+            self.suggestionIndex = FuzzyIndex()
+            cursor = self.connection.cursor()
+            for suggestion in cursor.execute("SELECT name, suggestion_type FROM suggestions").fetchall():
+                self.suggestionIndex.add(suggestion['name'], suggestion['suggestion_type'])
+        return self.suggestionIndex
+
+    def getSuggestionAlternatives(self, suggestion: str, suggestion_type: str = "", limit: int = 3) -> [str]:
+        return self._getSuggestionIndex().search(suggestion, limit, suggestion_type)
+
     def getSuggestion(self, suggestion: str):
         cursor = self.connection.cursor()
         cursor.execute("SELECT EXISTS(SELECT 1 FROM suggestions WHERE name = ?) AS suggestion_exists", (suggestion,));
@@ -507,24 +701,22 @@ class DBManager:
             votes.append(vote['user'])
         return data, votes
 
-    def getSuggestions(self, showRejected: bool = False, showBought: bool = False):
+    def getSuggestions(self, showRejected: bool = False, showBought: bool = False, limit: int = 0, offset: int = 0, withVoters: bool = False) -> (int, [dict]):
         cursor = self.connection.cursor()
-        suggestions = []
-        whereClause = ""
+        hiddenStatuses = []
         if not showRejected:
-            whereClause += " WHERE status != 'REJECTED'"
+            hiddenStatuses.append("REJECTED")
         if not showBought:
-            if whereClause == "":
-                whereClause += " WHERE "
-            else:
-                whereClause += " AND "
-            whereClause += "status != 'BOUGHT'"
-        for suggestion in cursor.execute("SELECT * FROM suggestions" + whereClause).fetchall():
-            suggestion['votes'] = []
-            for vote in cursor.execute("SELECT user FROM suggestion_votes WHERE name = ?", (suggestion['name'],)).fetchall():
-                suggestion['votes'].append(vote['user'])
-            suggestions.append(suggestion)
-        return suggestions
+            hiddenStatuses.append("BOUGHT")
+        # Votes are counted in the same query, sorted and paged by SQLite. The total is a window over the grouped rows
+        query = self.queries.get("getSuggestionList", SUGGESTION_VOTERS_COLUMN if withVoters else "")
+        suggestions = cursor.execute(query, (json.dumps(hiddenStatuses), limit if limit > 0 else -1, offset)).fetchall()
+        total = suggestions[0]['total'] if len(suggestions) > 0 else 0
+        for suggestion in suggestions:
+            del suggestion['total']
+            if withVoters:
+                suggestion['voters'] = json.loads(suggestion['voters'])
+        return total, suggestions
 
     def voteSuggestion(self, user: int, suggestion: str):
         cursor = self.connection.cursor()
@@ -549,6 +741,7 @@ class DBManager:
         if len(votes) == 1:
             cursor.execute("DELETE FROM suggestions WHERE name = ?", (suggestion,))
             self.connection.commit()
+            self._getSuggestionIndex().remove(suggestion)
             return True, "Vote removed and suggestion deleted"
         else:
             cursor.execute("UPDATE suggestions SET likes = likes - 1 WHERE name = ?", (suggestion,))
@@ -569,6 +762,8 @@ class DBManager:
             cursor = self.connection.cursor()
             cursor.execute(query)
             self.connection.commit()
+            # Raw queries can change anything, cached state is rebuilt on next use
+            self.suggestionIndex = None
             return True, str(cursor.fetchall())
         except SQLite.Error as e:
             return False, str(e)
@@ -578,6 +773,9 @@ class DBManager:
         value = filterToken['value']
         op = filterToken['operation']
         if filterToken['key'] == "name":
+            expression = nameSearchExpression(value)
+            if expression is not None:
+                return "id IN (SELECT rowid FROM items_fts WHERE items_fts MATCH ?)", expression
             value = '%' + filterToken['value'] + '%'
             return f"LOWER({filterToken['key']}) LIKE LOWER(?)", value
         return f"{filterToken['key']} {op} ?", value
@@ -631,6 +829,12 @@ class DBManager:
         data = cursor.fetchone()
         return data['id'] if data is not None else -1
 
+    def getBoardgamesFromBGGIDs(self, bggIDs: [int]) -> dict[int, dict]:
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+        cursor.execute(self.queries.get("getBoardgamesFromBGGIDs"), (json.dumps(list(bggIDs)),))
+        return {game.bggId: game.getDict() for game in fetchObjects(cursor, BoardGameObj)}
+
     def getBBGIDFromID(self, id: int) -> int:
         cursor = self.connection.cursor()
         cursor.execute("SELECT bgg_id FROM boardgames WHERE id = ?", (id,))
@@ -639,18 +843,16 @@ class DBManager:
 
     def getBGGIDFromName(self, name: str) -> [int]:
         cursor = self.connection.cursor()
-        # remove case sensitivity and return all results that start with 'name' str. BGG can handle up to 20 per request.
-        cursor.execute(f"SELECT boardgames.bgg_id FROM items JOIN boardgames ON items.id = boardgames.id WHERE LOWER(items.name) LIKE LOWER(?)", ("%" + name + "%",))
+        # remove case sensitivity and return all results that contain 'name' str, best matches first. BGG can handle up to 20 per request.
+        expression = nameSearchExpression(name)
+        if expression is not None:
+            cursor.execute(self.queries.get("searchBoardgamesByName"), (expression,))
+        else:
+            cursor.execute(f"SELECT boardgames.bgg_id FROM items JOIN boardgames ON items.id = boardgames.id WHERE LOWER(items.name) LIKE LOWER(?)", ("%" + name + "%",))
         data = cursor.fetchall()
         ids = [item['bgg_id'] for item in data]
         return ids
 
-    def getNextItemID(self):
-        cursor = self.connection.cursor()
-        cursor.execute("SELECT MAX(id) AS max_id FROM items")
-        elem = cursor.fetchone()['max_id']
-        return elem + 1 if elem is not None else 0
-
     @staticmethod
     def initInstance(databasePath):
         DBManager.instance = DBManager(databasePath)
@@ -2,12 +2,31 @@ from dataclasses import dataclass
 from html import unescape
 from disnake import Embed, Color
 
-from src.embed_helpers.common import Difficulty, safeGet
+from src.embed_helpers.common import Difficulty, compileRowReader, readDict, toCategories, toDifficulty
 
 BASE_URL: str = f'https://boardgamegeek.com/boardgame/'
-
-
-@dataclass
+# Database columns in the order of the constructor arguments, with their default and converter
+DB_FIELDS = (
+    ("id", -1, None),
+    ("name", "<NO NAME ERROR>", None),
+    ("min_players", 0, None),
+    ("max_players", 0, None),
+    ("length", 0, None),
+    ("copies", 0, None),
+    ("available_copies", 0, None),
+    ("bgg_id", -1, None),
+    ("description", "No description available", None),
+    ("learn_difficulty", Difficulty.UNDEFINED, toDifficulty),
+    ("play_difficulty", Difficulty.UNDEFINED, toDifficulty),
+    ("categories", (), toCategories),
+    ("bgg_rank", -1, None),
+    ("bgg_average_rating", -1.0, None),
+    ("bgg_rating", -1.0, None),
+    ("thumbnail", "https://i.imgur.com/OJhoTqu.png", None)
+)
+
+
+@dataclass(slots=True, frozen=True)
 class BoardGameObj:
     id: int
     title: str
@@ -25,70 +44,40 @@ class BoardGameObj:
     averageRating: float = -1.0
     bggRating: float = -1.0
     thumbnail: str = "https://i.imgur.com/OJhoTqu.png"
+    bggSynced: bool = False
 
     @staticmethod
-    def createFromDB(boardGameDict: dict):
-        if "play_difficulty" in boardGameDict and isinstance(boardGameDict["play_difficulty"], str):
-            boardGameDict["play_difficulty"] = Difficulty(int(boardGameDict["play_difficulty"]))
-        elif "play_difficulty" in boardGameDict and isinstance(boardGameDict["play_difficulty"], int):
-            boardGameDict["play_difficulty"] = Difficulty(boardGameDict["play_difficulty"])
-        if "learn_difficulty" in boardGameDict and isinstance(boardGameDict["learn_difficulty"], str):
-            boardGameDict["learn_difficulty"] = Difficulty(int(boardGameDict["learn_difficulty"]))
-        elif "learn_difficulty" in boardGameDict and isinstance(boardGameDict["learn_difficulty"], int):
-            boardGameDict["learn_difficulty"] = Difficulty(boardGameDict["learn_difficulty"])
-        return BoardGameObj(
-            id=safeGet(boardGameDict, "id", -1),
-            title=safeGet(boardGameDict, "name", "<NO NAME ERROR>"),
-            minPlayers=safeGet(boardGameDict, "min_players", 0),
-            maxPlayers=safeGet(boardGameDict, "max_players", 0),
-            playingTime=safeGet(boardGameDict, "length", 0),
-            copies=safeGet(boardGameDict, "copies", 0),
-            copies_available=safeGet(boardGameDict, "available_copies", 0),
-            bggId=safeGet(boardGameDict, "bgg_id", -1),
-            description=safeGet(boardGameDict, "description", "No description available"),
-            learn_difficulty=safeGet(boardGameDict, "learn_difficulty", Difficulty.UNDEFINED),
-            play_difficulty=safeGet(boardGameDict, "play_difficulty", Difficulty.UNDEFINED),
-            categories=safeGet(boardGameDict, "categories", []),
-            rank=safeGet(boardGameDict, "bgg_rank", -1),
-            averageRating=safeGet(boardGameDict, "bgg_average_rating", -1.0),
-            bggRating=safeGet(boardGameDict, "bgg_rating", -1.0),
-            thumbnail=safeGet(boardGameDict, "thumbnail", "https://i.imgur.com/OJhoTqu.png")
-        )
+    def createFromDB(boardGameDict: dict) -> 'BoardGameObj':
+        return BoardGameObj(*readDict(boardGameDict, DB_FIELDS))
 
     @staticmethod
-    def createFromBGG(bggDict: dict, extraData: dict = None):
-        if isinstance(bggDict["@id"], str):
-            bggDict["@id"] = int(bggDict["@id"])
+    def getRowReader(description: tuple):
+        return compileRowReader(DB_FIELDS, description)
+
+    @staticmethod
+    def createFromBGG(bggData: dict, extraData: dict = None):
         if extraData is None:
             extraData = {}
 
-        if "play_difficulty" in extraData and isinstance(extraData["play_difficulty"], str):
-            extraData["play_difficulty"] = Difficulty(int(extraData["play_difficulty"]))
-        elif "play_difficulty" in extraData and isinstance(extraData["play_difficulty"], int):
-            extraData["play_difficulty"] = Difficulty(extraData["play_difficulty"])
-        if "learn_difficulty" in extraData and isinstance(extraData["learn_difficulty"], str):
-            extraData["learn_difficulty"] = Difficulty(int(extraData["learn_difficulty"]))
-        elif "learn_difficulty" in extraData and isinstance(extraData["learn_difficulty"], int):
-            extraData["learn_difficulty"] = Difficulty(extraData["learn_difficulty"])
-        description = safeGet(bggDict, "description", "<NO DESCRIPTION>")
-        rank = safeGet(bggDict, ["statistics/ratings/ranks/rank/0/@value", "statistics/ratings/ranks/rank/@value"], "-1")
+        description = bggData["description"]
         return BoardGameObj(
-            id=safeGet(extraData, "id", -1),
-            title=safeGet(bggDict, ["name/@value", "name/0/@value"], "<NO NAME ERROR>"),
-            minPlayers=int(safeGet(bggDict, "minplayers/@value", "-1")),
-            maxPlayers=int(safeGet(bggDict, "maxplayers/@value", "-1")),
-            playingTime=int(safeGet(bggDict, "playingtime/@value", "-1")),
-            copies=safeGet(extraData, "copies", -1),
-            copies_available=safeGet(extraData, "available_copies", -1),
-            bggId=int(safeGet(bggDict, "@id", "-1")),
+            id=extraData.get("id", -1),
+            title=bggData["name"],
+            minPlayers=bggData["minPlayers"],
+            maxPlayers=bggData["maxPlayers"],
+            playingTime=bggData["playingTime"],
+            copies=extraData.get("copies", -1),
+            copies_available=extraData.get("available_copies", -1),
+            bggId=bggData["id"],
             description=description if len(description) < 1024 else description[:1020] + "...",
-            learn_difficulty=safeGet(extraData, "learn_difficulty", Difficulty.UNDEFINED),
-            play_difficulty=safeGet(extraData, "play_difficulty", Difficulty.UNDEFINED),
-            categories=[safeGet(category, "@value", "Unknown") for category in safeGet(bggDict, "link", []) if safeGet(category, "@type", "") == "boardgamecategory"],
-            rank=int(rank if rank != "Not Ranked" else "-1"),
-            averageRating=float(safeGet(bggDict, "statistics/ratings/average/@value", "-1.0")),
-            bggRating=float(safeGet(bggDict, "statistics/ratings/bayesaverage/@value", "-1.0")),
-            thumbnail=safeGet(bggDict, "thumbnail", "")
+            learn_difficulty=toDifficulty(extraData.get("learn_difficulty", Difficulty.UNDEFINED)),
+            play_difficulty=toDifficulty(extraData.get("play_difficulty", Difficulty.UNDEFINED)),
+            categories=list(bggData["categories"]),
+            rank=bggData["rank"],
+            averageRating=bggData["averageRating"],
+            bggRating=bggData["bggRating"],
+            thumbnail=bggData["thumbnail"],
+            bggSynced=True
         )
 
     def getEmbed(self, flags: [str]) -> Embed:
@@ -151,15 +140,16 @@ class BoardGameObj:
 
         return embed
 
-    def getInsertQueries(self, nextID: int) -> ((str, list), (str, list)):
+    def getItemInsertQuery(self) -> (str, list):
+        insertItemQuery = "INSERT INTO items (id, name, length, description, thumbnail, type, copies) VALUES (?, ?, ?, ?, ?, ?, ?)"
+        insertItemArgs = [self.id if self.id >= 0 else None, self.title, self.playingTime, self.description, self.thumbnail, "boardgame", self.copies]
+        return insertItemQuery, insertItemArgs
+
+    def getDetailInsertQueries(self) -> [(str, list)]:
         queries = []
-        self.id = nextID
-        insertItemQuery = "INSERT INTO items (id, name, length, description, thumbnail, type, copies) VALUES (?, ?, ?, ?, ?, ?, ?);"
-        insertItemArgs = [self.id, self.title, self.playingTime, self.description, self.thumbnail, "boardgame", self.copies]
-        insertBoardGameQuery = "INSERT INTO boardgames (id, min_players, max_players, bgg_id, bgg_rating, bgg_average_rating, bgg_rank, learn_difficulty, play_difficulty) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);"
-        insertBoardGameArgs = [self.id, self.minPlayers, self.maxPlayers, self.bggId, self.bggRating, self.averageRating, self.rank, self.learn_difficulty.value, self.play_difficulty.value]
+        insertBoardGameQuery = "INSERT INTO boardgames (id, min_players, max_players, bgg_id, bgg_rating, bgg_average_rating, bgg_rank, learn_difficulty, play_difficulty, bgg_synced_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CASE WHEN ? THEN CURRENT_TIMESTAMP END);"
+        insertBoardGameArgs = [self.id, self.minPlayers, self.maxPlayers, self.bggId, self.bggRating, self.averageRating, self.rank, self.learn_difficulty.value, self.play_difficulty.value, self.bggSynced]
         queries.append((insertBoardGameQuery, insertBoardGameArgs))
-        queries.append((insertItemQuery, insertItemArgs))
         for category in self.categories:
             insertCategoryQuery = "INSERT INTO categories (id, category) VALUES (?, ?);"
             insertCategoryArgs = [self.id, category]
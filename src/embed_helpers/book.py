@@ -2,10 +2,24 @@ from dataclasses import dataclass
 
 from disnake import Embed, Color
 
-from src.embed_helpers.common import safeGet
+from src.embed_helpers.common import compileRowReader, readDict, toCategories
 
 
-@dataclass
+# Database columns in the order of the constructor arguments, with their default and converter
+DB_FIELDS = (
+    ("id", -1, None),
+    ("name", "<NO TITLE>", None),
+    ("author", "<NO AUTHOR>", None),
+    ("length", -1, None),
+    ("copies", -1, None),
+    ("available_copies", -1, None),
+    ("thumbnail", "https://i.imgur.com/OJhoTqu.png", None),
+    ("description", "No description available", None),
+    ("categories", (), toCategories)
+)
+
+
+@dataclass(slots=True, frozen=True)
 class BookObj:
     id: int
     title: str
@@ -18,18 +32,12 @@ class BookObj:
     categories: list[str] = ()
 
     @staticmethod
-    def createFromDB(bookDict: dict):
-        return BookObj(
-            id=safeGet(bookDict, "id", -1),
-            title=safeGet(bookDict, "name", "<NO TITLE>"),
-            author=safeGet(bookDict, "author", "<NO AUTHOR>"),
-            pages=safeGet(bookDict, "length", -1),
-            copies=safeGet(bookDict, "copies", -1),
-            copies_available=safeGet(bookDict, "available_copies", -1),
-            thumbnail=safeGet(bookDict, "thumbnail", "https://i.imgur.com/OJhoTqu.png"),
-            description=safeGet(bookDict, "description", "No description available"),
-            categories=safeGet(bookDict, "categories", [])
-        )
+    def createFromDB(bookDict: dict) -> 'BookObj':
+        return BookObj(*readDict(bookDict, DB_FIELDS))
+
+    @staticmethod
+    def getRowReader(description: tuple):
+        return compileRowReader(DB_FIELDS, description)
 
     def getEmbed(self, flags: [str]) -> Embed:
         color = Color.dark_green()
@@ -60,15 +68,16 @@ class BookObj:
             embed.add_field(name="Available Copies", value=f"{self.copies_available}", inline=True)
         return embed
 
-    def getInsertQueries(self, nextID: int) -> [(str, list)]:
+    def getItemInsertQuery(self) -> (str, list):
+        insertItemQuery = "INSERT INTO items (id, name, length, description, thumbnail, type, copies) VALUES (?, ?, ?, ?, ?, ?, ?)"
+        insertItemValues = [self.id if self.id >= 0 else None, self.title, self.pages, self.description, self.thumbnail, "book", self.copies]
+        return insertItemQuery, insertItemValues
+
+    def getDetailInsertQueries(self) -> [(str, list)]:
         queries = []
-        self.id = nextID
         insertBookquery = "INSERT INTO books (id, author) VALUES (?, ?);"
         insertBookValues = [self.id, self.author]
         queries.append((insertBookquery, insertBookValues))
-        insertItemQuery = "INSERT INTO items (id, name, length, description, thumbnail, type, copies) VALUES (?, ?, ?, ?, ?, ?, ?);"
-        insertItemValues = [self.id, self.title, self.pages, self.description, self.thumbnail, "book", self.copies]
-        queries.append((insertItemQuery, insertItemValues))
         for category in self.categories:
             insertCategoryQuery = "INSERT INTO categories (id, category) VALUES (?, ?);"
             insertCategoryValues = [self.id, category]
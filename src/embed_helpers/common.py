@@ -21,21 +21,39 @@ class Platform(Enum):
     SWITCH = 5
 
 
-def safeGet(dictionary: dict, paths: list[str] | str, default):
-    if not isinstance(paths, list):
-        paths = [paths]
-    for path in paths:
-        val = dictionary
-        try:
-            for key in path.split("/"):
-                if isinstance(val, list):
-                    val = val[int(key)]
-                else:
-                    val = val[key]
-            return val
-        except (KeyError, ValueError):
-            continue
-    return default
+def toEnum(enum: type[Enum], value):
+    # CSV rows carry the value as a string, database rows as an int or as an already converted member
+    if value is None or isinstance(value, enum):
+        return value
+    return enum(int(value))
+
+
+def toDifficulty(value) -> Difficulty:
+    return toEnum(Difficulty, value)
+
+
+def toPlatform(value) -> Platform:
+    return toEnum(Platform, value)
+
+
+def toCategories(value) -> [str]:
+    if isinstance(value, str):
+        return value.split(",")
+    return value if value is not None else []
+
+
+def readDict(data: dict, fields: tuple) -> list:
+    # fields are (key, default, converter) in the order of the constructor arguments
+    return [data.get(key, default) if converter is None or key not in data else converter(data[key]) for key, default, converter in fields]
+
+
+def compileRowReader(fields: tuple, description: tuple):
+    columns = {col[0]: idx for idx, col in enumerate(description)}
+    plan = tuple((columns.get(key), default, converter) for key, default, converter in fields)
+
+    def read(row: tuple) -> list:
+        return [default if idx is None else row[idx] if converter is None else converter(row[idx]) for idx, default, converter in plan]
+    return read
 
 
 def getBorrowsListEmbed(borrows: list[dict], user: Member, current: bool):
@@ -91,7 +109,7 @@ def getBorrowsStatsEmbed(borrows: list[dict], order: str):
         formatted = "borrow time"
     embed = Embed(title=f"Borrow stats by {formatted}", color=Color.dark_gold())
     for count, entry in enumerate(borrows):
-        displayName = f"**[{entry['rank']}]** {entry['user'].display_name}"
+        displayName = f"**[{entry['rank']}]** {entry['member'].display_name if entry['member'] is not None else "Unknown user"}"
         embed.add_field(name=displayName, value=f"Total: {entry['total']}\nCurrent: {entry['current']}\nTime: {format_time(entry['time'])}", inline=True)
     return embed
 
@@ -104,5 +122,5 @@ def getBorrowsItemStatsEmbed(borrow: list[dict], order: str):
         formatted = "longest borrow"
     embed = Embed(title=f"Borrow stats by {formatted}", color=Color.dark_gold())
     for count, entry in enumerate(borrow):
-        embed.add_field(name=f"**[{entry['rank']}]** {entry['name']}", value=f"Total: {entry['total']}\nTime: {format_time(entry['time'])}\nLongest borrow: {format_time(entry['usertime'])} by {entry['user'].mention}", inline=True)
+        embed.add_field(name=f"**[{entry['rank']}]** {entry['name']}", value=f"Total: {entry['total']}\nTime: {format_time(entry['time'])}\nLongest borrow: {format_time(entry['usertime'])} by <@{entry['user']}>", inline=True)
     return embed
@@ -2,10 +2,28 @@ from dataclasses import dataclass
 
 from disnake import Embed, Color
 
-from src.embed_helpers.common import Difficulty, Platform, safeGet
+from src.embed_helpers.common import Difficulty, Platform, compileRowReader, readDict, toCategories, toDifficulty, toPlatform
 
 
-@dataclass
+# Database columns in the order of the constructor arguments, with their default and converter
+DB_FIELDS = (
+    ("id", -1, None),
+    ("name", "<NO TITLE>", None),
+    ("min_players", -1, None),
+    ("max_players", -1, None),
+    ("length", -1, None),
+    ("copies", 0, None),
+    ("available_copies", -1, None),
+    ("difficulty", Difficulty.UNDEFINED, toDifficulty),
+    ("platform", Platform.UNDEFINED, toPlatform),
+    ("thumbnail", "https://i.imgur.com/OJhoTqu.png", None),
+    ("description", "No description available", None),
+    ("categories", (), toCategories),
+    ("length", 0, None)
+)
+
+
+@dataclass(slots=True, frozen=True)
 class VideoGameObj:
     id: int
     title: str
@@ -22,26 +40,12 @@ class VideoGameObj:
     length: int = 0
 
     @staticmethod
-    def createFromDB(boardGameDict: dict):
-        if "difficulty" in boardGameDict and isinstance(boardGameDict["difficulty"], str):
-            boardGameDict["difficulty"] = Difficulty(int(boardGameDict["difficulty"]))
-        if "platform" in boardGameDict and isinstance(boardGameDict["platform"], str):
-            boardGameDict["platform"] = Platform(int(boardGameDict["platform"]))
-        return VideoGameObj(
-            id=safeGet(boardGameDict, "id", -1),
-            title=safeGet(boardGameDict, "name", "<NO TITLE>"),
-            minPlayers=safeGet(boardGameDict, "min_players", -1),
-            maxPlayers=safeGet(boardGameDict, "max_players", -1),
-            playingTime=safeGet(boardGameDict, "length", -1),
-            copies=safeGet(boardGameDict, "copies", 0),
-            copies_available=safeGet(boardGameDict, "available_copies", -1),
-            difficulty=safeGet(boardGameDict, "difficulty", Difficulty.UNDEFINED),
-            platform=safeGet(boardGameDict, "platform", Platform.UNDEFINED),
-            thumbnail=safeGet(boardGameDict, "thumbnail", "https://i.imgur.com/OJhoTqu.png"),
-            description=safeGet(boardGameDict, "description", "No description available"),
-            categories=safeGet(boardGameDict, "categories", []),
-            length=safeGet(boardGameDict, "length", 0)
-        )
+    def createFromDB(boardGameDict: dict) -> 'VideoGameObj':
+        return VideoGameObj(*readDict(boardGameDict, DB_FIELDS))
+
+    @staticmethod
+    def getRowReader(description: tuple):
+        return compileRowReader(DB_FIELDS, description)
 
     def getEmbed(self, flags: [str]) -> Embed:
         color = Color.dark_green()
@@ -81,15 +85,16 @@ class VideoGameObj:
             embed.add_field(name="Available Copies", value=f"{self.copies_available}", inline=True)
         return embed
 
-    def getInsertQueries(self, nextID: int) -> [(str, list)]:
+    def getItemInsertQuery(self) -> (str, list):
+        insertItemQuery = "INSERT INTO items (id, name, length, description, thumbnail, type, copies) VALUES (?, ?, ?, ?, ?, ?, ?)"
+        insertItemValues = [self.id if self.id >= 0 else None, self.title, self.length, self.description, self.thumbnail, "videogame", self.copies]
+        return insertItemQuery, insertItemValues
+
+    def getDetailInsertQueries(self) -> [(str, list)]:
         queries = []
-        self.id = nextID
         insertVideoGameQuery = "INSERT INTO videogames (id, min_players, max_players, playing_time, difficulty, platform) VALUES (?, ?, ?, ?, ?, ?);"
         insertVideoGameValues = [self.id, self.minPlayers, self.maxPlayers, self.playingTime, self.difficulty.value, self.platform.value]
         queries.append((insertVideoGameQuery, insertVideoGameValues))
-        insertItemQuery = "INSERT INTO items (id, name, length, description, thumbnail, type, copies) VALUES (?, ?, ?, ?, ?, ?, ?);"
-        insertItemValues = [self.id, self.title, self.length, self.description, self.thumbnail, "videogame", self.copies]
-        queries.append((insertItemQuery, insertItemValues))
         for category in self.categories:
             insertCategoryQuery = "INSERT INTO categories (id, category) VALUES (?, ?);"
             insertCategoryValues = [self.id, category]
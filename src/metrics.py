@@ -0,0 +1,175 @@
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Callable
+
+from disnake.http import HTTPClient
+from disnake.webhook.async_ import AsyncWebhookAdapter
+
+# Upper bounds in seconds of the latency histogram buckets, slower commands land in a last overflow bucket
+LATENCY_BUCKETS: [float] = [0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+PHASES: [str] = ["db", "bgg", "discord"]
+
+# Seconds spent in each phase by the command that the current task is running for
+currentPhases: ContextVar[dict[str, float] | None] = ContextVar("currentPhases", default=None)
+
+
+@contextmanager
+def measurePhase(phase: str):
+    phases = currentPhases.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        # Tasks started by a command share its dict, so parallel calls add up and a phase can exceed the command's latency
+        if phases is not None:
+            phases[phase] += time.perf_counter() - start
+
+
+def timedPhase(phase: str) -> Callable:
+    def decorator(function: Callable) -> Callable:
+        @wraps(function)
+        async def call(*args, **kwargs):
+            with measurePhase(phase):
+                return await function(*args, **kwargs)
+        return call
+    return decorator
+
+
+def instrumentDiscord():
+    # REST calls go through HTTPClient, interaction responses and followups through the webhook adapter
+    for cls in (HTTPClient, AsyncWebhookAdapter):
+        if not hasattr(cls.request, "__wrapped__"):
+            cls.request = timedPhase("discord")(cls.request)
+
+
+@dataclass
+class CommandStats:
+    count: int = 0
+    errors: int = 0
+    totalTime: float = 0.0
+    maxTime: float = 0.0
+    buckets: [int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    phases: dict[str, float] = field(default_factory=lambda: dict.fromkeys(PHASES, 0.0))
+
+    def percentile(self, q: float) -> float:
+        # Histograms only know the bucket, so this is the bucket's upper bound
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= target:
+                return min(bound, self.maxTime)
+        return self.maxTime
+
+
+class CommandMetrics:
+    instance: 'CommandMetrics' = None
+
+    def __init__(self, path: str = "data_files/metrics.prom", interval: float = 60.0):
+        self.path: str = path
+        self.interval: float = interval
+        self.commands: dict[str, CommandStats] = {}
+        self.startedAt: float = time.time()
+
+    def _getStats(self, command: str) -> CommandStats:
+        if command not in self.commands:
+            self.commands[command] = CommandStats()
+        return self.commands[command]
+
+    @contextmanager
+    def track(self, command: str):
+        phases = dict.fromkeys(PHASES, 0.0)
+        token = currentPhases.set(phases)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            currentPhases.reset(token)
+            stats = self._getStats(command)
+            stats.count += 1
+            stats.totalTime += elapsed
+            stats.maxTime = max(stats.maxTime, elapsed)
+            stats.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+            for phase, spent in phases.items():
+                stats.phases[phase] += spent
+
+    def recordError(self, command: str):
+        self._getStats(command).errors += 1
+
+    def getStats(self) -> list[dict]:
+        stats = []
+        for command, data in sorted(self.commands.items(), key=lambda item: item[1].totalTime, reverse=True):
+            stats.append({
+                "command": command,
+                "count": data.count,
+                "errors": data.errors,
+                "average": data.totalTime / data.count if data.count > 0 else 0.0,
+                "p50": data.percentile(0.5),
+                "p95": data.percentile(0.95),
+                "max": data.maxTime,
+                "phases": {phase: spent / data.count if data.count > 0 else 0.0 for phase, spent in data.phases.items()}
+            })
+        return stats
+
+    def render(self) -> str:
+        lines = [
+            "# HELP gdtbot_command_duration_seconds Time taken by application commands.",
+            "# TYPE gdtbot_command_duration_seconds histogram"
+        ]
+        for command, data in sorted(self.commands.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, data.buckets):
+                cumulative += count
+                lines.append(f'gdtbot_command_duration_seconds_bucket{{command="{command}",le="{bound}"}} {cumulative}')
+            lines.append(f'gdtbot_command_duration_seconds_bucket{{command="{command}",le="+Inf"}} {data.count}')
+            lines.append(f'gdtbot_command_duration_seconds_sum{{command="{command}"}} {data.totalTime}')
+            lines.append(f'gdtbot_command_duration_seconds_count{{command="{command}"}} {data.count}')
+        lines += [
+            "# HELP gdtbot_command_errors_total Application commands that ended with an error.",
+            "# TYPE gdtbot_command_errors_total counter"
+        ]
+        lines += [f'gdtbot_command_errors_total{{command="{command}"}} {data.errors}' for command, data in sorted(self.commands.items())]
+        lines += [
+            "# HELP gdtbot_command_phase_seconds_total Time application commands spent waiting on the database, BGG and Discord.",
+            "# TYPE gdtbot_command_phase_seconds_total counter"
+        ]
+        lines += [f'gdtbot_command_phase_seconds_total{{command="{command}",phase="{phase}"}} {spent}'
+                  for command, data in sorted(self.commands.items()) for phase, spent in data.phases.items()]
+        lines += [
+            "# HELP gdtbot_start_time_seconds Unix time at which the bot started.",
+            "# TYPE gdtbot_start_time_seconds gauge",
+            f"gdtbot_start_time_seconds {self.startedAt}"
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        # Written to a temporary file and renamed so collectors never read a half written file
+        temporaryPath = f"{self.path}.tmp"
+        with open(temporaryPath, "w") as file:
+            file.write(self.render())
+        os.replace(temporaryPath, self.path)
+
+    async def writePeriodically(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.write()
+            except OSError as e:
+                print(f"Could not write metrics to '{self.path}': {e}")
+
+    @staticmethod
+    def initInstance(**settings):
+        CommandMetrics.instance = CommandMetrics(**settings)
+
+    @staticmethod
+    def getInstance() -> 'CommandMetrics':
+        if CommandMetrics.instance is None:
+            CommandMetrics.initInstance()
+        return CommandMetrics.instance
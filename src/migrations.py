@@ -0,0 +1,47 @@
+import os
+import sqlite3 as SQLite
+
+
+class MigrationManager:
+    def __init__(self, directory: str):
+        self.directory: str = directory
+        self.migrations: list[tuple[int, str, str]] = []
+        for fileName in sorted(os.listdir(directory)):
+            if not fileName.endswith(".sql"):
+                continue
+            version, _, name = fileName[:-4].partition("_")
+            with open(os.path.join(directory, fileName), 'r') as data:
+                self.migrations.append((int(version), name, data.read()))
+        self.migrations.sort(key=lambda migration: migration[0])
+        versions = [migration[0] for migration in self.migrations]
+        if versions != list(range(1, len(versions) + 1)):
+            raise ValueError(f"Migrations in '{directory}' must be numbered consecutively from 1, found {versions}")
+
+    @property
+    def latestVersion(self) -> int:
+        return self.migrations[-1][0] if len(self.migrations) > 0 else 0
+
+    @staticmethod
+    def getVersion(connection: SQLite.Connection) -> int:
+        cursor = connection.cursor()
+        cursor.row_factory = None
+        return cursor.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self, connection: SQLite.Connection) -> int:
+        current = MigrationManager.getVersion(connection)
+        if current > self.latestVersion:
+            raise ValueError(f"Database version {current} is newer than the latest known migration {self.latestVersion}")
+        applied = 0
+        for version, name, script in self.migrations:
+            if version <= current:
+                continue
+            print(f"Applying migration {version} ({name})...")
+            # user_version is part of the database header, so it is committed atomically with the migration itself
+            try:
+                connection.executescript(f"BEGIN;\n{script}\n;PRAGMA user_version = {version};\nCOMMIT;")
+            except SQLite.Error:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+            applied += 1
+        return applied
@@ -0,0 +1,102 @@
+import asyncio
+import contextvars
+import time
+
+from disnake import Embed, Forbidden, Guild, HTTPException
+
+from src.async_database import AsyncDBManager
+from src.utils.member_resolver import MemberResolver
+
+
+class NotificationDispatcher:
+    instance: 'NotificationDispatcher' = None
+
+    def __init__(self, workers: int = 4, maxQueued: int = 1000, maxRetries: int = 3, retryDelay: float = 2.0, failureDays: int = 7):
+        self.workerCount: int = workers
+        self.maxQueued: int = maxQueued
+        self.maxRetries: int = maxRetries
+        self.retryDelay: float = retryDelay
+        self.failureDays: int = failureDays
+        self.queue: asyncio.Queue | None = None
+        self.workers: list[asyncio.Task] = []
+        # Users whose DMs failed recently and when, loaded from the database on the first delivery
+        self.blocked: dict[int, float] | None = None
+
+    def _start(self):
+        # Workers are started lazily so they run on the bot's event loop. They get an empty context, otherwise they
+        # would inherit the metrics of the command that started them and add every later DM to it
+        if len(self.workers) == 0:
+            self.queue = asyncio.Queue(self.maxQueued)
+            self.workers = [asyncio.create_task(self._work(), context=contextvars.Context()) for _ in range(self.workerCount)]
+
+    def notify(self, guild: Guild, userIDs: [int], embed: Embed):
+        self._start()
+        for userID in userIDs:
+            try:
+                self.queue.put_nowait((guild, userID, embed))
+            except asyncio.QueueFull:
+                print(f"Notification queue is full, dropping DM to {userID}")
+
+    async def _work(self):
+        while True:
+            guild, userID, embed = await self.queue.get()
+            try:
+                await self._deliver(guild, userID, embed)
+            except Exception as e:
+                print(f"Could not send DM to {userID}: {e!r}")
+            finally:
+                self.queue.task_done()
+
+    def _isBlocked(self, userID: int) -> bool:
+        failedAt = self.blocked.get(userID)
+        if failedAt is None:
+            return False
+        # Failures expire like they do in the database, users who reopened their DMs are tried again
+        if time.time() - failedAt > self.failureDays * 24 * 60 * 60:
+            del self.blocked[userID]
+            return False
+        return True
+
+    async def _deliver(self, guild: Guild, userID: int, embed: Embed):
+        if self.blocked is None:
+            self.blocked = await AsyncDBManager.getInstance().getDMFailures(self.failureDays)
+        if self._isBlocked(userID):
+            return
+        member = await MemberResolver.getInstance().resolve(guild, userID)
+        if member is None:
+            return
+        for attempt in range(self.maxRetries + 1):
+            try:
+                await member.send(embed=embed)
+                return
+            except Forbidden as e:
+                # DMs are closed or the bot is blocked, retrying would fail the same way
+                self.blocked[userID] = time.time()
+                await AsyncDBManager.getInstance().addDMFailure(userID, e.text or "Forbidden")
+                return
+            except HTTPException as e:
+                # disnake already waits out rate limits it knows about, these retries cover the ones it gives up on
+                if (e.status != 429 and e.status < 500) or attempt == self.maxRetries:
+                    print(f"Could not send DM to {userID}: {e}")
+                    return
+                await asyncio.sleep(self.retryDelay * 2 ** attempt)
+
+    async def close(self, timeout: float = 10.0):
+        if self.queue is not None:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                print(f"Dropping {self.queue.qsize()} pending notifications")
+        for worker in self.workers:
+            worker.cancel()
+        self.workers = []
+
+    @staticmethod
+    def initInstance(**settings):
+        NotificationDispatcher.instance = NotificationDispatcher(**settings)
+
+    @staticmethod
+    def getInstance() -> 'NotificationDispatcher':
+        if NotificationDispatcher.instance is None:
+            NotificationDispatcher.initInstance()
+        return NotificationDispatcher.instance
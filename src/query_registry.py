@@ -0,0 +1,70 @@
+import os
+import sqlite3 as SQLite
+from string import Formatter
+
+
+class QueryRegistry:
+    def __init__(self, directory: str):
+        self.directory: str = directory
+        self.templates: dict[str, str] = {}
+        self.fieldCounts: dict[str, int] = {}
+        self.variants: dict[str, set[tuple]] = {}
+        self.compiled: dict[tuple, str] = {}
+        self.reload()
+
+    def reload(self):
+        templates = {}
+        fieldCounts = {}
+        for fileName in sorted(os.listdir(self.directory)):
+            if not fileName.endswith(".sql"):
+                continue
+            with open(os.path.join(self.directory, fileName), 'r') as data:
+                template = data.read()
+            name = fileName[:-4]
+            templates[name] = template
+            fieldCounts[name] = QueryRegistry._countFields(name, template)
+        self.templates = templates
+        self.fieldCounts = fieldCounts
+        self.compiled = {}
+        for name, variants in self.variants.items():
+            for args in variants:
+                self._compile(name, args)
+
+    def register(self, name: str, variants: list[tuple] = ((),)):
+        self.variants.setdefault(name, set()).update(variants)
+        for args in variants:
+            self._compile(name, args)
+
+    def get(self, name: str, *args) -> str:
+        query = self.compiled.get((name, *args))
+        if query is None:
+            query = self._compile(name, args)
+        return query
+
+    def validate(self, connection: SQLite.Connection):
+        cursor = connection.cursor()
+        for name, variants in self.variants.items():
+            for args in variants:
+                try:
+                    cursor.execute("EXPLAIN " + self.get(name, *args))
+                except SQLite.ProgrammingError:
+                    pass  # The statement was prepared successfully, only the parameter bindings are missing
+                except SQLite.Error as e:
+                    raise ValueError(f"Query '{name}' {args} is not valid: {e}")
+
+    def _compile(self, name: str, args: tuple) -> str:
+        if name not in self.templates:
+            raise KeyError(f"Query '{name}' not found in '{self.directory}'")
+        if len(args) != self.fieldCounts[name]:
+            raise ValueError(f"Query '{name}' expects {self.fieldCounts[name]} format arguments, got {len(args)}")
+        query = self.templates[name].format(*args) if len(args) > 0 else self.templates[name]
+        self.compiled[(name, *args)] = query
+        return query
+
+    @staticmethod
+    def _countFields(name: str, template: str) -> int:
+        fields = [field for _, field, _, _ in Formatter().parse(template) if field is not None]
+        if any(field not in ("", "0") for field in fields):
+            raise ValueError(f"Query '{name}' uses unsupported format fields {fields}")
+        # '{0}' can be repeated, positional '{}' fields are consumed in order
+        return 1 if "0" in fields else len(fields)
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TextIO
+from uuid import uuid4
+
+from disnake import Color, Embed, Forbidden, HTTPException, NotFound
+from disnake.ext.commands import InteractionBot
+
+from src.async_database import AsyncDBManager
+
+
+class ReminderRunner:
+    def __init__(self, bot: InteractionBot, journalPath: str = "data_files/reminders.journal", concurrency: int = 5):
+        self.bot: InteractionBot = bot
+        self.journalPath: str = journalPath
+        self.concurrency: int = concurrency
+
+    @staticmethod
+    def _getEmbed(borrow: dict) -> Embed:
+        if borrow['return_status'] == 'overdue':
+            return Embed(title="Reminder", description=f"You are overdue to return {borrow['item_name']} ", color=Color.red())
+        return Embed(title="Reminder", description=f"You are scheduled to return {borrow['item_name']} " + borrow['return_status'], color=Color.red())
+
+    async def _recover(self) -> int:
+        # Borrows in the journal were handled by a run that never reached its batched update
+        if not os.path.exists(self.journalPath):
+            done = []
+        else:
+            with open(self.journalPath, 'r') as journal:
+                done = [tuple(json.loads(line)) for line in journal if line.strip() != ""]
+        recovered = await AsyncDBManager.getInstance().finishReminders(done, None)
+        if os.path.exists(self.journalPath):
+            os.remove(self.journalPath)
+        return recovered
+
+    async def _send(self, borrow: dict) -> bool:
+        try:
+            user = self.bot.get_user(borrow['user']) or await self.bot.fetch_user(borrow['user'])
+            await user.send(embed=ReminderRunner._getEmbed(borrow))
+        except Forbidden as e:
+            await AsyncDBManager.getInstance().addDMFailure(borrow['user'], e.text or "Forbidden")
+        except NotFound:
+            pass
+        except HTTPException as e:
+            # Left claimed until the end of the run, then released so the next run tries again
+            print(f"Could not send reminder to {borrow['user']}: {e}")
+            return False
+        return True
+
+    @staticmethod
+    def _writeJournal(journal: TextIO, key: tuple):
+        journal.write(json.dumps(key) + "\n")
+        journal.flush()
+        os.fsync(journal.fileno())
+
+    async def run(self) -> dict:
+        start = time.perf_counter()
+        recovered = await self._recover()
+        claim = uuid4().hex
+        borrows = await AsyncDBManager.getInstance().claimReminders(claim)
+        claimed = time.perf_counter()
+
+        done = []
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # fsync blocks until the disk confirms, so the journal is written by its own thread, one line at a time
+        journalWriter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reminder_journal")
+        with open(self.journalPath, 'a') as journal:
+            async def process(borrow: dict):
+                async with semaphore:
+                    if not await self._send(borrow):
+                        return
+                key = (borrow['user'], borrow['item'], borrow['retrieval_key'])
+                await asyncio.get_running_loop().run_in_executor(journalWriter, ReminderRunner._writeJournal, journal, key)
+                done.append(key)
+
+            try:
+                await asyncio.gather(*[process(borrow) for borrow in borrows])
+            finally:
+                journalWriter.shutdown(wait=True)
+        sent = time.perf_counter()
+
+        await AsyncDBManager.getInstance().finishReminders(done, claim)
+        os.remove(self.journalPath)
+        finished = time.perf_counter()
+
+        stats = {
+            "claimed": len(borrows),
+            "done": len(done),
+            "failed": len(borrows) - len(done),
+            "recovered": recovered,
+            "claimTime": claimed - start,
+            "sendTime": sent - claimed,
+            "markTime": finished - sent
+        }
+        print(f"Reminders: {stats['done']}/{stats['claimed']} handled, {stats['failed']} failed, {recovered} recovered "
+              f"(claim {stats['claimTime'] * 1000:.0f}ms, send {stats['sendTime'] * 1000:.0f}ms, mark {stats['markTime'] * 1000:.0f}ms)")
+        return stats
@@ -1,13 +1,15 @@
 import math
 from http.client import HTTPException
-from typing import Callable
+from typing import Awaitable, Callable
 
 import disnake
 from disnake import Embed
 
+from src.utils.embed_cache import EmbedCache
+
 
 class BorrowPaginator(disnake.ui.View):
-    def __init__(self, items: list, initialEmbed: Embed, embedFactory: Callable[[list], Embed]):
+    def __init__(self, items: list, initialEmbed: Embed, embedFactory: Callable[[list], Embed], pagePreparer: Callable[[list], Awaitable[None]] = None):
         super().__init__(timeout=30)
         self.msg = None
 
@@ -16,6 +18,10 @@ class BorrowPaginator(disnake.ui.View):
         self.pages = math.ceil(len(items) / 9.0)
         self.embed: Embed = initialEmbed
         self.embedFactory = embedFactory
+        # Optional hook to fill in data that is only worth resolving for the page being shown
+        self.pagePreparer = pagePreparer
+        # The items are a snapshot, so a rendered page stays valid for the whole life of the view
+        self.pageEmbeds: EmbedCache = EmbedCache(maxSize=16)
 
         self.first_page.disabled = True
         self.prev_page.disabled = True
@@ -23,9 +29,14 @@ class BorrowPaginator(disnake.ui.View):
         self.last_page.disabled = 0 == self.pages - 1
 
     async def changeEmbed(self, interaction):
-        itemSlice = self.items[self.embed_index * 9:self.embed_index * 9 + 9]
-        self.embed = self.embedFactory(itemSlice)  # getBorrowsListEmbed(itemSlice, self.user, self.current)
-        self.embed.set_footer(text="page {} of {}".format(self.embed_index + 1, self.pages))
+        self.embed = self.pageEmbeds.find(self.embed_index)
+        if self.embed is None:
+            itemSlice = self.items[self.embed_index * 9:self.embed_index * 9 + 9]
+            if self.pagePreparer is not None:
+                await self.pagePreparer(itemSlice)
+            self.embed = self.embedFactory(itemSlice)  # getBorrowsListEmbed(itemSlice, self.user, self.current)
+            self.embed.set_footer(text="page {} of {}".format(self.embed_index + 1, self.pages))
+            self.pageEmbeds.put(self.embed_index, self.embed)
 
         self.prev_page.disabled = self.embed_index == 0
         self.next_page.disabled = self.embed_index == self.pages - 1
@@ -1,4 +1,5 @@
-from typing import Callable
+from inspect import isawaitable
+from typing import Callable, Awaitable
 
 import disnake
 from disnake import HTTPException, Embed
@@ -7,7 +8,7 @@ from src.database import ObjectType, DBManager
 
 
 class ConfirmDialog(disnake.ui.View):
-    def __init__(self, initialEmbed, onConfirm: Callable[[], Embed], messageAuthor, labelYes="Yes", labelNo="No"):
+    def __init__(self, initialEmbed, onConfirm: Callable[[], Embed | Awaitable[Embed]], messageAuthor, labelYes="Yes", labelNo="No"):
         super().__init__(timeout=30)
         self.msgAuthor = messageAuthor
         self.embed: Embed = initialEmbed
@@ -19,6 +20,8 @@ class ConfirmDialog(disnake.ui.View):
         try:
             if confirmed:
                 embed = self.onConfirm()
+                if isawaitable(embed):
+                    embed = await embed
                 await interaction.response.edit_message(embed=embed, view=None)
             else:
                 await interaction.response.edit_message(embed=Embed(title="Operation cancelled", color=disnake.Color.red()), view=None)
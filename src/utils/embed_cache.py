@@ -0,0 +1,50 @@
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from disnake import Embed
+
+
+class EmbedCache:
+    instance: 'EmbedCache' = None
+
+    def __init__(self, maxSize: int = 256):
+        self.maxSize: int = maxSize
+        self.embeds: OrderedDict[Hashable, Embed] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def find(self, key: Hashable) -> Embed | None:
+        # Keys must cover everything the embed shows, cached embeds are shared and must not be modified
+        embed = self.embeds.get(key)
+        if embed is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.embeds.move_to_end(key)
+        return embed
+
+    def put(self, key: Hashable, embed: Embed):
+        self.embeds[key] = embed
+        self.embeds.move_to_end(key)
+        while len(self.embeds) > self.maxSize:
+            self.embeds.popitem(last=False)
+
+    def get(self, key: Hashable, render: Callable[[], Embed]) -> Embed:
+        embed = self.find(key)
+        if embed is None:
+            embed = render()
+            self.put(key, embed)
+        return embed
+
+    def clear(self):
+        self.embeds.clear()
+
+    @staticmethod
+    def initInstance(maxSize: int = 256):
+        EmbedCache.instance = EmbedCache(maxSize)
+
+    @staticmethod
+    def getInstance() -> 'EmbedCache':
+        if EmbedCache.instance is None:
+            EmbedCache.initInstance()
+        return EmbedCache.instance
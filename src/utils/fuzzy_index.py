@@ -0,0 +1,55 @@
+import heapq
+import re
+from collections import Counter
+
+try:
+    from rapidfuzz.fuzz import partial_ratio
+except ImportError:
+    from fuzzywuzzy.fuzz import partial_ratio
+
+TYPE_PREFIX = re.compile(r"^\[[^]]*]\s*")
+
+
+class FuzzyIndex:
+    def __init__(self, candidateLimit: int = 50):
+        self.candidateLimit: int = candidateLimit
+        self.categories: dict[str, str] = {}
+        self.grams: dict[str, set[str]] = {}
+
+    def __len__(self):
+        return len(self.categories)
+
+    @staticmethod
+    def _getGrams(name: str) -> set[str]:
+        # The "[TYPE]" prefix is shared by every suggestion of a type, so it would only add noise to the candidates
+        text = f"  {TYPE_PREFIX.sub("", name).lower()} "
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, name: str, category: str = ""):
+        if name in self.categories:
+            self.remove(name)
+        self.categories[name] = category
+        for gram in FuzzyIndex._getGrams(name):
+            self.grams.setdefault(gram, set()).add(name)
+
+    def remove(self, name: str):
+        if self.categories.pop(name, None) is None:
+            return
+        for gram in FuzzyIndex._getGrams(name):
+            names = self.grams.get(gram)
+            if names is None:
+                continue
+            names.discard(name)
+            if len(names) == 0:
+                del self.grams[gram]
+
+    def search(self, query: str, limit: int = 3, category: str = "") -> [str]:
+        shared = Counter()
+        for gram in FuzzyIndex._getGrams(query):
+            shared.update(self.grams.get(gram, ()))
+        if category != "":
+            candidates = [name for name, _ in shared.most_common() if self.categories[name] == category][:self.candidateLimit]
+        else:
+            candidates = [name for name, _ in shared.most_common(self.candidateLimit)]
+        scored = heapq.nlargest(limit, ((partial_ratio(name, query), name) for name in candidates))
+        return [name for _, name in scored]
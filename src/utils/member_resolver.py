@@ -0,0 +1,67 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from disnake import Guild, Member, NotFound, HTTPException
+
+
+class MemberResolver:
+    instance: 'MemberResolver' = None
+
+    def __init__(self, maxSize: int = 1024, ttl: float = 600.0, concurrency: int = 5):
+        self.maxSize: int = maxSize
+        self.ttl: float = ttl
+        self.semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+        # (guild, user) -> (expiry, member), members that could not be fetched are cached as None
+        self.cache: OrderedDict[tuple[int, int], tuple[float, Member | None]] = OrderedDict()
+
+    def _getCached(self, key: tuple[int, int]) -> (bool, Member | None):
+        entry = self.cache.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] < time.monotonic():
+            del self.cache[key]
+            return False, None
+        self.cache.move_to_end(key)
+        return True, entry[1]
+
+    def _store(self, key: tuple[int, int], member: Member | None):
+        self.cache[key] = (time.monotonic() + self.ttl, member)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.maxSize:
+            self.cache.popitem(last=False)
+
+    async def resolve(self, guild: Guild, userID: int) -> Member | None:
+        # Members in the gateway cache are free, only the rest cost a REST call
+        member = guild.get_member(userID)
+        if member is not None:
+            return member
+        key = (guild.id, userID)
+        found, member = self._getCached(key)
+        if found:
+            return member
+        async with self.semaphore:
+            try:
+                member = await guild.fetch_member(userID)
+            except NotFound:
+                member = None
+            except HTTPException as e:
+                print(f"Could not fetch member {userID}: {e}")
+                return None
+        self._store(key, member)
+        return member
+
+    async def resolveMany(self, guild: Guild, userIDs: [int]) -> dict[int, Member]:
+        userIDs = list(dict.fromkeys(userIDs))
+        members = await asyncio.gather(*[self.resolve(guild, userID) for userID in userIDs])
+        return {userID: member for userID, member in zip(userIDs, members) if member is not None}
+
+    @staticmethod
+    def initInstance(**settings):
+        MemberResolver.instance = MemberResolver(**settings)
+
+    @staticmethod
+    def getInstance() -> 'MemberResolver':
+        if MemberResolver.instance is None:
+            MemberResolver.initInstance()
+        return MemberResolver.instance
@@ -1,28 +1,108 @@
+import asyncio
+from typing import Awaitable, Callable
+
 import disnake
 from disnake import HTTPException, Embed
 
+from src.async_database import AsyncDBManager
+from src.utils.embed_cache import EmbedCache
+
+ITEMS_PER_FETCH = 10
+
 
 class ItemPaginator(disnake.ui.View):
-    def __init__(self, items: list, flags: [str], initialEmbed: Embed):
+    def __init__(self, items: list, flags: [str], initialEmbed: Embed, total: int = None, pageFetcher: Callable[[int, int], Awaitable[list]] = None,
+                 version: int = None):
         super().__init__(timeout=45)
 
         self.msg = None
-        self.items = items
         self.flags = flags
         self.embed_index: int = 0
         self.embed: Embed = initialEmbed
+        # Without a fetcher the given items are the whole result, otherwise they are its first page and the rest is
+        # fetched by (offset, limit) when needed. Only the current page and its neighbours are kept
+        self.total: int = total if total is not None else len(items)
+        self.pageSize: int = ITEMS_PER_FETCH if pageFetcher is not None else max(len(items), 1)
+        self.pageFetcher = pageFetcher
+        self.pages: dict[int, list] = {0: items}
+        # Data version read before each page was loaded, an embed drawn from a page is only valid for that version
+        self.pageVersions: dict[int, int] = {0: version if version is not None else AsyncDBManager.getInstance().getDataVersion()}
+        self.fetching: dict[int, asyncio.Task] = {}
 
         self.first_page.disabled = True
         self.prev_page.disabled = True
-        self.next_page.disabled = 0 == len(self.items) - 1
-        self.last_page.disabled = 0 == len(self.items) - 1
+        self.next_page.disabled = 0 == self.total - 1
+        self.last_page.disabled = 0 == self.total - 1
+
+    async def _fetchPage(self, page: int) -> list:
+        try:
+            version = AsyncDBManager.getInstance().getDataVersion()
+            items = await self.pageFetcher(page * self.pageSize, self.pageSize)
+            self.pages[page] = items
+            self.pageVersions[page] = version
+            return items
+        finally:
+            self.fetching.pop(page, None)
+
+    @staticmethod
+    def _logFetchError(task: asyncio.Task):
+        # Prefetches are never awaited if the user does not reach their page, their errors would go unretrieved
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Could not fetch page: {task.exception()!r}")
+
+    def _startFetch(self, page: int) -> asyncio.Task:
+        if page not in self.fetching:
+            self.fetching[page] = asyncio.create_task(self._fetchPage(page))
+            self.fetching[page].add_done_callback(ItemPaginator._logFetchError)
+        return self.fetching[page]
+
+    async def _getItem(self, index: int):
+        page = index // self.pageSize
+        items = self.pages.get(page)
+        if items is None:
+            items = await self._startFetch(page)
+        self.pages = {key: value for key, value in self.pages.items() if abs(key - page) <= 1}
+        self.pageVersions = {key: value for key, value in self.pageVersions.items() if key in self.pages}
+        # The page the user is moving towards is fetched while they look at the current one
+        nextPage = page + 1 if index % self.pageSize >= self.pageSize // 2 else page - 1
+        if self.pageFetcher is not None and 0 <= nextPage * self.pageSize < self.total and nextPage not in self.pages:
+            self._startFetch(nextPage)
+        if index % self.pageSize >= len(items):
+            # Items were removed since the result was counted, it now ends on this page
+            self.total = min(self.total, page * self.pageSize + len(items))
+            return None
+        return items[index % self.pageSize]
+
+    @staticmethod
+    def _render(item, flags: [str], footer: str) -> Embed:
+        embed = item.getEmbed(flags)
+        embed.set_footer(text=footer)
+        return embed
 
     async def changeEmbed(self, interaction: disnake.MessageInteraction):
-        self.embed = self.items[self.embed_index].getEmbed(self.flags)
-        self.embed.set_footer(text=f"Item {self.embed_index + 1} of {len(self.items)}")
+        item = await self._getItem(self.embed_index)
+        while item is None and self.total > 0:
+            self.embed_index = min(self.embed_index, self.total - 1)
+            item = await self._getItem(self.embed_index)
+        if item is None:
+            self.embed = Embed(title="Results changed", description="The items in this search are gone, run the search again", color=disnake.Color.red())
+            for button in (self.first_page, self.prev_page, self.next_page, self.last_page):
+                button.disabled = True
+            try:
+                await interaction.response.edit_message(embed=self.embed, view=self)
+            except HTTPException as e:
+                print(f"HTTP Exception: \n {str(e)}")
+            return
+
+        footer = f"Item {self.embed_index + 1} of {self.total}"
+        # Embeds are shared between views, so they are keyed by the version of the page they were drawn from. A view
+        # still showing an older page can then never hand its embed to a newer search
+        version = self.pageVersions[self.embed_index // self.pageSize]
+        key = (type(item).__name__, item.id, getattr(item, "bggId", -1), str(self.flags), footer, version)
+        self.embed = EmbedCache.getInstance().get(key, lambda: ItemPaginator._render(item, self.flags, footer))
 
         self.prev_page.disabled = self.embed_index == 0
-        self.next_page.disabled = self.embed_index == len(self.items) - 1
+        self.next_page.disabled = self.embed_index == self.total - 1
         self.first_page.disabled = self.prev_page.disabled
         self.last_page.disabled = self.next_page.disabled
         try:
@@ -47,7 +127,7 @@ class ItemPaginator(disnake.ui.View):
 
     @disnake.ui.button(emoji="⏩", style=disnake.ButtonStyle.blurple, row=0)
     async def last_page(self, button: disnake.ui.Button, interaction: disnake.MessageInteraction):
-        self.embed_index = len(self.items) - 1
+        self.embed_index = self.total - 1
         await self.changeEmbed(interaction)
 
     async def on_timeout(self) -> None:
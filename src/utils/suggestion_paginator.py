@@ -1,21 +1,31 @@
 import math
 from http.client import HTTPException
-from typing import Callable
+from typing import Awaitable, Callable
 
 import disnake
 from disnake import Embed
 
+from src.async_database import AsyncDBManager
+from src.utils.embed_cache import EmbedCache
+
+SUGGESTIONS_PER_PAGE = 9
+
 
 class SuggestionPaginator(disnake.ui.View):
-    def __init__(self, items: list):
+    def __init__(self, items: list, total: int, pageFetcher: Callable[[int], Awaitable[list]]):
         super().__init__(timeout=30)
         self.msg = None
 
         self.embed_index = 0
         self.embed = None
+        # Only the current page is kept, the rest are fetched when the user moves to them
         self.items = items
-        self.pages = math.ceil(len(items) / 9.0)
+        self.pageFetcher = pageFetcher
+        self.pages = math.ceil(total / SUGGESTIONS_PER_PAGE)
+        # Pages are cached with the data version they were fetched at, any database change makes them stale
+        self.pageEmbeds: EmbedCache = EmbedCache(maxSize=16)
         self.createEmbed()
+        self.pageEmbeds.put((0, AsyncDBManager.getInstance().getDataVersion()), self.embed)
 
         self.first_page.disabled = True
         self.prev_page.disabled = True
@@ -23,7 +33,12 @@ class SuggestionPaginator(disnake.ui.View):
         self.last_page.disabled = 0 == self.pages - 1
 
     async def changeEmbed(self, interaction):
-        self.createEmbed()
+        key = (self.embed_index, AsyncDBManager.getInstance().getDataVersion())
+        self.embed = self.pageEmbeds.find(key)
+        if self.embed is None:
+            self.items = await self.pageFetcher(self.embed_index)
+            self.createEmbed()
+            self.pageEmbeds.put(key, self.embed)
 
         self.prev_page.disabled = self.embed_index == 0
         self.next_page.disabled = self.embed_index == self.pages - 1
@@ -59,9 +74,8 @@ class SuggestionPaginator(disnake.ui.View):
         await self.msg.edit(view=None)
 
     def createEmbed(self):
-        itemSlice = self.items[self.embed_index * 9: (self.embed_index * 9 + 9 if self.embed_index < self.pages - 1 else len(self.items))]
         string = ""
-        for item in itemSlice:
+        for item in self.items:
             string += f"{item}\n"
         self.embed = Embed(title="Top Suggestions" if self.embed_index == 0 else "Suggestions", description=string, color=disnake.Color.blue())
         self.embed.set_footer(text="page {} of {}".format(self.embed_index + 1, self.pages))
@@ -0,0 +1,34 @@
+import contextlib
+import gc
+import io
+import os
+import tempfile
+import unittest
+
+from src.database import DBManager
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+class DatabaseTestCase(unittest.TestCase):
+    # Every test gets a fresh database with the default catalog
+    def setUp(self):
+        # DBManager resolves its query and data files relative to src
+        self.previousDir = os.getcwd()
+        os.chdir(SRC_DIR)
+        self.tempDir = tempfile.TemporaryDirectory()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.db = DBManager(os.path.join(self.tempDir.name, "database.sqlite"))
+
+    def tearDown(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            del self.db
+            # Wrappers cached by AsyncDBManager form a cycle, collecting here closes the connection before the files go
+            gc.collect()
+        self.tempDir.cleanup()
+        os.chdir(self.previousDir)
+
+    def query(self, query: str, args: tuple = ()) -> list[tuple]:
+        cursor = self.db.connection.cursor()
+        cursor.row_factory = None
+        return cursor.execute(query, args).fetchall()
@@ -0,0 +1,49 @@
+import os
+import unittest
+
+from benchmarks.bgg_server import FIXTURES_DIR
+from src.bgg_parser import iterSearchIDs, iterThings
+
+
+def readFixture(*path: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, *path), "rb") as fixture:
+        return fixture.read()
+
+
+def thingResponse(*items: bytes) -> bytes:
+    # Thing fixtures hold one item each, BGG wraps the items of a response in <items>
+    return b'<?xml version="1.0" encoding="utf-8"?><items>' + b"".join(items) + b"</items>"
+
+
+class BGGParserTest(unittest.TestCase):
+    def test_things(self):
+        things = list(iterThings(thingResponse(*[readFixture("thing", f"{bggID}.xml") for bggID in (13, 822, 926)])))
+        # Only the first, primary name is kept
+        self.assertEqual([(thing["id"], thing["type"], thing["name"]) for thing in things],
+                         [(13, "boardgame", "CATAN"), (822, "boardgame", "Carcassonne"), (926, "boardgameexpansion", "CATAN: Seafarers")])
+        catan = things[0]
+        self.assertEqual((catan["minPlayers"], catan["maxPlayers"], catan["playingTime"]), (3, 4, 120))
+        self.assertEqual(catan["categories"], ["Economic", "Negotiation"])
+        self.assertEqual((catan["rank"], catan["averageRating"], catan["bggRating"]), (550, 7.09, 6.92))
+        self.assertTrue(catan["description"].startswith("In CATAN, players try to be the dominant"))
+        self.assertTrue(catan["thumbnail"].startswith("https://cf.geekdo-images.com/"))
+        # Categories and ranks of one item must not leak into the next
+        self.assertEqual(things[1]["categories"], ["Medieval", "Territory Building"])
+        self.assertEqual(things[2]["rank"], -1)
+
+    def test_empty_fields_keep_their_defaults(self):
+        thing, = iterThings(thingResponse(b'<item type="boardgame" id="1"><description/><description>  </description>'
+                                          b'<minplayers value=""/><rank value="Not Ranked"/><average value="abc"/></item>'))
+        # Discord rejects embed fields with an empty value
+        self.assertEqual(thing["description"], "<NO DESCRIPTION>")
+        self.assertEqual(thing["name"], "<NO NAME ERROR>")
+        self.assertEqual((thing["minPlayers"], thing["rank"], thing["averageRating"]), (-1, -1, -1.0))
+
+    def test_search(self):
+        self.assertEqual(list(iterSearchIDs(readFixture("search", "catan.xml"))), [13, 27710, 278])
+        self.assertEqual(list(iterSearchIDs(readFixture("search", "catan.xml"), "boardgameexpansion")), [926])
+        self.assertEqual(list(iterSearchIDs(b'<?xml version="1.0" encoding="utf-8"?><items total="0"></items>')), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import asyncio
+import contextlib
+import io
+import os
+import unittest
+
+from benchmarks.bgg_server import FakeBGGServer
+from src.async_database import AsyncDBManager
+from src.bgg import BGGClient, syncBoardgamesWithBGG
+from src.bgg_cache import BGGCache
+from tests.database_case import DatabaseTestCase
+
+MISSING_BGG_ID = 999999999
+
+
+class BGGSyncTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        AsyncDBManager.initInstance(self.db)
+        BGGCache.initInstance(os.path.join(self.tempDir.name, "cache.sqlite"))
+        # Only two games are left to sync, one that BGG knows and one that it does not return
+        self.db.connection.execute("UPDATE boardgames SET bgg_synced_at = CURRENT_TIMESTAMP")
+        self.known, self.missing = [row[0] for row in self.query("SELECT id FROM boardgames ORDER BY id LIMIT 2")]
+        self.db.connection.executemany("UPDATE boardgames SET bgg_id = ?, bgg_synced_at = NULL WHERE id = ?",
+                                       [(13, self.known), (MISSING_BGG_ID, self.missing)])
+        self.db.connection.commit()
+
+    def tearDown(self):
+        AsyncDBManager.getInstance().executor.shutdown()
+        AsyncDBManager.instance = None
+        BGGCache.instance = None
+        super().tearDown()
+
+    async def sync(self) -> (int, int):
+        # Returns the synced games and the requests that reached BGG
+        server = FakeBGGServer(synthetic=False)
+        baseURL = await server.start()
+        try:
+            async with BGGClient(baseURL, requestsPerSecond=100, burst=100) as client:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    synced = await syncBoardgamesWithBGG(client=client)
+        finally:
+            await server.stop()
+        return synced, server.stats["requests"]
+
+    def test_games_missing_from_bgg_are_not_retried_on_every_sync(self):
+        self.assertEqual(asyncio.run(self.sync()), (1, 1))
+        self.assertEqual(self.query("SELECT id FROM boardgames WHERE bgg_synced_at IS NULL"), [(self.missing,)])
+        self.assertEqual(self.query("SELECT id FROM boardgames WHERE bgg_sync_failed_at IS NOT NULL"), [(self.missing,)])
+        self.assertEqual(asyncio.run(self.sync()), (0, 0))
+
+        # Once the retry delay has passed the game is picked up again
+        self.db.connection.execute("UPDATE boardgames SET bgg_sync_failed_at = datetime('now', '-8 days') WHERE id = ?", (self.missing,))
+        self.db.connection.commit()
+        self.assertEqual([row['id'] for row in self.db.getUnsyncedBoardgames(-1, 100)], [self.missing])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from datetime import datetime, timedelta
+
+from tests.database_case import DatabaseTestCase
+
+# Minutes each borrow has lasted so far, computed straight from borrows instead of through the rollup tables
+BORROW_MINUTES = "(julianday(COALESCE(returned, CURRENT_TIMESTAMP)) - julianday(retrieval_date)) * 24 * 60"
+# Both sides measure open borrows against their own CURRENT_TIMESTAMP, a few seconds apart at most
+TOLERANCE = 0.1
+
+
+class BorrowStatsTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.first, self.second = [row[0] for row in self.query("SELECT id FROM boardgames ORDER BY id LIMIT 2")]
+        for item in (self.first, self.second):
+            self.db.editCopies(item, 10)
+
+    def borrow(self, user: int, item: int, daysAgo: float):
+        success, message = self.db.borrowItem(user, item, None, datetime.now() - timedelta(days=daysAgo))
+        self.assertTrue(success, message)
+
+    def assertAvailabilityMatches(self):
+        expected = dict(self.query("SELECT i.id, IFNULL(SUM(b.amount), 0) FROM items i LEFT JOIN borrows b ON b.item = i.id AND b.returned IS NULL GROUP BY i.id"))
+        self.assertEqual(dict(self.query("SELECT id, borrowed_count FROM items")), expected)
+
+    def assertStatsMatch(self):
+        self.assertAvailabilityMatches()
+        expectedUsers = {user: (total, time) for user, total, time in
+                         self.query(f"SELECT user, COUNT(*), SUM({BORROW_MINUTES}) FROM borrows GROUP BY user")}
+        users = {row['user']: (row['total'], row['time']) for row in self.db.getBorrowStats("total", "user")}
+        self.assertEqual(users.keys(), expectedUsers.keys())
+        for user, (total, time) in expectedUsers.items():
+            self.assertEqual(users[user][0], total)
+            self.assertAlmostEqual(users[user][1], time, delta=TOLERANCE)
+
+        pairTimes = {(item, user): time for item, user, time in
+                     self.query(f"SELECT item, user, SUM({BORROW_MINUTES}) FROM borrows GROUP BY item, user")}
+        expectedItems = {name: (item, total, time) for name, item, total, time in
+                         self.query(f"SELECT i.name, b.item, COUNT(*), SUM({BORROW_MINUTES}) FROM borrows b JOIN items i ON i.id = b.item GROUP BY b.item")}
+        items = {row['name']: row for row in self.db.getBorrowStats("total", "item")}
+        self.assertEqual(items.keys(), expectedItems.keys())
+        for name, (item, total, time) in expectedItems.items():
+            row = items[name]
+            self.assertEqual(row['total'], total)
+            self.assertAlmostEqual(row['time'], time, delta=TOLERANCE)
+            longest = max(pairTime for (pairItem, _), pairTime in pairTimes.items() if pairItem == item)
+            self.assertAlmostEqual(row['usertime'], longest, delta=TOLERANCE)
+            self.assertAlmostEqual(pairTimes[(item, row['user'])], longest, delta=TOLERANCE)
+
+    def test_rollups_follow_every_borrow_change(self):
+        self.assertStatsMatch()
+        self.borrow(1, self.first, 10)
+        self.borrow(2, self.first, 5)
+        self.borrow(1, self.second, 3)
+        self.assertStatsMatch()
+
+        self.assertTrue(self.db.returnItem(1, self.first)[0])
+        self.assertStatsMatch()
+
+        self.borrow(1, self.first, 1)
+        self.assertTrue(self.db.returnAllItems(1)[0])
+        self.assertStatsMatch()
+
+        self.borrow(3, self.second, 2)
+        self.db.connection.execute("UPDATE borrows SET user = 4 WHERE user = 2")
+        self.db.connection.commit()
+        self.assertStatsMatch()
+
+        self.db.deleteBoardgame(self.first)
+        self.assertStatsMatch()
+
+    def test_repair_availability_recounts_borrowed_copies(self):
+        self.borrow(1, self.first, 2)
+        self.borrow(2, self.first, 1)
+        self.borrow(1, self.second, 1)
+        self.assertTrue(self.db.returnItem(1, self.second)[0])
+        self.db.connection.execute("UPDATE items SET borrowed_count = borrowed_count + 3 WHERE id IN (?, ?)", (self.first, self.second))
+        self.db.connection.commit()
+
+        self.assertEqual(self.db.repairAvailability(), (True, "Fixed the availability of 2 items"))
+        self.assertAvailabilityMatches()
+        self.assertEqual(self.db.repairAvailability(), (True, "Fixed the availability of 0 items"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from src.database import ObjectType
+from src.embed_helpers.boardgame import BoardGameObj
+from tests.database_case import DatabaseTestCase
+
+# Names with FTS5 syntax in them, searching for them must match the text and not be parsed as a query
+NAMES: [str] = ['Say "Cheese" Twice', "Cats OR Dogs", "NEAR(the end", "Qz"]
+
+
+class ItemSearchTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        for name in NAMES:
+            self.db.insertBoardgame(BoardGameObj(-1, name, 2, 4, 30, 1, 1))
+
+    def search(self, name: str) -> [str]:
+        return [game.title for game in self.db.getFilteredList(ObjectType.BOARDGAME, "", f"name=={name}")]
+
+    def test_query_syntax_in_names_is_escaped(self):
+        self.assertEqual(self.search('say "cheese"'), ['Say "Cheese" Twice'])
+        self.assertEqual(self.search('"Cheese'), ['Say "Cheese" Twice'])
+        self.assertEqual(self.search("s OR d"), ["Cats OR Dogs"])
+        self.assertEqual(self.search("NEAR(the"), ["NEAR(the end"])
+        self.assertEqual(self.search("near(THE END"), ["NEAR(the end"])
+
+    def test_short_names_fall_back_to_like(self):
+        # Trigrams need at least 3 characters, shorter searches use LIKE instead of the index
+        self.assertEqual(self.search("qz"), ["Qz"])
+        self.assertEqual(self.search("Q"), [game.title for game in self.db.getFilteredList(ObjectType.BOARDGAME, "", "")
+                                            if "q" in game.title.lower()])
+
+    def test_index_follows_inserts_renames_and_deletes(self):
+        itemID = self.db.getItemIDFromName("Cats OR Dogs")
+        self.db.connection.execute("UPDATE items SET name = 'Mice AND Owls' WHERE id = ?", (itemID,))
+        self.db.connection.commit()
+        self.assertEqual(self.search("Cats OR"), [])
+        self.assertEqual(self.search("mice and"), ["Mice AND Owls"])
+
+        self.db.deleteBoardgame(itemID)
+        self.assertEqual(self.search("mice and"), [])
+        self.assertEqual(self.query("SELECT rowid FROM items_fts WHERE items_fts MATCH ?", ('{name} : "Owls"',)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
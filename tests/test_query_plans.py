@@ -0,0 +1,12 @@
+import unittest
+
+from tests.database_case import DatabaseTestCase
+
+
+class QueryPlanTest(DatabaseTestCase):
+    def test_hot_queries_use_their_indexes(self):
+        self.assertEqual(self.db.checkQueryPlans(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
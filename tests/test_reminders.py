@@ -0,0 +1,81 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import unittest
+from datetime import datetime, timedelta
+
+from src.async_database import AsyncDBManager
+from src.reminders import ReminderRunner
+from tests.database_case import DatabaseTestCase
+
+
+class FakeUser:
+    def __init__(self, userID: int, sent: list):
+        self.id: int = userID
+        self.sent: list = sent
+
+    async def send(self, embed):
+        self.sent.append(self.id)
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent: list[int] = []
+
+    def get_user(self, userID: int) -> FakeUser:
+        return FakeUser(userID, self.sent)
+
+
+class ReminderRecoveryTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        AsyncDBManager.initInstance(self.db)
+        self.journalPath = os.path.join(self.tempDir.name, "reminders.journal")
+        self.bot = FakeBot()
+        self.runner = ReminderRunner(self.bot, self.journalPath)
+        # Three overdue borrows by different users
+        items = [row[0] for row in self.query("SELECT id FROM items ORDER BY id LIMIT 3")]
+        for user, item in enumerate(items, start=1):
+            success, message = self.db.borrowItem(user, item, datetime.now() - timedelta(days=1), datetime.now() - timedelta(days=10))
+            self.assertTrue(success, message)
+
+    def tearDown(self):
+        AsyncDBManager.getInstance().close()
+        AsyncDBManager.instance = None
+        super().tearDown()
+
+    def crash(self, journaled: int) -> list[tuple]:
+        # A run that claimed every reminder, sent and journaled some of them, then died before its batched update
+        keys = [(row['user'], row['item'], row['retrieval_key']) for row in self.db.claimReminders("crashed")]
+        with open(self.journalPath, 'w') as journal:
+            for key in keys[:journaled]:
+                journal.write(json.dumps(key) + "\n")
+        return keys
+
+    def reminderState(self) -> dict[int, tuple]:
+        return {user: (reminded, claim) for user, reminded, claim in self.query("SELECT user, reminded, reminder_claim FROM borrows")}
+
+    def test_recovery_marks_only_journaled_borrows(self):
+        keys = self.crash(journaled=2)
+        recovered = asyncio.run(self.runner._recover())
+
+        self.assertEqual(recovered, 2)
+        self.assertFalse(os.path.exists(self.journalPath))
+        journaledUsers = {key[0] for key in keys[:2]}
+        self.assertEqual(self.reminderState(), {user: (int(user in journaledUsers), None) for user, _, _ in keys})
+
+    def test_run_after_crash_does_not_resend_journaled_reminders(self):
+        keys = self.crash(journaled=2)
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = asyncio.run(self.runner.run())
+
+        self.assertEqual(self.bot.sent, [keys[2][0]])
+        self.assertEqual((stats['recovered'], stats['claimed'], stats['done']), (2, 1, 1))
+        self.assertEqual(self.reminderState(), {user: (1, None) for user, _, _ in keys})
+        self.assertFalse(os.path.exists(self.journalPath))
+
+
+if __name__ == "__main__":
+    unittest.main()